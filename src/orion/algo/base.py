@@ -121,6 +121,8 @@ class BaseAlgorithm(object, metaclass=ABCMeta):
 
         :param num: how many sets to be suggested.
 
+        :returns: A list of tuples of array-likes, or a `orion.algo.space.PointArray`.
+
         .. note:: New parameters must be compliant with the problem's domain
            `orion.algo.space.Space`.
         """
@@ -133,9 +135,10 @@ class BaseAlgorithm(object, metaclass=ABCMeta):
 
         Parameters
         ----------
-        points : list of tuples of array-likes
+        points : list of tuples of array-likes or `orion.algo.space.PointArray`
            Points from a `orion.algo.space.Space`.
-           Evaluated problem parameters by a consumer.
+           Evaluated problem parameters by a consumer. A `orion.algo.space.PointArray`
+           can be iterated like a list of tuples, or used column-wise.
         results : list of dicts
            Contains the result of an evaluation; partial information about the
            black-box function at each point in `params`.
@@ -154,6 +157,27 @@ class BaseAlgorithm(object, metaclass=ABCMeta):
         """
         pass
 
+    @property
+    def state_dict(self):
+        """Return the state of the algorithm, built from the points it observed, in a
+        dictionary of serializable values.
+
+        It is saved in the database so that new workers can restore it with
+        `set_state` instead of observing again all the completed trials.
+
+        By default, return None: the algorithm cannot save its state.
+
+        """
+        return None
+
+    def set_state(self, state_dict):
+        """Restore the state of the algorithm saved by `state_dict`.
+
+        :param state_dict: Dictionary returned by `state_dict`.
+
+        """
+        raise NotImplementedError("{} cannot restore its state.".format(type(self).__name__))
+
     @property
     def is_done(self):
         """Return True, if an algorithm holds that there can be no further improvement."""
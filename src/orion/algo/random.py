@@ -26,11 +26,12 @@ class Random(BaseAlgorithm):
         from the import space and return them.
 
         :param num: how many sets to be suggested.
+        :returns: A `orion.algo.space.PointArray`, all samples being drawn at once.
 
         .. note:: New parameters must be compliant with the problem's domain
            `orion.algo.space.Space`.
         """
-        return self.space.sample(num)
+        return self.space.sample_array(num)
 
     def observe(self, points, results):
         """Observe evaluation `results` corresponding to list of `points` in
@@ -39,3 +40,12 @@ class Random(BaseAlgorithm):
         A simple random sampler though does not take anything into account.
         """
         pass
+
+    @property
+    def state_dict(self):
+        """Return an empty state, random sampling does not depend on observed points."""
+        return {}
+
+    def set_state(self, state_dict):
+        """Nothing to restore, random sampling does not depend on observed points."""
+        pass
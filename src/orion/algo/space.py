@@ -104,7 +104,13 @@ class Dimension(object):
         self.validate()
 
     def validate(self):
-        """Validate dimension arguments"""
+        """Validate dimension arguments
+
+        Cached properties derived from the definition of the dimension are reset, so
+        that it must be validated again after any change.
+        """
+        self._cached_shape = None
+        self._cached_interval = None
         if 'random_state' in self._kwargs or 'seed' in self._kwargs:
             raise ValueError("random_state/seed cannot be set in a "
                              "parameter's definition! Set seed globally!")
@@ -151,16 +157,27 @@ class Dimension(object):
            Set random state to something other than None for reproducible
            results.
 
-        .. warning:: Setting `seed` with an integer will cause the same ndarray
-           to be sampled if ``n_samples > 0``. Set `seed` with a
+        .. warning:: Setting `seed` with an integer will cause the same samples
+           to be drawn at each call. Set `seed` with a
            ``numpy.random.RandomState`` to carry on the changes in random state
-           across many samples.
+           across many calls.
+
+        .. seealso:: `Dimension.sample_array` to get samples as a single array.
 
         """
-        samples = [self.prior.rvs(*self._args, size=self.shape,
-                                  random_state=seed,
-                                  **self._kwargs) for _ in range(n_samples)]
-        return samples
+        return list(self.sample_array(n_samples, seed))
+
+    def sample_array(self, n_samples=1, seed=None):
+        """Draw random samples from `prior` in a single array.
+
+        All samples are drawn at once, the first axis of the array indexing
+        them and the following ones corresponding to `shape`.
+
+        .. seealso:: `Dimension.sample` for argument documentation.
+
+        """
+        return self.prior.rvs(*self._args, size=(n_samples, ) + self.shape,
+                              random_state=seed, **self._kwargs)
 
     def cast(self, point):
         """Cast a point to dimension's type
@@ -180,7 +197,13 @@ class Dimension(object):
         .. note:: Lower bound is inclusive, upper bound is exclusive.
 
         """
-        return self.prior.interval(alpha, *self._args, **self._kwargs)
+        if alpha != 1.0:
+            return self.prior.interval(alpha, *self._args, **self._kwargs)
+
+        # Full support of the prior is queried on every containment check
+        if self._cached_interval is None:
+            self._cached_interval = self.prior.interval(alpha, *self._args, **self._kwargs)
+        return self._cached_interval
 
     def __contains__(self, point):
         """Check if constraints hold for this `point` of `Dimension`.
@@ -194,6 +217,18 @@ class Dimension(object):
         """
         raise NotImplementedError
 
+    def contains_array(self, points):
+        """Check which of the `points` satisfy the constraints of this `Dimension`.
+
+        :param points: parameters corresponding to this `Dimension`, stacked along
+           the first axis like the result of `Dimension.sample_array`.
+        :type points: numpy.ndarray
+
+        :returns: A boolean array, one item per point.
+
+        """
+        return numpy.array([point in self for point in points], dtype=bool)
+
     def __repr__(self):
         """Represent the object as a string."""
         return "{0}(name={1}, prior={{{2}: {3}, {4}}}, shape={5}, default value={6})".format(
@@ -240,13 +275,20 @@ class Dimension(object):
     @property
     def shape(self):
         """Return the shape of dimension."""
-        # Default shape `None` corresponds to 0-dim (scalar) or shape == ().
-        # Read about ``size`` argument in
-        # `scipy.stats._distn_infrastructure.rv_generic._argcheck_rvs`
-        _, _, _, size = self.prior._parse_args_rvs(*self._args,  # pylint:disable=protected-access
-                                                   size=self._shape,
-                                                   **self._kwargs)
-        return size
+        if self._cached_shape is None:
+            # Default shape `None` corresponds to 0-dim (scalar) or shape == ().
+            # Read about ``size`` argument in
+            # `scipy.stats._distn_infrastructure.rv_generic._argcheck_rvs`
+            # pylint:disable=protected-access
+            _, _, _, self._cached_shape = self.prior._parse_args_rvs(*self._args,
+                                                                     size=self._shape,
+                                                                     **self._kwargs)
+        return self._cached_shape
+
+    @property
+    def cardinality(self):
+        """Return the number of different points in this dimension, infinite by default."""
+        return numpy.inf
 
 
 def _is_numeric_array(point):
@@ -329,6 +371,18 @@ class Real(Dimension):
 
         return numpy.all(point_ < high) and numpy.all(point_ >= low)
 
+    def contains_array(self, points):
+        """Check which of the `points` satisfy the constraints of this `Dimension`.
+
+        .. seealso:: `Dimension.contains_array`
+
+        """
+        points = numpy.asarray(points)
+        if not numpy.issubdtype(points.dtype, numpy.number) or points.shape[1:] != self.shape:
+            return super(Real, self).contains_array(points)
+
+        return self._within_bounds(points)
+
     def interval(self, alpha=1.0):
         """Return a tuple containing lower and upper bound for parameters.
 
@@ -342,28 +396,36 @@ class Real(Dimension):
         prior_low, prior_high = super(Real, self).interval(alpha)
         return (max(prior_low, self._low), min(prior_high, self._high))
 
-    def sample(self, n_samples=1, seed=None):
-        """Draw random samples from `prior`.
+    def sample_array(self, n_samples=1, seed=None):
+        """Draw random samples from `prior` in a single array.
 
-        .. seealso:: `Dimension.sample`
+        Samples falling out of bounds are drawn again, up to 4 times in total.
+
+        .. seealso:: `Dimension.sample_array`
 
         """
-        samples = []
-        for _ in range(n_samples):
-            for _ in range(4):
-                sample = super(Real, self).sample(1, seed)
-                if sample[0] not in self:
-                    nice = False
-                    continue
-                nice = True
-                samples.extend(sample)
+        rng = check_random_state(seed)
+        samples = super(Real, self).sample_array(n_samples, rng)
+        rejected = numpy.logical_not(self._within_bounds(samples))
+        for _ in range(3):
+            if not numpy.any(rejected):
                 break
-            if not nice:
-                raise ValueError("Improbable bounds: (low={0}, high={1}). "
-                                 "Please make interval larger.".format(self._low, self._high))
+            samples[rejected] = super(Real, self).sample_array(
+                int(numpy.sum(rejected)), rng)
+            rejected[rejected] = numpy.logical_not(self._within_bounds(samples[rejected]))
+
+        if numpy.any(rejected):
+            raise ValueError("Improbable bounds: (low={0}, high={1}). "
+                             "Please make interval larger.".format(self._low, self._high))
 
         return samples
 
+    def _within_bounds(self, samples):
+        """Test which samples, indexed by the first axis of `samples`, lie within interval."""
+        low, high = self.interval()
+        inside = numpy.logical_and(samples >= low, samples < high)
+        return numpy.all(inside, axis=tuple(range(1, inside.ndim)))
+
     # pylint:disable=no-self-use
     def cast(self, point):
         """Cast a point to float
@@ -381,20 +443,20 @@ class Real(Dimension):
 
 class _Discrete(Dimension):
 
-    def sample(self, n_samples=1, seed=None):
-        """Draw random samples from `prior`.
+    def sample_array(self, n_samples=1, seed=None):
+        """Draw random samples from `prior` in a single array.
 
-        Discretizes with `numpy.floor` the results from `Dimension.sample`.
+        Discretizes with `numpy.floor` the results from `Dimension.sample_array`.
 
-        .. seealso:: `Dimension.sample`
+        .. seealso:: `Dimension.sample_array`
         .. seealso:: Discussion in https://github.com/mila-udem/orion/issues/56
            if you want to understand better how this `Integer` diamond inheritance
            works.
 
         """
-        samples = super(_Discrete, self).sample(n_samples, seed)
+        samples = super(_Discrete, self).sample_array(n_samples, seed)
         # Making discrete by ourselves because scipy does not use **floor**
-        return list(map(lambda x: numpy.floor(x).astype(int), samples))
+        return numpy.floor(samples).astype(int)
 
     def interval(self, alpha=1.0):
         """Return a tuple containing lower and upper bound for parameters.
@@ -456,6 +518,26 @@ class Integer(Real, _Discrete):
 
         return super(Integer, self).__contains__(point)
 
+    @property
+    def cardinality(self):
+        """Return the number of different integer points in this dimension."""
+        low, high = self.interval()
+        return (high - low) ** int(numpy.prod(self.shape))
+
+    def contains_array(self, points):
+        """Check which of the `points` satisfy the constraints of this `Dimension`.
+
+        .. seealso:: `Dimension.contains_array`
+
+        """
+        points = numpy.asarray(points)
+        contained = super(Integer, self).contains_array(points)
+        if not numpy.issubdtype(points.dtype, numpy.number) or not numpy.any(contained):
+            return contained
+
+        integers = numpy.equal(numpy.mod(points, 1), 0)
+        return contained & numpy.all(integers, axis=tuple(range(1, integers.ndim)))
+
     # pylint:disable=no-self-use
     def cast(self, point):
         """Cast a point to int
@@ -507,23 +589,27 @@ class Categorical(Dimension):
             self.categories = tuple(categories)
             self._probs = tuple(numpy.tile(1. / len(categories), len(categories)))
 
+        try:
+            self._categories_set = frozenset(self.categories)
+        except TypeError:  # Some categories are not hashable, look them up in the tuple
+            self._categories_set = None
+        self._categories_strings = {str(c): c for c in self.categories}
+
         # Just for compatibility; everything should be `Dimension` to let the
         # `Transformer` decorators be able to wrap smoothly anything.
         prior = distributions.rv_discrete(values=(list(range(len(self.categories))),
                                                   self._probs))
         super(Categorical, self).__init__(name, prior, **kwargs)
 
-    def sample(self, n_samples=1, seed=None):
-        """Draw random samples from `prior`.
+    def sample_array(self, n_samples=1, seed=None):
+        """Draw random samples from `prior` in a single array.
 
-        .. seealso:: `Dimension.sample`
+        .. seealso:: `Dimension.sample_array`
 
         """
         rng = check_random_state(seed)
         cat_ndarray = numpy.array(self.categories, dtype=numpy.object)
-        samples = [rng.choice(cat_ndarray, p=self._probs, size=self._shape)
-                   for _ in range(n_samples)]
-        return samples
+        return rng.choice(cat_ndarray, p=self._probs, size=(n_samples, ) + self.shape)
 
     def interval(self, alpha=1.0):
         """Return a tuple of possible values that this categorical dimension
@@ -536,6 +622,11 @@ class Categorical(Dimension):
         raise RuntimeError("Categories have no ``interval`` (as they are not ordered).\n"
                            "Use ``self.categories`` instead.")
 
+    @property
+    def cardinality(self):
+        """Return the number of different combinations of categories in this dimension."""
+        return len(self.categories) ** int(numpy.prod(self.shape))
+
     def __contains__(self, point):
         """Check if constraints hold for this `point` of `Dimension`.
 
@@ -546,8 +637,31 @@ class Categorical(Dimension):
         point_ = numpy.asarray(point, dtype=numpy.object)
         if point_.shape != self.shape:
             return False
-        _check = numpy.vectorize(lambda x: x in self.categories)
-        return numpy.all(_check(point_))
+        return all(self._is_category(value) for value in point_.flat)
+
+    def contains_array(self, points):
+        """Check which of the `points` satisfy the constraints of this `Dimension`.
+
+        .. seealso:: `Dimension.contains_array`
+
+        """
+        points = numpy.asarray(points, dtype=numpy.object)
+        if points.shape[1:] != self.shape:
+            return super(Categorical, self).contains_array(points)
+
+        contained = numpy.fromiter((self._is_category(value) for value in points.flat),
+                                   dtype=bool, count=points.size)
+        return numpy.all(contained.reshape(points.shape), axis=tuple(range(1, points.ndim)))
+
+    def _is_category(self, value):
+        """Test whether a single `value` is one of the categories."""
+        if self._categories_set is None:
+            return value in self.categories
+
+        try:
+            return value in self._categories_set
+        except TypeError:  # unhashable values can still be equal to some category
+            return value in self.categories
 
     def __repr__(self):
         """Represent the object as a string."""
@@ -602,18 +716,13 @@ class Categorical(Dimension):
             If one of the category in `point` is not present in current Categorical Dimension.
 
         """
-        categorical_strings = {str(c): c for c in self.categories}
-
-        def get_category(value):
-            """Return category corresponding to a string else return singleton object"""
-            if str(value) not in categorical_strings:
-                raise ValueError("Invalid category: {}".format(value))
-
-            return categorical_strings[str(value)]
-
         point_ = numpy.asarray(point, dtype=numpy.object)
-        cast = numpy.vectorize(get_category, otypes=[numpy.object])
-        casted_point = cast(point_)
+        casted_point = numpy.empty(point_.shape, dtype=numpy.object)
+        for i, value in enumerate(point_.flat):
+            try:
+                casted_point.flat[i] = self._categories_strings[str(value)]
+            except KeyError:
+                raise ValueError("Invalid category: {}".format(value)) from None
 
         if not isinstance(point, numpy.ndarray):
             return casted_point.tolist()
@@ -659,10 +768,17 @@ class Space(OrderedDict):
            same order as the contained dimensions. Their shape is determined
            by ``dimension.shape``.
 
+        """
+        return list(self.sample_array(n_samples, seed))
+
+    def sample_array(self, n_samples=1, seed=None):
+        """Draw random samples from this space, as a `PointArray`.
+
+        .. seealso:: `Space.sample` for argument documentation.
+
         """
         rng = check_random_state(seed)
-        samples = [dim.sample(n_samples, rng) for dim in self.values()]
-        return list(zip(*samples))
+        return PointArray([dim.sample_array(n_samples, rng) for dim in self.values()])
 
     def interval(self, alpha=1.0):
         """Return a list with the intervals for each contained dimension.
@@ -678,6 +794,16 @@ class Space(OrderedDict):
                 res.append(dim.interval(alpha))
         return res
 
+    @property
+    def cardinality(self):
+        """Return the number of different points in the space, infinite if any of its
+        dimensions is continuous.
+        """
+        cardinality = 1
+        for dim in self.values():
+            cardinality *= dim.cardinality
+        return cardinality
+
     def __getitem__(self, key):
         """Wrap __getitem__ to allow searching with position."""
         if isinstance(key, str):
@@ -706,13 +832,17 @@ class Space(OrderedDict):
         """Check whether `value` is within the bounds of the space.
         Or check if a name for a dimension is registered in this space.
 
-        :param value: list of values associated with the dimensions contained
+        :param value: list of values associated with the dimensions contained,
+           a `PointArray` whose points must all be within the bounds,
            or a string indicating a dimension's name.
 
         """
         if isinstance(value, str):
             return super(Space, self).__contains__(value)
 
+        if isinstance(value, PointArray):
+            return bool(numpy.all(self.contains_many(value)))
+
         try:
             len(value)
         except TypeError as exc:
@@ -728,12 +858,100 @@ class Space(OrderedDict):
 
         return True
 
+    def contains_many(self, points):
+        """Check which of `points` are within the bounds of the space.
+
+        Each dimension tests all the values it is associated with at once.
+
+        :param points: a `PointArray` or a list of points.
+
+        :returns: A boolean array, one item per point.
+
+        """
+        if not self:
+            return numpy.zeros(len(points), dtype=bool)
+
+        if not isinstance(points, PointArray):
+            try:
+                points = PointArray.from_points(points, self)
+            except (IndexError, TypeError, ValueError):  # ragged points
+                return numpy.array([point in self for point in points], dtype=bool)
+
+        if len(points.columns) != len(self):
+            return numpy.zeros(len(points), dtype=bool)
+
+        contained = numpy.ones(len(points), dtype=bool)
+        for column, dim in zip(points.columns, self.values()):
+            contained &= dim.contains_array(column)
+        return contained
+
     def __repr__(self):
         """Represent as a string the space and the dimensions it contains."""
         dims = list(self.values())
         return "Space([{}])".format(',\n       '.join(map(str, dims)))
 
 
+class PointArray(object):
+    """Points of a `Space` stored as one array per dimension.
+
+    The first axis of each column indexes the points, the following ones
+    correspond to the shape of the dimension. Points can still be accessed one
+    by one as tuples, so that a `PointArray` can be used wherever a list of
+    points is expected.
+
+    Attributes
+    ----------
+    columns : list of `numpy.ndarray`
+       Values of the points for each dimension, in the order of the space.
+
+    """
+
+    def __init__(self, columns):
+        """Initialize from a list of columns, which must all hold the same number of points."""
+        self.columns = list(columns)
+        if len(set(len(column) for column in self.columns)) > 1:
+            raise ValueError("Columns must hold the same number of points, got lengths: "
+                             "{}".format([len(column) for column in self.columns]))
+
+    @classmethod
+    def from_points(cls, points, space):
+        """Stack a list of points from `space` into columns."""
+        columns = []
+        for i, dim in enumerate(space.values()):
+            values = [point[i] for point in points]
+            if dim.type == 'categorical':
+                column = numpy.array(values, dtype=numpy.object)
+            elif values:
+                column = numpy.asarray(values)
+            else:
+                column = numpy.empty((0, ) + tuple(dim.shape))
+            columns.append(column)
+
+        return cls(columns)
+
+    def __len__(self):
+        """Return the number of points."""
+        if not self.columns:
+            return 0
+
+        return len(self.columns[0])
+
+    def __getitem__(self, index):
+        """Return a point as a tuple, or a `PointArray` if `index` is a slice."""
+        if isinstance(index, slice):
+            return PointArray([column[index] for column in self.columns])
+
+        return tuple(column[index] for column in self.columns)
+
+    def __iter__(self):
+        """Iterate over points as tuples."""
+        return zip(*self.columns)
+
+    def __repr__(self):
+        """Represent the object as a string."""
+        return "PointArray({})".format(list(self))
+
+
 def pack_point(point, space):
     """Take a list of points and pack it appropriately as a point from `space`.
 
@@ -9,6 +9,8 @@
       and link them with a particular existing experiment.
 
 """
+import numpy
+
 from orion.core.io.experiment_builder import ExperimentBuilder
 from orion.core.utils import format_trials
 
@@ -36,17 +38,13 @@ def insert_trials(experiment_name, points, cmdconfig=None, raise_exc=True):
 
     experiment_view = ExperimentBuilder().build_view_from({'config': cmdconfig})
 
-    valid_points = []
-
     print(experiment_view.space)
 
-    for point in points:
-        try:
-            assert point in experiment_view.space
-            valid_points.append(point)
-        except AssertionError:
-            if raise_exc:
-                raise
+    contained = experiment_view.space.contains_many(points)
+    if raise_exc:
+        assert numpy.all(contained)
+
+    valid_points = [point for point, valid in zip(points, contained) if valid]
 
     if not valid_points:
         return
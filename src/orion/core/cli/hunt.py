@@ -17,6 +17,7 @@ from orion.core.cli import evc as evc_cli
 from orion.core.io import resolve_config
 from orion.core.io.evc_builder import EVCBuilder
 from orion.core.worker import workon
+from orion.core.worker.trial import Trial
 
 log = logging.getLogger(__name__)
 
@@ -37,6 +38,28 @@ def add_subparser(parser):
         help="number of concurrent workers to evaluate candidate samples "
              "(default: %s)" % resolve_config.DEF_CMD_POOL_SIZE[1])
 
+    orion_group.add_argument(
+        "--n-workers", type=int, metavar='#', default=resolve_config.DEF_CMD_N_WORKERS[0],
+        help="number of trials to evaluate concurrently inside this worker "
+             "(default: %s)" % resolve_config.DEF_CMD_N_WORKERS[1])
+
+    orion_group.add_argument(
+        "--batch-size", type=int, metavar='#', default=resolve_config.DEF_CMD_BATCH_SIZE[0],
+        help="number of trials to reserve at once from the database "
+             "(default: %s)" % resolve_config.DEF_CMD_BATCH_SIZE[1])
+
+    orion_group.add_argument(
+        "--is-done-ttl", type=float, metavar='SECONDS',
+        default=resolve_config.DEF_CMD_IS_DONE_TTL[0],
+        help="number of seconds during which the number of completed trials is reused "
+             "to check if the experiment is done (default: %s)" %
+             resolve_config.DEF_CMD_IS_DONE_TTL[1])
+
+    orion_group.add_argument(
+        "--trial-hash", type=str, choices=Trial.hash_types,
+        help="function computing the ids of the trials of a new experiment "
+             "(default: %s)" % resolve_config.DEF_CMD_TRIAL_HASH[1])
+
     evc_cli.get_branching_args_group(hunt_parser)
 
     cli.get_user_args_group(hunt_parser)
@@ -50,5 +73,9 @@ def main(args):
     """Build experiment and execute hunt command"""
     args['root'] = None
     args['leafs'] = []
+    n_workers = args.pop('n_workers')
+    batch_size = args.pop('batch_size')
+    is_done_ttl = args.pop('is_done_ttl')
     experiment = EVCBuilder().build_from(args)
-    workon(experiment)
+    experiment.is_done_ttl = is_done_ttl
+    workon(experiment, n_workers=n_workers, batch_size=batch_size)
@@ -131,6 +131,22 @@ class ExperimentNode(TreeNode):
 
         return sum([node.item['trials'] for node in trials_tree.root], [])
 
+    def fetch_new_completed_trials(self, watermarks, selection=None):
+        """Fetch recursively in the EVC tree the trials completed since the watermarks
+
+        .. seealso::
+
+            :meth:`orion.core.worker.Experiment.fetch_new_completed_trials` for more
+            information about the arguments.
+
+        """
+        trials_tree = _map_trials_tree(
+            self, functools.partial(_fetch_node_new_completed_trials, watermarks=watermarks,
+                                    selection=selection))
+        adapt_trials(trials_tree)
+
+        return sum([node.item['trials'] for node in trials_tree.root], [])
+
 
 def _fetch_node_trials(experiment_node, parent_or_children, query, selection=None):
     """Fetch trials from the current node and connect with parent or children
@@ -147,6 +163,23 @@ def _fetch_node_trials(experiment_node, parent_or_children, query, selection=Non
     return rval, parent_or_children
 
 
+def _fetch_node_new_completed_trials(experiment_node, parent_or_children, watermarks,
+                                     selection=None):
+    """Fetch trials completed since the watermarks from the current node and connect with
+    parent or children
+
+    .. note::
+
+        To call with node.map to connect with parents or children
+
+    """
+    experiment_trials = experiment_node.item.fetch_new_completed_trials(watermarks, selection)
+
+    rval = {'trials': experiment_trials, 'experiment': experiment_node.item}
+
+    return rval, parent_or_children
+
+
 def fetch_trials_tree(experiment_node, query, selection=None):
     """Fetch trials recursively from an experiment node
 
@@ -155,16 +188,20 @@ def fetch_trials_tree(experiment_node, query, selection=None):
         :meth:`orion.core.evc.experiment.ExperimentNode.fetch_trials`
 
     """
+    return _map_trials_tree(
+        experiment_node,
+        functools.partial(_fetch_node_trials, query=query, selection=selection))
+
+
+def _map_trials_tree(experiment_node, fetch_node_trials):
+    """Build the tree of trials fetched with `fetch_node_trials` from every node"""
     if experiment_node.parent is not None:
         parent_trials_tree = experiment_node.parent.map(
-            functools.partial(_fetch_node_trials, query=query, selection=selection),
-            experiment_node.parent.parent)
+            fetch_node_trials, experiment_node.parent.parent)
     else:
         parent_trials_tree = None
 
-    children_trials_tree = experiment_node.map(
-        functools.partial(_fetch_node_trials, query=query, selection=selection),
-        experiment_node.children)
+    children_trials_tree = experiment_node.map(fetch_node_trials, experiment_node.children)
     children_trials_tree.set_parent(parent_trials_tree)
 
     return children_trials_tree
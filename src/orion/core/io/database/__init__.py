@@ -11,9 +11,12 @@ Contains :class:`AbstractDB`, an interface for databases.
 Currently, implemented wrappers:
 
    - :class:`orion.core.io.database.mongodb.MongoDB`
+   - :class:`orion.core.io.database.ephemeraldb.EphemeralDB`
+   - :class:`orion.core.io.database.sqlitedb.SQLiteDB`
 
 """
 from abc import abstractmethod, abstractproperty
+from collections import OrderedDict
 
 from orion.core.utils import (AbstractSingletonType, SingletonFactory)
 
@@ -41,6 +44,9 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
     ASCENDING = 0
     DESCENDING = 1
 
+    # Operators of the accumulators computed by `AbstractDB.group`.
+    GROUP_OPERATORS = ('count', 'sum', 'min', 'max')
+
     def __init__(self, host='localhost', name=None,
                  port=None, username=None, password=None):
         """Init method, see attributes of :class:`AbstractDB`."""
@@ -101,7 +107,7 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
         pass
 
     @abstractmethod
-    def write(self, collection_name, data, query=None):
+    def write(self, collection_name, data, query=None, upsert=True):
         """Write new information to a collection. Perform insert or update.
 
         Parameters
@@ -110,8 +116,13 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
            A collection inside database, a table.
         data : dict or list of dicts
            New data that will **be inserted** or that will **update** entries.
+           For an update, `data` may also contain update operators instead of
+           values to set, such as `{'$inc': {key_name: 1}}`.
         query : dict, optional
            Assumes an update operation: filter entries in collection to be updated.
+        upsert : bool, optional
+           Whether to insert `data` when `query` does not match any document
+           in an update operation. Defaults to True.
 
         :return: operation success.
 
@@ -121,7 +132,8 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
 
         .. note::
            In the case of an update operation, if `query` fails to find a
-           document that matches, insert of `data` will be performed instead.
+           document that matches, insert of `data` will be performed instead,
+           unless `upsert` is False.
 
         :raises :exc:`DuplicateKeyError`: if the operation is creating duplicate
             keys in two different documents. Only occurs if the keys have
@@ -132,7 +144,36 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
         pass
 
     @abstractmethod
-    def read(self, collection_name, query=None, selection=None):
+    def write_many(self, collection_name, documents, ordered=True):
+        """Insert new documents in a collection, skipping those which are duplicates.
+
+        Parameters
+        ----------
+        collection_name : str
+           A collection inside database, a table.
+        documents : list of dicts
+           New documents that will **be inserted**.
+        ordered : bool, optional
+           If True, insertion stops at the first duplicate and the documents after it
+           are not inserted. If False, all documents which are not duplicates are
+           inserted, in any order. Defaults to True.
+
+        :return: the number of inserted documents and the list of the indexes in
+           `documents` of those which could not be inserted because of duplicate keys.
+
+        :raises :exc:`DatabaseError`: if some documents could not be inserted for another
+           reason than duplicate keys.
+
+        .. note::
+           Like for an insert with :meth:`AbstractDB.write`, `documents` will be updated
+           to contain a unique *_id* key.
+
+        """
+        pass
+
+    @abstractmethod
+    def read(self, collection_name, query=None, selection=None, sort=None, limit=None,
+             skip=None):
         """Read a collection and return a value according to the query.
 
         Parameters
@@ -143,6 +184,15 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
            Filter entries in collection.
         selection : dict, optional
            Elements of matched entries to return, the projection.
+        sort : list of tuples, optional
+           Order of the documents, as a list of tuples `[(key_name, sort_order)]`.
+           `sort_order` can be either `AbstractDB.ASCENDING` or
+           `AbstractDB.DESCENDING`. Missing or null values come first in
+           ascending order.
+        limit : int, optional
+           Maximum number of documents to return, must be positive.
+        skip : int, optional
+           Number of matched documents to skip before returning the others.
 
         :return: list of matched document[s]
 
@@ -150,10 +200,38 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
         pass
 
     @abstractmethod
-    def read_and_write(self, collection_name, query, data, selection=None):
+    def read_iter(self, collection_name, query=None, selection=None, batch_size=None,
+                  sort=None, limit=None, skip=None):
+        """Read lazily the documents of a collection which match the query.
+
+        Contrarily to `read`, documents are fetched from the database while they are
+        iterated, so that large collections can be read in constant memory.
+
+        Parameters
+        ----------
+        collection_name : str
+           A collection inside database, a table.
+        query : dict, optional
+           Filter entries in collection.
+        selection : dict, optional
+           Elements of matched entries to return, the projection.
+        batch_size : int, optional
+           Number of documents to fetch from the database at once. Defaults to
+           the choice of the backend.
+        sort, limit, skip : optional
+           Order and range of the documents to return, see :meth:`AbstractDB.read`.
+
+        :return: iterator over matched document[s]
+
+        """
+        pass
+
+    @abstractmethod
+    def read_and_write(self, collection_name, query, data, selection=None, sort=None):
         """Read a collection's document and update the found document.
 
-        If many documents are found, the first one is selected.
+        If many documents are found, the first one is selected, according to `sort`
+        if given.
 
         Returns the updated document, or None if nothing found.
 
@@ -164,9 +242,14 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
         query : dict
            Filter entries in collection.
         data : dict or list of dicts
-           New data that will **update** the entry.
+           New data that will **update** the entry. It may also contain update
+           operators, like for :meth:`AbstractDB.write`.
         selection : dict, optional
            Elements of matched entries to return, the projection.
+        sort : list of tuples, optional
+           Order in which matched entries are considered, with the structure
+           `[(key_name, sort_order)]`. `sort_order` can be either
+           `AbstractDB.ASCENDING` or `AbstractDB.DESCENDING`.
 
         :return: updated first matched document or None if nothing found
 
@@ -178,6 +261,16 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
         """
         pass
 
+    @staticmethod
+    def _build_update(data):
+        """Return update operations for `data`, setting its values unless it already
+        contains update operators such as `$set` or `$inc`.
+        """
+        if any(key.startswith('$') for key in data):
+            return data
+
+        return {'$set': data}
+
     @abstractmethod
     def count(self, collection_name, query=None):
         """Count the number of documents in a collection which match the `query`.
@@ -192,6 +285,140 @@ class AbstractDB(object, metaclass=AbstractSingletonType):
         """
         pass
 
+    def aggregate(self, collection_name, pipeline):
+        """Compute summaries of a collection inside the database.
+
+        Backends which cannot run aggregation pipelines do not need to implement this method,
+        callers are expected to fall back on :meth:`AbstractDB.read` in that case.
+
+        Parameters
+        ----------
+        collection_name : str
+           A collection inside database, a table.
+        pipeline : list of dicts
+           Stages of the aggregation, following MongoDB's syntax.
+
+        :return: list of documents produced by the last stage.
+
+        :raises :exc:`NotImplementedError`: if the backend does not support aggregations.
+
+        """
+        raise NotImplementedError("{} does not support aggregation pipelines.".format(
+            type(self).__name__))
+
+    def group(self, collection_name, query=None, keys=None, accumulators=None):
+        """Summarize the documents of a collection, grouped by the values of `keys`.
+
+        This is a portable subset of :meth:`AbstractDB.aggregate`, which backends run
+        natively when they can. By default, documents are summarized while they are read
+        with :meth:`AbstractDB.read_iter`.
+
+        Parameters
+        ----------
+        collection_name : str
+           A collection inside database, a table.
+        query : dict, optional
+           Filter entries in collection.
+        keys : list of str, optional
+           Keys whose values define the groups. All matched documents are summarized
+           in a single group if not given.
+        accumulators : dict, optional
+           Summaries to compute for each group, as `{name: (operator, key_name)}`, with
+           operators from `AbstractDB.GROUP_OPERATORS`. Missing or null values are ignored,
+           and `key_name` is not used by 'count'. Names cannot contain dots.
+
+        :return: list of documents holding the values of `keys` and the summaries of each
+           group, in no particular order. 'min' and 'max' are None for groups without
+           values.
+
+        """
+        keys = list(keys or [])
+        accumulators = self._check_accumulators(accumulators)
+
+        selection = dict((key, 1) for key in keys)
+        selection.update((key, 1) for operator, key in accumulators.values()
+                         if operator != 'count')
+        summaries = OrderedDict()
+        for document in self.read_iter(collection_name, query, selection or {'_id': 1}):
+            values = [_get_value(document, key) for key in keys]
+            group_id = repr(values)
+            if group_id not in summaries:
+                summary = dict(zip(keys, values))
+                for name, (operator, _) in accumulators.items():
+                    summary[name] = 0 if operator in ('count', 'sum') else None
+                summaries[group_id] = summary
+
+            summary = summaries[group_id]
+            for name, (operator, key) in accumulators.items():
+                if operator == 'count':
+                    summary[name] += 1
+                    continue
+
+                value = _get_value(document, key)
+                if value is None:
+                    continue
+
+                if operator == 'sum':
+                    summary[name] += value
+                elif (summary[name] is None or
+                      (value < summary[name] if operator == 'min' else value > summary[name])):
+                    summary[name] = value
+
+        return list(summaries.values())
+
+    @classmethod
+    def _check_accumulators(cls, accumulators):
+        """Return the accumulators of :meth:`AbstractDB.group`, validating their operators."""
+        accumulators = dict(accumulators or {})
+        for name, (operator, _) in accumulators.items():
+            if operator not in cls.GROUP_OPERATORS:
+                raise ValueError("Operator of accumulator '{}', {}, is not one of: {}".format(
+                    name, operator, cls.GROUP_OPERATORS))
+
+        return accumulators
+
+    def watch_token(self, collection_name):
+        """Return a token marking the current point in the changes of a collection.
+
+        Given to :meth:`AbstractDB.watch`, it makes it report the changes made since the
+        token was returned, even if they were made before it started watching.
+
+        :param collection_name: A collection inside database, a table.
+
+        :return: An opaque token, or None if changes made before watching cannot be reported.
+
+        :raises :exc:`NotImplementedError`: if the backend cannot watch changes.
+
+        """
+        raise NotImplementedError("{} cannot watch changes of collections.".format(
+            type(self).__name__))
+
+    def watch(self, collection_name, query, timeout, token=None):
+        """Wait until a document matching the `query` is inserted or updated in a collection.
+
+        Backends which cannot be notified of changes do not need to implement this method,
+        callers are expected to fall back on polling with :meth:`AbstractDB.read` in that case.
+
+        Parameters
+        ----------
+        collection_name : str
+           A collection inside database, a table.
+        query : dict
+           Filter the inserted or updated documents to wait for.
+        timeout : float
+           Maximum number of seconds to wait.
+        token : object, optional
+           Token returned by :meth:`AbstractDB.watch_token`. If given, documents written
+           since it was returned are reported too, otherwise only those written from now on.
+
+        :return: True if such a document was written, False if `timeout` expired first.
+
+        :raises :exc:`NotImplementedError`: if the backend cannot watch changes.
+
+        """
+        raise NotImplementedError("{} cannot watch changes of collections.".format(
+            type(self).__name__))
+
     @abstractmethod
     def remove(self, collection_name, query):
         """Delete from a collection document[s] which match the `query`.
@@ -225,7 +452,8 @@ class ReadOnlyDB(object):
                         # Properties
                         ["is_connected"] +
                         # Methods
-                        ["initiate_connection", "close_connection", "read", "count"])
+                        ["initiate_connection", "close_connection", "read", "read_iter",
+                         "count", "aggregate", "group"])
 
     def __init__(self, database):
         """Init method, see attributes of :class:`AbstractDB`."""
@@ -263,3 +491,12 @@ class Database(AbstractDB, metaclass=SingletonFactory):
     """
 
     pass
+
+
+def _get_value(document, key):
+    """Fetch the value of a possibly nested key of a document, None if missing"""
+    for part in key.split('.'):
+        if not isinstance(document, dict) or part not in document:
+            return None
+        document = document[part]
+    return document
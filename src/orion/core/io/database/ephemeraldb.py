@@ -8,8 +8,10 @@
    :synopsis: Implement non permanent version of :class:`orion.core.io.database.AbstractDB`
 
 """
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import copy
+import itertools
+import operator
 
 from orion.core.io.database import AbstractDB, DuplicateKeyError
 
@@ -40,11 +42,12 @@ class EphemeralDB(AbstractDB):
     def ensure_index(self, collection_name, keys, unique=False):
         """Create given indexes if they do not already exist in database.
 
-        Indexes are only created if `unique` is True.
+        .. seealso:: :meth:`AbstractDB.ensure_index` for argument documentation.
+
         """
         self._db[collection_name].create_index(keys, unique=unique)
 
-    def write(self, collection_name, data, query=None):
+    def write(self, collection_name, data, query=None, upsert=True):
         """Write new information to a collection. Perform insert or update.
 
         .. seealso:: :meth:`AbstractDB.write` for argument documentation.
@@ -59,12 +62,36 @@ class EphemeralDB(AbstractDB):
                 data = [data]
             return dbcollection.insert_many(documents=data)
 
-        update_data = {'$set': data}
+        update_data = self._build_update(data)
 
         return dbcollection.update_many(query=query,
-                                        update=update_data)
+                                        update=update_data,
+                                        upsert=upsert)
+
+    def write_many(self, collection_name, documents, ordered=True):
+        """Insert new documents in a collection, skipping those which are duplicates.
+
+        .. seealso:: :meth:`AbstractDB.write_many` for argument documentation.
+
+        """
+        dbcollection = self._db[collection_name]
 
-    def read(self, collection_name, query=None, selection=None):
+        n_inserted = 0
+        duplicates = []
+        for index, document in enumerate(documents):
+            try:
+                dbcollection.insert_many([document])
+            except DuplicateKeyError:
+                duplicates.append(index)
+                if ordered:
+                    break
+            else:
+                n_inserted += 1
+
+        return n_inserted, duplicates
+
+    def read(self, collection_name, query=None, selection=None, sort=None, limit=None,
+             skip=None):
         """Read a collection and return a value according to the query.
 
         .. seealso:: :meth:`AbstractDB.read` for argument documentation.
@@ -72,11 +99,25 @@ class EphemeralDB(AbstractDB):
         """
         dbcollection = self._db[collection_name]
 
-        dbdocs = dbcollection.find(query, selection)
+        dbdocs = list(dbcollection.find_iter(query, selection, sort=sort, limit=limit,
+                                             skip=skip))
 
         return dbdocs
 
-    def read_and_write(self, collection_name, query, data, selection=None):
+    def read_iter(self, collection_name, query=None, selection=None, batch_size=None,
+                  sort=None, limit=None, skip=None):
+        """Read lazily the documents of a collection which match the query.
+
+        Documents are already in memory, `batch_size` is ignored.
+
+        .. seealso:: :meth:`AbstractDB.read_iter` for argument documentation.
+
+        """
+        dbcollection = self._db[collection_name]
+
+        return dbcollection.find_iter(query, selection, sort=sort, limit=limit, skip=skip)
+
+    def read_and_write(self, collection_name, query, data, selection=None, sort=None):
         """Read a collection's document and update the found document.
 
         Returns the updated document, or None if nothing found.
@@ -85,13 +126,13 @@ class EphemeralDB(AbstractDB):
                      argument documentation.
 
         """
-        dbdoc = self.read(collection_name, query)
+        dbdoc = self.read(collection_name, query, sort=sort, limit=1)
         if not dbdoc:
             return None
 
         id_query = {'_id': dbdoc[0]['_id']}
         self.write(collection_name, data, id_query)
-        return self.read(collection_name, id_query)[0]
+        return self.read(collection_name, id_query, selection)[0]
 
     def count(self, collection_name, query=None):
         """Count the number of documents in a collection which match the `query`.
@@ -102,6 +143,38 @@ class EphemeralDB(AbstractDB):
         dbcollection = self._db[collection_name]
         return dbcollection.count(query=query)
 
+    def aggregate(self, collection_name, pipeline):
+        """Refuse to run aggregation pipelines, EphemeralDB only summarizes documents while
+        reading them, see :meth:`AbstractDB.group`.
+
+        .. seealso:: :meth:`AbstractDB.aggregate` for argument documentation.
+
+        :raises :exc:`NotImplementedError`: always.
+
+        """
+        raise NotImplementedError("EphemeralDB does not support aggregation pipelines.")
+
+    def watch_token(self, collection_name):
+        """Refuse to mark changes of collections, EphemeralDB cannot watch them.
+
+        .. seealso:: :meth:`AbstractDB.watch_token` for argument documentation.
+
+        :raises :exc:`NotImplementedError`: always.
+
+        """
+        raise NotImplementedError("EphemeralDB cannot watch changes of collections.")
+
+    def watch(self, collection_name, query, timeout, token=None):
+        """Refuse to watch changes of collections, callers must poll them with
+        :meth:`EphemeralDB.read` instead.
+
+        .. seealso:: :meth:`AbstractDB.watch` for argument documentation.
+
+        :raises :exc:`NotImplementedError`: always.
+
+        """
+        raise NotImplementedError("EphemeralDB cannot watch changes of collections.")
+
     def remove(self, collection_name, query):
         """Delete from a collection document[s] which match the `query`.
 
@@ -118,28 +191,45 @@ class EphemeralCollection(object):
 
     This collection is meant for debugging purposes within the EphemeralDB.
 
+    Documents are kept in insertion order and indexed by hash tables, so that queries
+    on indexed keys, with equality or `$in`, do not need to scan the whole collection.
+
     .. seealso:: :class:`orion.core.io.database.ephemeraldb.EphemeralDB` for database object.
 
     """
 
     def __init__(self):
         """Initialise the collection, with no documents and only _id unique index."""
-        self._documents = []
+        self._reset()
+
+    def _reset(self):
+        """Remove all documents and indexes, then create the _id unique index."""
+        self._documents = OrderedDict()
         self._indexes = dict()
+        self._next_position = 0
+        self._max_id = 0
         self.create_index('_id', unique=True)
 
     def create_index(self, keys, unique=False):
         """Create given indexes if they do not already exist for this collection.
 
-        Indexes are only created if `unique` is True.
+        :raises: :exc:`DuplicateKeyError`: if `unique` is True and documents already in the
+            collection share the same values for `keys`.
         """
         # turn single key into list for coherence
         if not isinstance(keys, (list, tuple)):
             keys = [(keys, None)]
 
         keys = tuple(key for (key, order) in keys)
-        if unique and keys not in self._indexes:
-            self._indexes[keys] = []
+        if keys in self._indexes:
+            return
+
+        index = EphemeralIndex(keys, unique=unique)
+        for position, document in self._documents.items():
+            index.validate(document)
+            index.add(position, document)
+
+        self._indexes[keys] = index
 
     def find(self, query=None, selection=None):
         """Find documents in the collection and return a value according to the query.
@@ -147,36 +237,76 @@ class EphemeralCollection(object):
         .. seealso:: :meth:`AbstractDB.read` for argument documentation.
 
         """
-        found_documents = []
-        for document in self._documents:
-            if document.match(query):
-                found_documents.append(document.select(selection))
+        return [document.select(selection) for _, document in self._match(query)]
+
+    def find_iter(self, query=None, selection=None, sort=None, limit=None, skip=None):
+        """Iterate over documents in the collection matching the query, in `sort` order.
+
+        Documents are only copied when they are reached by the iteration.
+
+        .. seealso:: :meth:`AbstractDB.read_iter` for argument documentation.
+
+        """
+        matches = self._match(query)
+        if sort:
+            matches = _sort(matches, sort)
 
-        return found_documents
+        skip = skip or 0
+        stop = skip + limit if limit is not None else None
+        for _, document in itertools.islice(matches, skip, stop):
+            yield document.select(selection)
+
+    def _match(self, query):
+        """Return list of `(position, document)` matching `query`, in insertion order.
+
+        Candidates are taken from the most selective index the query can use, or from the
+        whole collection if none can be used.
+        """
+        if not query:
+            return list(self._documents.items())
+
+        query = EphemeralQuery(query)
+
+        candidates = None
+        for index in self._indexes.values():
+            positions = index.lookup(query)
+            if positions is not None and (candidates is None or len(positions) < len(candidates)):
+                candidates = positions
+
+        if candidates is None:
+            documents = self._documents.items()
+        else:
+            documents = ((position, self._documents[position])
+                         for position in sorted(candidates))
 
-    def _validate_index(self, document):
+        return [(position, document) for position, document in documents
+                if query.match(document)]
+
+    def _validate_index(self, document, position=None):
         """Validate index values of a document
 
+        :param position: Position of the document in the collection if it is already in it,
+            so that it does not conflict with itself.
+
         :raises: :exc:`DuplicateKeyError`: if the document contains unique indexes which are already
         present in the database.
         """
-        for index, values in self._indexes.items():
-            document_values = document.select({key: 1 for key in index})
-            if document_values in values:
-                raise DuplicateKeyError(
-                    "Duplicate key error: index={} value={}".format(index, document_values))
+        for index in self._indexes.values():
+            index.validate(document, position)
 
-    def _register_keys(self, document):
-        """Register index values of a new document"""
-        for index, values in self._indexes.items():
-            values.append(document.select({key: 1 for key in index}))
+    def _register_keys(self, position, document):
+        """Register index values of a document"""
+        for index in self._indexes.values():
+            index.add(position, document)
+
+    def _unregister_keys(self, position, document):
+        """Remove index values of a document"""
+        for index in self._indexes.values():
+            index.discard(position, document)
 
     def _get_new_id(self):
         """Return max id + 1"""
-        if self._documents:
-            return max(d['_id'] for d in self._documents) + 1
-
-        return 1
+        return self._max_id + 1
 
     def insert_many(self, documents):
         """Add new documents in the collection.
@@ -192,27 +322,38 @@ class EphemeralCollection(object):
                 document['_id'] = self._get_new_id()
             ephemeral_document = EphemeralDocument(document)
             self._validate_index(ephemeral_document)
-            self._documents.append(ephemeral_document)
-            self._register_keys(ephemeral_document)
+
+            position = self._next_position
+            self._next_position += 1
+            self._documents[position] = ephemeral_document
+            self._register_keys(position, ephemeral_document)
+
+            if isinstance(document['_id'], int) and not isinstance(document['_id'], bool):
+                self._max_id = max(self._max_id, document['_id'])
 
         return True
 
-    def update_many(self, query, update):
+    def update_many(self, query, update, upsert=True):
         """Update documents or upsert if not found.
 
-        If the document is not found, a new document which is the merge of query and update will be
-        inserted in the database.
+        If the document is not found and `upsert` is True, a new document which is the merge of
+        query and update will be inserted in the database.
 
         :raises: :exc:`DuplicateKeyError`: if the update creates a duplication of unique indexes in
             the database.
         """
         updates = 0
-        for document in self._documents:
-            if document.match(query):
-                document.update(update)
-                updates += 1
+        for position, document in self._match(query):
+            updated_document = copy.copy(document)
+            updated_document.update(update)
+            self._validate_index(updated_document, position)
+
+            self._unregister_keys(position, document)
+            self._documents[position] = updated_document
+            self._register_keys(position, updated_document)
+            updates += 1
 
-        if not updates:
+        if not updates and upsert:
             self._upsert(query, update)
 
         return True
@@ -220,12 +361,13 @@ class EphemeralCollection(object):
     def _upsert(self, query, update):
         """Insert the document when query was not found.
 
-        If update contains `$set`, then the new document is the combination of query and
-        update['$set'], otherwise the new document is `update`.
+        If update contains operators like `$set` or `$inc`, then the new document is the combination
+        of query and the updated values, otherwise the new document is `update`.
         """
-        if "$set" in update:
+        if any(key.startswith('$') for key in update):
             new_document = copy.deepcopy(query)
-            new_document.update(update["$set"])
+            new_document.update(update.get("$set", {}))
+            new_document.update(update.get("$inc", {}))
         else:
             new_document = update
 
@@ -236,7 +378,7 @@ class EphemeralCollection(object):
 
         .. seealso:: :meth:`AbstractDB.count` for argument documentation.
         """
-        return len(self.find(query))
+        return len(self._match(query))
 
     def delete_many(self, query=None):
         """Delete from a collection document[s] which match the `query`.
@@ -244,19 +386,175 @@ class EphemeralCollection(object):
         .. seealso:: :meth:`AbstractDB.remove` for argument documentation.
 
         """
-        retained_documents = []
-        for document in self._documents:
-            if not document.match(query):
-                retained_documents.append(document)
-
-        self._documents = retained_documents
+        for position, document in self._match(query):
+            self._unregister_keys(position, document)
+            del self._documents[position]
 
         return True
 
     def drop(self):
-        """Drop the collection, removing all documents and indexes."""
-        self._documents = []
-        self._indexes = dict()
+        """Drop the collection, removing all documents and indexes but _id unique index."""
+        self._reset()
+
+
+class EphemeralIndex(object):
+    """Non permanent hash index
+
+    Maps the values of some keys to the positions of the documents holding them in an
+    :class:`orion.core.io.database.ephemeraldb.EphemeralCollection`. Missing keys are indexed
+    as `None`, like in MongoDB.
+
+    """
+
+    def __init__(self, keys, unique=False):
+        """Initialise an empty index on the given tuple of keys."""
+        self.keys = keys
+        self.unique = unique
+        self._positions = defaultdict(set)
+
+    def _get_values(self, document):
+        """Return hashable values of the indexed keys in the document"""
+        return tuple(_freeze(document.get(key)) for key in self.keys)
+
+    def validate(self, document, position=None):
+        """Validate index values of a document
+
+        :raises: :exc:`DuplicateKeyError`: if the index is unique and another document already
+            holds the same values.
+        """
+        if not self.unique:
+            return
+
+        values = self._get_values(document)
+        if self._positions.get(values, set()) - {position}:
+            raise DuplicateKeyError(
+                "Duplicate key error: index={} value={}".format(
+                    self.keys, document.select({key: 1 for key in self.keys})))
+
+    def add(self, position, document):
+        """Register index values of a document at the given position"""
+        self._positions[self._get_values(document)].add(position)
+
+    def discard(self, position, document):
+        """Remove index values of a document at the given position"""
+        values = self._get_values(document)
+        self._positions[values].discard(position)
+        if not self._positions[values]:
+            del self._positions[values]
+
+    def lookup(self, query):
+        """Return positions of the documents possibly matching an
+        :class:`orion.core.io.database.ephemeraldb.EphemeralQuery`.
+
+        Returns None if the query does not constrain all indexed keys with an equality or
+        `$in`, in which case the index cannot be used.
+        """
+        candidate_values = []
+        for key in self.keys:
+            if key not in query.candidate_values:
+                return None
+            candidate_values.append(query.candidate_values[key])
+
+        positions = set()
+        for values in itertools.product(*candidate_values):
+            positions |= self._positions.get(tuple(_freeze(value) for value in values), set())
+
+        return positions
+
+
+class EphemeralQuery(object):
+    """Non permanent query
+
+    The query is flattened and its operators are resolved once, so that it can be tested
+    against many documents of an EphemeralCollection.
+
+    Supported operators are $in, $nin, $gt, $gte, $lt, $lte, $ne and $exists. They are
+    defined in the last section of the keys once flattened, for example `abc.def.$in`.
+    Keys without operators are tested for equality, `None` matching missing keys too.
+
+    Attributes
+    ----------
+    query: dict
+        The flattened query.
+    candidate_values: dict
+        Values which keys must have for a document to match, when they are constrained by
+        an equality or `$in`. Used to look up candidate documents in indexes.
+
+    """
+
+    def __init__(self, query=None):
+        """Compile the query"""
+        self.query = _flatten(query or {})
+        self.candidate_values = dict()
+        self._tests = []
+
+        for key, value in self.query.items():
+            path, _, operator_name = key.rpartition(".")
+            if path and operator_name in OPERATORS:
+                if operator_name in ('$in', '$nin'):
+                    value = _as_set(value)
+                if operator_name == '$in':
+                    self.candidate_values[path] = value
+                self._tests.append((OPERATORS[operator_name], path, value))
+            else:
+                if not isinstance(value, dict):
+                    self.candidate_values[key] = [value]
+                self._tests.append((_match_equal, key, value))
+
+    def match(self, document):
+        """Test if the :class:`orion.core.io.database.ephemeraldb.EphemeralDocument` corresponds
+        to the query
+        """
+        for test, key, value in self._tests:
+            if not test(document, key, value):
+                return False
+
+        return True
+
+
+def _match_equal(document, key, value):
+    """Test if the document's value for the key is equal to the given one"""
+    # Like MongoDB, null also matches documents which do not contain the key.
+    if value is None and not document.contains_prefix(key):
+        return True
+
+    return key in document and document[key] == value
+
+
+def _comparison(compare):
+    """Return a test applying `compare` to the document's value for a key and the given one"""
+    def match(document, key, value):
+        """Test if the document contains the key and its value compares as expected"""
+        if key not in document:
+            return False
+
+        # Like MongoDB, values of incomparable types never match.
+        try:
+            return compare(document[key], value)
+        except TypeError:
+            return False
+
+    return match
+
+
+OPERATORS = {
+    "$in": _comparison(lambda a, b: a in b),
+    "$nin": (lambda document, key, value: not OPERATORS["$in"](document, key, value)),
+    "$gte": _comparison(operator.ge),
+    "$gt": _comparison(operator.gt),
+    "$lt": _comparison(operator.lt),
+    "$lte": _comparison(operator.le),
+    "$ne": (lambda document, key, value: not _match_equal(document, key, value)),
+    "$exists": (lambda document, key, value: document.contains_prefix(key) == bool(value))
+}
+
+
+def _as_set(values):
+    """Convert values into a set for faster membership tests, if they are all hashable"""
+    try:
+        return set(values)
+    except TypeError:
+        return list(values)
 
 
 class EphemeralDocument(object):
@@ -268,43 +566,25 @@ class EphemeralDocument(object):
 
     """
 
-    operators = {
-        "$in": (lambda a, b: a in b),
-        "$gte": (lambda a, b: a >= b),
-        "$gt": (lambda a, b: a > b)
-    }
-
     def __init__(self, data):
         """Initialise the document with a flattened version of the data"""
         self._data = _flatten(data)
 
     def match(self, query=None):
-        """Test if the document corresponds to a given query"""
-        if query is None or query == {}:
-            return True
+        """Test if the document corresponds to a given query
 
-        query = _flatten(query)
-        for key, value in query.items():
-            if not self.match_key(key, value):
-                return False
+        .. seealso:: :class:`orion.core.io.database.ephemeraldb.EphemeralQuery` to test many
+            documents against the same query.
 
-        return True
-
-    def match_key(self, key, value):
-        """Test if a data corresponding to the given key is in agreement with the given
-        value based on the operator defined within the key.
-
-        Default operator is equal when no operator is defined.
-        Other operators could be $in, $gte, $gt. They are defined
-        in the last section of the key. For example: `abc.def.$in` or `abc.def.$gte`.
         """
-        if key.split(".")[-1] in self.operators:
-            operator = key.split(".")[-1]
-            key = ".".join(key.split(".")[:-1])
+        if query is None or query == {}:
+            return True
 
-            return key in self and self.operators[operator](self[key], value)
+        return EphemeralQuery(query).match(self)
 
-        return key in self and self[key] == value
+    def contains_prefix(self, key):
+        """Test whether the given key, or any key nested under it, is present in the document"""
+        return key in self or any(data_key.startswith(key + ".") for data_key in self._data)
 
     def _validate_keys(self, keys):
         """Verify that all keys are 0 or 1 (with exception of _id) and convert them.
@@ -379,15 +659,43 @@ class EphemeralDocument(object):
         data: dict
             Dictionary of data to update the document. If `$set` is in
             the data, the corresponding `data[$set]` will be used instead.
+            Values in `data[$inc]` are added to the current ones, missing
+            keys being considered as 0.
 
         """
-        data = _flatten(data.get("$set", data))
-        self._data.update(data)
+        if "$set" in data or "$inc" in data:
+            values = data.get("$set", {})
+        else:
+            values = data
+
+        self._data.update(_flatten(values))
+
+        for key, value in _flatten(data.get("$inc", {})).items():
+            self._data[key] = self._data.get(key, 0) + value
 
     def to_dict(self):
         """Convert the ephemeral document to a python dictionary"""
         return self.select({})
 
+    def get(self, key, default=None):
+        """Get the value of a possibly nested key, `default` if missing"""
+        if key in self._data:
+            return self._data[key]
+
+        prefix = key + "."
+        sub_data = dict((data_key[len(prefix):], value) for data_key, value in self._data.items()
+                        if data_key.startswith(prefix))
+        if sub_data:
+            return _unflatten(sub_data)
+
+        return default
+
+    def __copy__(self):
+        """Return a copy of the document whose values can be updated independently"""
+        document = EphemeralDocument.__new__(EphemeralDocument)
+        document._data = dict(self._data)
+        return document
+
     def __getitem__(self, key):
         """Get the item corresponding to the given key in the document"""
         return self._data[key]
@@ -397,6 +705,35 @@ class EphemeralDocument(object):
         return key in self._data
 
 
+def _sort(matches, keys):
+    """Sort `(position, EphemeralDocument)` pairs according to `keys`, a list of
+    `(key_name, sort_order)` tuples.
+
+    Missing or null values come first in ascending order, like in MongoDB.
+    """
+    matches = list(matches)
+    # Sort on least significant key first, relying on sort stability.
+    for key, sort_order in reversed(keys):
+        def get_value(match, key=key):
+            """Fetch value of a possibly nested key, None if missing"""
+            value = match[1].get(key)
+            return (value is not None, value)
+
+        matches.sort(key=get_value, reverse=sort_order == AbstractDB.DESCENDING)
+
+    return matches
+
+
+def _freeze(value):
+    """Convert a document value into a hashable one, equal values giving equal results"""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(sub_value)) for key, sub_value in value.items()))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+
+    return value
+
+
 def _flatten(dictionary):
     def __flatten(dictionary):
         if dictionary == {}:
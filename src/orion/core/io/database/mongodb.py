@@ -8,7 +8,10 @@
    :synopsis: Implement :class:`orion.core.io.database.AbstractDB` for MongoDB.
 
 """
+import contextlib
 import functools
+import os
+import time
 
 import pymongo
 
@@ -23,6 +26,13 @@ AUTH_FAILED_MESSAGES = [
 DUPLICATE_KEY_MESSAGES = [
     "duplicate key error"]
 
+# Error code of MongoDB servers which are not replica sets, on which change streams fail.
+CHANGE_STREAM_UNSUPPORTED_CODES = [
+    40573]
+
+# Seconds during which `MongoDB.is_connected` trusts the last successful check of the server.
+HEALTH_CHECK_INTERVAL = 30
+
 
 def mongodb_exception_wrapper(method):
     """Convert pymongo exceptions to generic exception types defined in src.core.io.database.
@@ -30,6 +40,7 @@ def mongodb_exception_wrapper(method):
     Current exception types converted:
     pymongo.errors.DuplicateKeyError -> DuplicateKeyError
     pymongo.errors.BulkWriteError[DUPLICATE_KEY_MESSAGES] -> DuplicateKeyError
+    pymongo.errors.BulkWriteError -> DatabaseError
     pymongo.errors.ConnectionFailure -> DatabaseError
     pymongo.errors.OperationFailure(AUTH_FAILED_MESSAGES) -> DatabaseError
 
@@ -42,12 +53,13 @@ def mongodb_exception_wrapper(method):
         except pymongo.errors.DuplicateKeyError as e:
             raise DuplicateKeyError(str(e)) from e
         except pymongo.errors.BulkWriteError as e:
-            for error in e.details['writeErrors']:
-                if any(m in error["errmsg"] for m in DUPLICATE_KEY_MESSAGES):
-                    raise DuplicateKeyError(error["errmsg"]) from e
+            duplicates, errors = _split_bulk_write_errors(e)
+            if errors:
+                raise DatabaseError(_bulk_write_errors_message(errors)) from e
 
-            raise
+            raise DuplicateKeyError(duplicates[0]["errmsg"]) from e
         except pymongo.errors.ConnectionFailure as e:
+            self.invalidate_health_check()
             raise DatabaseError("Connection Failure: database not found on "
                                 "specified uri") from e
         except pymongo.errors.OperationFailure as e:
@@ -61,6 +73,28 @@ def mongodb_exception_wrapper(method):
     return _decorator
 
 
+def _split_bulk_write_errors(exception):
+    """Return the errors of a `pymongo.errors.BulkWriteError` caused by duplicate keys,
+    and the others, including write concern errors.
+    """
+    duplicates = []
+    errors = list(exception.details.get('writeConcernErrors', []))
+    for error in exception.details.get('writeErrors', []):
+        if any(m in error["errmsg"] for m in DUPLICATE_KEY_MESSAGES):
+            duplicates.append(error)
+        else:
+            errors.append(error)
+
+    return duplicates, errors
+
+
+def _bulk_write_errors_message(errors):
+    """Describe the `errors` of a `pymongo.errors.BulkWriteError`."""
+    return "Bulk write failure: " + "; ".join(
+        "{} (document {})".format(error["errmsg"], error["index"]) if "index" in error
+        else error["errmsg"] for error in errors)
+
+
 class MongoDB(AbstractDB):
     """Wrap MongoDB with three primary methods `read`, `write`, `remove`.
 
@@ -69,19 +103,42 @@ class MongoDB(AbstractDB):
     host : str
        Hostname or MongoDB compliant full credentials+address+database
        specification.
+    max_pool_size : int, optional
+       Maximum number of connections the client keeps open to the server, in each
+       process. Defaults to pymongo's choice.
+    min_pool_size : int, optional
+       Minimum number of connections the client keeps open to the server, in each
+       process. Defaults to pymongo's choice.
+    timeout : float, optional
+       Seconds to wait for a server to be available or for a connection to be opened.
+       Defaults to pymongo's choice.
 
     Information on MongoDB `connection string
     <https://docs.mongodb.com/manual/reference/connection-string/>`_.
 
+    The client is created again in processes forked after it was connected, as MongoDB
+    clients cannot be shared across processes.
+
     .. seealso:: :class:`orion.core.io.database.AbstractDB` for more on attributes.
 
     """
 
     def __init__(self, host='localhost', name=None,
-                 port=None, username=None, password=None):
-        """Init method, see attributes of :class:`AbstractDB`."""
+                 port=None, username=None, password=None,
+                 max_pool_size=None, min_pool_size=None, timeout=None):
+        """Init method, see attributes of :class:`AbstractDB` and :class:`MongoDB`."""
         self.options = {'authSource': name}
+        if max_pool_size is not None:
+            self.options['maxPoolSize'] = int(max_pool_size)
+        if min_pool_size is not None:
+            self.options['minPoolSize'] = int(min_pool_size)
+        if timeout is not None:
+            self.options['serverSelectionTimeoutMS'] = int(float(timeout) * 1000)
+            self.options['connectTimeoutMS'] = int(float(timeout) * 1000)
         self.uri = None
+        self._database = None
+        self._pid = None
+        self._last_check = None
 
         super(MongoDB, self).__init__(host, name, port, username, password)
 
@@ -97,22 +154,49 @@ class MongoDB(AbstractDB):
 
         self._sanitize_attrs()
 
+        self._pid = os.getpid()
         self._conn = pymongo.MongoClient(self.uri if self.uri else self.host,
                                          port=self.port,
                                          username=self.username,
                                          password=self.password,
                                          **self.options)
         self._db = self._conn[self.name]
-        self._db.command('ismaster')  # .. seealso:: :meth:`is_connected`
+        self._check_server()  # .. seealso:: :meth:`is_connected`
+
+    @property
+    def _db(self):
+        """Handle on the database, connecting again first if this process was forked
+        after the connection was initiated.
+        """
+        if self._database is not None and self._pid != os.getpid():
+            # Clients inherited from the parent process must not be used, nor closed.
+            self._conn = None
+            self._database = None
+            self.initiate_connection()
+
+        return self._database
+
+    @_db.setter
+    def _db(self, database):
+        self._database = database
 
     @property
     def is_connected(self):
-        """True, if practical connection has been achieved.
+        """True, if practical connection has been achieved in this process.
+
+        A successful check of the server is trusted for `HEALTH_CHECK_INTERVAL` seconds.
 
         .. note:: MongoDB does not do this automatically when creating the client.
         """
+        if self._pid != os.getpid():
+            return False
+
+        if (self._last_check is not None and
+                time.monotonic() - self._last_check < HEALTH_CHECK_INTERVAL):
+            return True
+
         try:
-            self._db.command('ismaster')
+            self._check_server()
         except (pymongo.errors.ConnectionFailure,
                 pymongo.errors.OperationFailure,
                 TypeError, AttributeError):
@@ -121,12 +205,23 @@ class MongoDB(AbstractDB):
             _is_connected = True
         return _is_connected
 
+    def _check_server(self):
+        """Check the server answers, and remember when it did."""
+        self.invalidate_health_check()
+        self._db.command('ismaster')
+        self._last_check = time.monotonic()
+
+    def invalidate_health_check(self):
+        """Make `is_connected` check the server again, after it failed to answer."""
+        self._last_check = None
+
     def close_connection(self):
         """Disconnect from database.
 
         .. note:: Doesn't really do anything because MongoDB reopens connection,
            when a client or client-derived object is accessed.
         """
+        self._last_check = None
         self._conn.close()
 
     def ensure_index(self, collection_name, keys, unique=False):
@@ -166,7 +261,7 @@ class MongoDB(AbstractDB):
                                str(sort_order))
 
     @mongodb_exception_wrapper
-    def write(self, collection_name, data, query=None):
+    def write(self, collection_name, data, query=None, upsert=True):
         """Write new information to a collection. Perform insert or update.
 
         .. seealso:: :meth:`AbstractDB.write` for argument documentation.
@@ -182,28 +277,74 @@ class MongoDB(AbstractDB):
             result = dbcollection.insert_many(documents=data)
             return result.acknowledged
 
-        update_data = {'$set': data}
+        update_data = self._build_update(data)
 
         result = dbcollection.update_many(filter=query,
                                           update=update_data,
-                                          upsert=True)
+                                          upsert=upsert)
         return result.acknowledged
 
-    def read(self, collection_name, query=None, selection=None):
+    @mongodb_exception_wrapper
+    def write_many(self, collection_name, documents, ordered=True):
+        """Insert new documents in a collection, skipping those which are duplicates.
+
+        .. seealso:: :meth:`AbstractDB.write_many` for argument documentation.
+
+        """
+        dbcollection = self._db[collection_name]
+
+        documents = list(documents)
+        try:
+            result = dbcollection.insert_many(documents=documents, ordered=ordered)
+        except pymongo.errors.BulkWriteError as e:
+            duplicates, errors = _split_bulk_write_errors(e)
+            if errors:
+                raise DatabaseError(_bulk_write_errors_message(errors)) from e
+            return e.details['nInserted'], [error['index'] for error in duplicates]
+
+        return len(result.inserted_ids), []
+
+    def read(self, collection_name, query=None, selection=None, sort=None, limit=None,
+             skip=None):
         """Read a collection and return a value according to the query.
 
         .. seealso:: :meth:`AbstractDB.read` for argument documentation.
 
         """
+        cursor = self._find(collection_name, query, selection, sort, limit, skip)
+        dbdocs = list(cursor)
+
+        return dbdocs
+
+    def read_iter(self, collection_name, query=None, selection=None, batch_size=None,
+                  sort=None, limit=None, skip=None):
+        """Read lazily the documents of a collection which match the query.
+
+        .. seealso:: :meth:`AbstractDB.read_iter` for argument documentation.
+
+        """
+        cursor = self._find(collection_name, query, selection, sort, limit, skip)
+        if batch_size is not None:
+            cursor = cursor.batch_size(batch_size)
+
+        return cursor
+
+    def _find(self, collection_name, query, selection, sort, limit, skip):
+        """Return a cursor over the documents matching `query`, in `sort` order."""
         dbcollection = self._db[collection_name]
 
         cursor = dbcollection.find(query, selection)
-        dbdocs = list(cursor)
+        if sort is not None:
+            cursor = cursor.sort(self._convert_index_keys(sort))
+        if skip is not None:
+            cursor = cursor.skip(skip)
+        if limit is not None:
+            cursor = cursor.limit(limit)
 
-        return dbdocs
+        return cursor
 
     @mongodb_exception_wrapper
-    def read_and_write(self, collection_name, query, data, selection=None):
+    def read_and_write(self, collection_name, query, data, selection=None, sort=None):
         """Read a collection's document and update the found document.
 
         Returns the updated document, or None if nothing found.
@@ -214,10 +355,13 @@ class MongoDB(AbstractDB):
         """
         dbcollection = self._db[collection_name]
 
-        update_data = {'$set': data}
+        update_data = self._build_update(data)
+
+        if sort is not None:
+            sort = self._convert_index_keys(sort)
 
         dbdoc = dbcollection.find_one_and_update(
-            query, update_data, projection=selection,
+            query, update_data, projection=selection, sort=sort,
             return_document=pymongo.ReturnDocument.AFTER)
 
         return dbdoc
@@ -231,6 +375,88 @@ class MongoDB(AbstractDB):
         dbcollection = self._db[collection_name]
         return dbcollection.count(filter=query)
 
+    def aggregate(self, collection_name, pipeline):
+        """Compute summaries of a collection inside the database.
+
+        .. seealso:: :meth:`AbstractDB.aggregate` for argument documentation.
+
+        """
+        dbcollection = self._db[collection_name]
+        return list(dbcollection.aggregate(pipeline, allowDiskUse=True))
+
+    def group(self, collection_name, query=None, keys=None, accumulators=None):
+        """Summarize the documents of a collection, grouped by the values of `keys`.
+
+        .. seealso:: :meth:`AbstractDB.group` for argument documentation.
+
+        """
+        keys = list(keys or [])
+        accumulators = self._check_accumulators(accumulators)
+
+        # Keys may be nested, they are renamed by position in the id of the groups.
+        group = {'_id': dict(('k{}'.format(i), '$' + key) for i, key in enumerate(keys))}
+        for name, (operator, key) in accumulators.items():
+            if operator == 'count':
+                group[name] = {'$sum': 1}
+            else:
+                group[name] = {'$' + operator: '$' + key}
+
+        summaries = self.aggregate(collection_name, [{'$match': query or {}}, {'$group': group}])
+        for summary in summaries:
+            group_id = summary.pop('_id')
+            summary.update((key, group_id.get('k{}'.format(i))) for i, key in enumerate(keys))
+
+        return summaries
+
+    def watch_token(self, collection_name):
+        """Return a token marking the current point in the changes of a collection.
+
+        This is the resume token of a change stream, which MongoDB only returns before any
+        change is seen from version 4.0.7.
+
+        .. seealso:: :meth:`AbstractDB.watch_token` for argument documentation.
+
+        """
+        with self._change_stream(collection_name, []) as stream:
+            return getattr(stream, 'resume_token', None)
+
+    def watch(self, collection_name, query, timeout, token=None):
+        """Wait until a document matching the `query` is inserted or updated in a collection.
+
+        This uses a change stream, only available if MongoDB is deployed as a replica set.
+
+        .. seealso:: :meth:`AbstractDB.watch` for argument documentation.
+
+        """
+        match = {'operationType': {'$in': ['insert', 'update', 'replace']}}
+        for key, value in query.items():
+            match['fullDocument.' + key] = value
+
+        deadline = time.monotonic() + timeout
+        with self._change_stream(collection_name, [{'$match': match}],
+                                 full_document='updateLookup', resume_after=token,
+                                 max_await_time_ms=int(timeout * 1000)) as stream:
+            while stream.alive and time.monotonic() < deadline:
+                if stream.try_next() is not None:
+                    return True
+
+        return False
+
+    @contextlib.contextmanager
+    def _change_stream(self, collection_name, pipeline, **kwargs):
+        """Open a change stream on a collection, see :meth:`pymongo.collection.Collection.watch`.
+
+        :raises :exc:`NotImplementedError`: if MongoDB is not deployed as a replica set.
+        """
+        try:
+            with self._db[collection_name].watch(pipeline, **kwargs) as stream:
+                yield stream
+        except pymongo.errors.OperationFailure as e:
+            if e.code in CHANGE_STREAM_UNSUPPORTED_CODES:
+                raise NotImplementedError("MongoDB can only watch changes of replica "
+                                          "sets.") from e
+            raise
+
     def remove(self, collection_name, query):
         """Delete from a collection document[s] which match the `query`.
 
@@ -0,0 +1,632 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`orion.core.io.database.sqlitedb` -- Wrapper for SQLite
+============================================================
+
+.. module:: database
+   :platform: Unix
+   :synopsis: Implement :class:`orion.core.io.database.AbstractDB` for SQLite.
+
+"""
+import contextlib
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+import uuid
+
+import orion.core
+from orion.core.io.database import AbstractDB, DatabaseError, DuplicateKeyError
+from orion.core.io.database.ephemeraldb import EphemeralDocument, EphemeralQuery
+
+# Oldest SQLite with the JSON1 functions and the indexes on expressions used on documents
+MIN_SQLITE_VERSION = (3, 9, 0)
+
+# Keys of documents which are copied in their own columns by every write, so that they can
+# be filtered and indexed by SQLite without extracting them from the documents.
+COLUMNS = ('_id', 'experiment', 'status', 'end_time')
+
+# SQL operators of the comparison operators supported in queries
+COMPARISONS = {'$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='}
+
+DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+class SQLiteDB(AbstractDB):
+    """Wrap SQLite to share experiments between processes of a single node.
+
+    Each collection is a table holding documents serialized in JSON, with a column for
+    each key in `COLUMNS`. Queries are compiled to SQL, except for the parts SQLite
+    cannot evaluate like EphemeralDB does, which are matched in Python. Writes are done
+    in immediate transactions, serializing them across all processes using the same file.
+
+    Attributes
+    ----------
+    host : str
+       Path to the SQLite database file. Defaults to ``<name>.sqlite`` inside Oríon's
+       user data directory if 'localhost' or None.
+
+    The database file is opened again in processes forked after it was opened, as SQLite
+    connections cannot be shared across processes.
+
+    .. seealso:: :class:`orion.core.io.database.AbstractDB` for more on attributes.
+
+    """
+
+    def __init__(self, host='localhost', name=None,
+                 port=None, username=None, password=None):
+        """Init method, see attributes of :class:`AbstractDB`."""
+        self._lock = threading.RLock()
+        self._tables = set()
+        self._connection = None
+        self._pid = None
+
+        super(SQLiteDB, self).__init__(host, name, port, username, password)
+
+    @property
+    def path(self):
+        """Return path to the SQLite database file."""
+        if self.host in (None, 'localhost'):
+            return os.path.join(orion.core.DIRS.user_data_dir,
+                                '{}.sqlite'.format(self.name or 'orion'))
+
+        return self.host
+
+    @property
+    def is_connected(self):
+        """True, if a connection to the database file is opened in this process."""
+        return self._connection is not None and self._pid == os.getpid()
+
+    @property
+    def _conn(self):
+        """Connection to the database file, opened again first if this process was forked
+        after it was opened.
+        """
+        if self._connection is not None and self._pid != os.getpid():
+            # Connections inherited from the parent process must not be used, nor closed,
+            # and their lock may have been held by a thread which does not exist anymore.
+            self._connection = None
+            self._lock = threading.RLock()
+            self.initiate_connection()
+
+        return self._connection
+
+    @_conn.setter
+    def _conn(self, connection):
+        self._connection = connection
+        self._pid = os.getpid()
+
+    def initiate_connection(self):
+        """Open the database file, unless SQLiteDB `is_connected`.
+
+        :raises :exc:`DatabaseError`: if the database file cannot be opened or SQLite
+           is too old.
+
+        """
+        if self.is_connected:
+            return
+
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise DatabaseError("SQLite >= {} is required, found {}".format(
+                '.'.join(map(str, MIN_SQLITE_VERSION)), sqlite3.sqlite_version))
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        try:
+            self._conn = self._connect()
+        except sqlite3.Error as e:
+            self._conn = None
+            raise DatabaseError("Could not open SQLite database at {}: {}".format(
+                self.path, str(e))) from e
+
+        try:
+            self._conn.execute("SELECT json_type('{}')")
+        except sqlite3.OperationalError as e:
+            self._conn.close()
+            self._conn = None
+            raise DatabaseError("SQLite {} was built without the JSON1 extension".format(
+                sqlite3.sqlite_version)) from e
+
+        self._db = self._conn
+        self._tables = set()
+
+    def _connect(self):
+        """Open a new connection to the database file."""
+        # Transactions are handled explicitly, see `SQLiteDB._transaction`.
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def close_connection(self):
+        """Close connection to the database file."""
+        with self._lock:
+            if self.is_connected:
+                self._connection.close()
+            self._conn = None
+            self._db = None
+
+    def ensure_index(self, collection_name, keys, unique=False):
+        """Create given indexes if they do not already exist in database.
+
+        .. seealso:: :meth:`AbstractDB.ensure_index` for argument documentation.
+
+        """
+        if not isinstance(keys, (list, tuple)):
+            keys = [(keys, self.ASCENDING)]
+
+        index_name = '_'.join([collection_name] + [_sanitize(key) for key, _ in keys])
+        columns = ', '.join('{} {}'.format(_column(key), self._convert_sort_order(sort_order))
+                            for key, sort_order in keys)
+
+        with self._transaction() as conn:
+            self._ensure_table(conn, collection_name)
+            try:
+                conn.execute('CREATE {}INDEX IF NOT EXISTS "{}" ON "{}" ({})'.format(
+                    'UNIQUE ' if unique else '', index_name, collection_name, columns))
+            except sqlite3.IntegrityError as e:
+                raise DuplicateKeyError(str(e)) from e
+
+    def _convert_sort_order(self, sort_order):
+        """Convert generic `AbstractDB` sort orders to SQL ones."""
+        if sort_order is self.DESCENDING:
+            return 'DESC'
+
+        return 'ASC'
+
+    def write(self, collection_name, data, query=None, upsert=True):
+        """Write new information to a collection. Perform insert or update.
+
+        .. seealso:: :meth:`AbstractDB.write` for argument documentation.
+
+        """
+        if query is None:
+            # We can assume that we do not want to update.
+            # So we do insert_many instead.
+            if type(data) not in (list, tuple):
+                data = [data]
+            return self._insert(collection_name, data)
+
+        update_data = self._build_update(data)
+
+        with self._transaction() as conn:
+            documents = self._find(conn, collection_name, query)
+            for rowid, document in documents:
+                document.update(update_data)
+                self._replace(conn, collection_name, rowid, document)
+
+            if not documents and upsert:
+                self._upsert(conn, collection_name, query, update_data)
+
+        return True
+
+    def write_many(self, collection_name, documents, ordered=True):
+        """Insert new documents in a collection, skipping those which are duplicates.
+
+        .. seealso:: :meth:`AbstractDB.write_many` for argument documentation.
+
+        """
+        n_inserted, errors = self._insert_many(collection_name, documents, ordered)
+        return n_inserted, [index for index, _ in errors]
+
+    def _insert_many(self, collection_name, documents, ordered=True):
+        """Insert documents one by one in a single transaction, keeping those which are
+        not duplicates.
+
+        If the documents do not have a key `_id`, they are assigned a unique one.
+
+        :returns: the number of inserted documents and a list of pairs (index, error) for
+           the documents which are duplicates. If `ordered`, insertion stops at the first one.
+        """
+        n_inserted = 0
+        errors = []
+        with self._transaction() as conn:
+            for index, document in enumerate(documents):
+                try:
+                    self._insert_document(conn, collection_name, document)
+                except sqlite3.IntegrityError as e:
+                    errors.append((index, e))
+                    if ordered:
+                        break
+                else:
+                    n_inserted += 1
+
+        return n_inserted, errors
+
+    def _insert(self, collection_name, documents):
+        """Insert documents, keeping those inserted before a duplicate key error."""
+        _, errors = self._insert_many(collection_name, documents)
+        if errors:
+            error = errors[0][1]
+            raise DuplicateKeyError(str(error)) from error
+
+        return True
+
+    def _upsert(self, conn, collection_name, query, update):
+        """Insert the combination of `query` and `update` when `query` was not found."""
+        new_document = EphemeralDocument({key: value for key, value in query.items()
+                                          if not isinstance(value, dict)})
+        new_document.update(update)
+        try:
+            self._insert_document(conn, collection_name, new_document.to_dict())
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e)) from e
+
+    def read(self, collection_name, query=None, selection=None, sort=None, limit=None,
+             skip=None):
+        """Read a collection and return a value according to the query.
+
+        .. seealso:: :meth:`AbstractDB.read` for argument documentation.
+
+        """
+        with self._lock:
+            documents = self._find(self._conn, collection_name, query, sort=sort, limit=limit,
+                                   skip=skip)
+
+        return [document.select(selection) for _, document in documents]
+
+    def read_iter(self, collection_name, query=None, selection=None, batch_size=None,
+                  sort=None, limit=None, skip=None):
+        """Read lazily the documents of a collection which match the query.
+
+        Documents are read through a connection of their own, from a snapshot of the
+        database taken when the first one is read, so that other threads and processes
+        can write meanwhile. Rows are stepped through one at a time by SQLite, `batch_size`
+        is not needed.
+
+        .. seealso:: :meth:`AbstractDB.read_iter` for argument documentation.
+
+        """
+        with self._lock:
+            self._ensure_table(self._conn, collection_name)
+
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN')
+            for _, document in self._iter_find(conn, collection_name, query, sort=sort,
+                                               limit=limit, skip=skip):
+                yield document.select(selection)
+        finally:
+            # Ends the read transaction
+            conn.close()
+
+    def read_and_write(self, collection_name, query, data, selection=None, sort=None):
+        """Read a collection's document and update the found document.
+
+        Returns the updated document, or None if nothing found.
+
+        .. seealso:: :meth:`AbstractDB.read_and_write` for
+                     argument documentation.
+
+        """
+        with self._transaction() as conn:
+            documents = self._find(conn, collection_name, query, sort=sort, limit=1)
+            if not documents:
+                return None
+
+            rowid, document = documents[0]
+            document.update(self._build_update(data))
+            document = self._replace(conn, collection_name, rowid, document)
+
+        return document.select(selection)
+
+    def count(self, collection_name, query=None):
+        """Count the number of documents in a collection which match the `query`.
+
+        .. seealso:: :meth:`AbstractDB.count` for argument documentation.
+
+        """
+        with self._lock:
+            self._ensure_table(self._conn, collection_name)
+            clauses, parameters, remaining = _compile_query(query)
+            if remaining is not None:
+                return len(self._find(self._conn, collection_name, query))
+
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM "{}"{}'.format(collection_name, _where(clauses)),
+                parameters).fetchone()[0]
+
+    def aggregate(self, collection_name, pipeline):
+        """Refuse to run aggregation pipelines, SQLiteDB only summarizes documents while
+        reading them, see :meth:`AbstractDB.group`.
+
+        .. seealso:: :meth:`AbstractDB.aggregate` for argument documentation.
+
+        :raises :exc:`NotImplementedError`: always.
+
+        """
+        raise NotImplementedError("SQLiteDB does not support aggregation pipelines.")
+
+    def watch_token(self, collection_name):
+        """Refuse to mark changes of collections, SQLiteDB cannot watch them.
+
+        .. seealso:: :meth:`AbstractDB.watch_token` for argument documentation.
+
+        :raises :exc:`NotImplementedError`: always.
+
+        """
+        raise NotImplementedError("SQLiteDB cannot watch changes of collections.")
+
+    def watch(self, collection_name, query, timeout, token=None):
+        """Refuse to watch changes of collections, callers must poll them with
+        :meth:`SQLiteDB.read` instead.
+
+        .. seealso:: :meth:`AbstractDB.watch` for argument documentation.
+
+        :raises :exc:`NotImplementedError`: always.
+
+        """
+        raise NotImplementedError("SQLiteDB cannot watch changes of collections.")
+
+    def remove(self, collection_name, query):
+        """Delete from a collection document[s] which match the `query`.
+
+        .. seealso:: :meth:`AbstractDB.remove` for argument documentation.
+
+        """
+        with self._transaction() as conn:
+            self._ensure_table(conn, collection_name)
+            clauses, parameters, remaining = _compile_query(query)
+            if remaining is None:
+                conn.execute('DELETE FROM "{}"{}'.format(collection_name, _where(clauses)),
+                             parameters)
+                return True
+
+            for rowid, _ in self._find(conn, collection_name, query):
+                conn.execute('DELETE FROM "{}" WHERE rowid = ?'.format(collection_name),
+                             (rowid, ))
+
+        return True
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Run statements in a transaction holding the database's write lock from the start."""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def _ensure_table(self, conn, collection_name):
+        """Create the table of a collection if it does not already exist."""
+        if collection_name in self._tables:
+            return
+
+        conn.execute('CREATE TABLE IF NOT EXISTS "{}" (document TEXT NOT NULL, {})'.format(
+            collection_name, ', '.join(COLUMNS)))
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS "{0}__id" ON "{0}" (_id)'.format(
+            collection_name))
+        self._tables.add(collection_name)
+
+    def _find(self, conn, collection_name, query, sort=None, limit=None, skip=None):
+        """Return list of `(rowid, EphemeralDocument)` matching `query`, in `sort` order.
+
+        .. seealso:: :meth:`SQLiteDB._iter_find`
+        """
+        return list(self._iter_find(conn, collection_name, query, sort=sort, limit=limit,
+                                    skip=skip))
+
+    def _iter_find(self, conn, collection_name, query, sort=None, limit=None, skip=None):
+        """Yield `(rowid, EphemeralDocument)` matching `query`, in `sort` order then
+        insertion order.
+
+        The query is compiled to SQL together with `limit` and `skip`. If some parts of the
+        query cannot be compiled, they are matched in Python like in
+        :class:`orion.core.io.database.ephemeraldb.EphemeralDB`, and so are `limit` and `skip`.
+        """
+        self._ensure_table(conn, collection_name)
+
+        clauses, parameters, remaining = _compile_query(query)
+        statement = 'SELECT rowid, document FROM "{}"{} ORDER BY {}'.format(
+            collection_name, _where(clauses),
+            ', '.join(['{} {}'.format(_column(key), self._convert_sort_order(sort_order))
+                       for key, sort_order in (sort or [])] + ['rowid']))
+        if remaining is None and (limit is not None or skip):
+            statement += ' LIMIT ? OFFSET ?'
+            parameters.extend([limit if limit is not None else -1, skip or 0])
+            limit, skip = None, None
+
+        matcher = EphemeralQuery(remaining)
+        n_matched = 0
+        for rowid, document in conn.execute(statement, parameters):
+            if limit is not None and n_matched >= (skip or 0) + limit:
+                break
+
+            document = EphemeralDocument(_decode(document))
+            if remaining is not None and not matcher.match(document):
+                continue
+
+            n_matched += 1
+            if n_matched > (skip or 0):
+                yield rowid, document
+
+    def _insert_document(self, conn, collection_name, document):
+        """Insert a document, assigning it a unique `_id` if it does not have one.
+
+        :raises :exc:`sqlite3.IntegrityError`: if the document is a duplicate.
+        """
+        self._ensure_table(conn, collection_name)
+        if '_id' not in document:
+            document['_id'] = uuid.uuid4().hex
+
+        conn.execute(
+            'INSERT INTO "{}" (document, {}) VALUES (?{})'.format(
+                collection_name, ', '.join(COLUMNS), ', ?' * len(COLUMNS)),
+            [_encode(document)] + _column_values(document))
+
+    def _replace(self, conn, collection_name, rowid, document):
+        """Replace the document at `rowid` and return the one saved."""
+        document = document.to_dict()
+        encoded_document = _encode(document)
+        try:
+            conn.execute(
+                'UPDATE "{}" SET document = ?, {} WHERE rowid = ?'.format(
+                    collection_name, ', '.join('{} = ?'.format(key) for key in COLUMNS)),
+                [encoded_document] + _column_values(document) + [rowid])
+        except sqlite3.IntegrityError as e:
+            raise DuplicateKeyError(str(e)) from e
+
+        return EphemeralDocument(_decode(encoded_document))
+
+
+def _sanitize(key):
+    """Turn a document key into a valid part of an SQL identifier"""
+    return re.sub(r'\W', '_', key)
+
+
+def _json_path(key):
+    """Return SQL JSON path of a possibly nested key of a document"""
+    return "'$.{}'".format('.'.join('"{}"'.format(part) for part in key.split('.')))
+
+
+def _column(key, value=None):
+    """Return column of a key if any, else SQL expression extracting it from the document.
+
+    Datetimes are compared through their encoded string, see `_encode_value`.
+    """
+    if key in COLUMNS:
+        return key
+
+    if isinstance(value, datetime.datetime):
+        key += '.$date'
+
+    return 'json_extract(document, {})'.format(_json_path(key))
+
+
+def _column_value(value):
+    """Return the value saved in the column of a key of a document"""
+    if value is None or _is_scalar(value):
+        return value
+
+    if isinstance(value, datetime.datetime):
+        return value.strftime(DATETIME_FORMAT)
+
+    # Never equal to the parameters of compiled queries, see `_is_sql_value`.
+    return _encode(value)
+
+
+def _column_values(document):
+    """Return the values of `COLUMNS` for a document"""
+    return [_column_value(document.get(key)) for key in COLUMNS]
+
+
+def _is_scalar(value):
+    """Test if a value is stored as is in SQL by `json_extract`"""
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+
+def _is_column_value(value):
+    """Test if a value of a query can be compared in SQL like EphemeralDB does"""
+    return _is_scalar(value) or isinstance(value, datetime.datetime)
+
+
+def _where(clauses):
+    """Return the SQL WHERE clause combining `clauses`, if any"""
+    if not clauses:
+        return ''
+
+    return ' WHERE ' + ' AND '.join(clauses)
+
+
+def _compile_query(query):
+    """Convert `query` into SQL clauses and their parameters.
+
+    :returns: the clauses, their parameters and the part of the query which could not be
+       compiled and must be matched in Python, None if there is none.
+    """
+    clauses = []
+    parameters = []
+    remaining = {}
+    for key, value in (query or {}).items():
+        if isinstance(value, dict) and value and all(name.startswith('$') for name in value):
+            conditions = [_compile_condition(key, name, operand)
+                          for name, operand in value.items()]
+        else:
+            conditions = [_compile_condition(key, None, value)]
+
+        if any(condition is None for condition in conditions):
+            remaining[key] = value
+            continue
+
+        for clause, clause_parameters in conditions:
+            clauses.append(clause)
+            parameters.extend(clause_parameters)
+
+    return clauses, parameters, remaining or None
+
+
+# pylint:disable=too-many-return-statements
+def _compile_condition(key, operator_name, operand):
+    """Convert the condition of `operator_name` on a key into an SQL clause and its
+    parameters, equality if None.
+
+    :returns: None if SQLite cannot evaluate the condition like EphemeralDB does.
+    """
+    if operator_name == '$exists':
+        # `json_type` distinguishes null values from missing keys, unlike `json_extract`
+        return 'json_type(document, {}) IS {}NULL'.format(
+            _json_path(key), 'NOT ' if operand else ''), []
+
+    if operator_name in (None, '$ne') and operand is None:
+        return '{} IS {}NULL'.format(_column(key), 'NOT ' if operator_name else ''), []
+
+    if operator_name in ('$in', '$nin'):
+        operand = list(operand)
+        kinds = set(isinstance(item, datetime.datetime) for item in operand)
+        if not all(_is_column_value(item) for item in operand) or len(kinds) > 1:
+            return None
+
+        column = _column(key, operand[0] if operand else None)
+        placeholders = ', '.join('?' * len(operand))
+        parameters = [_column_value(item) for item in operand]
+        if operator_name == '$in':
+            return '{} IN ({})'.format(column, placeholders), parameters
+
+        return '({0} IS NULL OR {0} NOT IN ({1}))'.format(column, placeholders), parameters
+
+    if not _is_column_value(operand):
+        return None
+
+    column = _column(key, operand)
+    if operator_name is None:
+        return '{} = ?'.format(column), [_column_value(operand)]
+
+    if operator_name == '$ne':
+        return '{} IS NOT ?'.format(column), [_column_value(operand)]
+
+    if operator_name in COMPARISONS:
+        return '{} {} ?'.format(column, COMPARISONS[operator_name]), [_column_value(operand)]
+
+    return None
+
+
+def _encode_value(value):
+    """Encode values which are not supported by JSON"""
+    if isinstance(value, datetime.datetime):
+        return {'$date': value.strftime(DATETIME_FORMAT)}
+
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
+
+
+def _decode_object(dictionary):
+    """Decode values encoded by `_encode_value`"""
+    if list(dictionary.keys()) == ['$date']:
+        return datetime.datetime.strptime(dictionary['$date'], DATETIME_FORMAT)
+
+    return dictionary
+
+
+def _encode(document):
+    """Serialize a document in JSON"""
+    return json.dumps(document, default=_encode_value)
+
+
+def _decode(document):
+    """Deserialize a document from JSON"""
+    return json.loads(document, object_hook=_decode_object)
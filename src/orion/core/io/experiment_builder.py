@@ -47,6 +47,8 @@ hierarchy. From the more global to the more specific, there is:
       * `ORION_DB_TYPE`
       * `ORION_DB_ADDRESS`
 
+    - Trial hash type of new experiments: `ORION_TRIAL_HASH`
+
 3. Experiment configuration inside the database
 
   Configuration of the experiment if present in the database.
@@ -178,6 +180,11 @@ class ExperimentBuilder(object):
         exp_config = resolve_config.merge_configs(
             default_options, env_vars, copy.deepcopy(config_from_db), cmdconfig, cmdargs, metadata)
 
+        # Only used by new experiments, see `Experiment.trial_hash`
+        trial_hash = exp_config.pop('trial_hash', None)
+        if trial_hash is not None:
+            exp_config['metadata']['trial_hash'] = trial_hash
+
         # TODO: Find a better solution
         if isinstance(exp_config['algorithms'], dict) and len(exp_config['algorithms']) > 1:
             for key in list(config_from_db['algorithms'].keys()):
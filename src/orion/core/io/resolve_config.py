@@ -17,6 +17,11 @@ How:
 
 .. seealso:: :const:`ENV_VARS`, :const:`ENV_VARS_DB`
 
+ - Trial hash type, only used by new experiments, resolves like this:
+    * cmd-arg **>** cmd-provided orion_config **>** env var **>** default files **>** md5
+
+.. seealso:: :const:`ENV_VAR_TRIAL_HASH`
+
 
  - All other managerial, `Optimization` or `Dynamic` options resolve like this:
 
@@ -56,6 +61,10 @@ log = logging.getLogger(__name__)
 # Default settings for command line arguments (option, description)
 DEF_CMD_MAX_TRIALS = (infinity, 'inf/until preempted')
 DEF_CMD_POOL_SIZE = (10, str(10))
+DEF_CMD_N_WORKERS = (1, str(1))
+DEF_CMD_BATCH_SIZE = (1, str(1))
+DEF_CMD_IS_DONE_TTL = (0, str(0))
+DEF_CMD_TRIAL_HASH = ('md5', 'md5')
 
 DEF_CONFIG_FILES_PATHS = [
     os.path.join(orion.core.DIRS.site_data_dir, 'orion_config.yaml.example'),
@@ -71,6 +80,10 @@ ENV_VARS_DB = [
     ('ORION_DB_ADDRESS', 'host', socket.gethostbyname(socket.gethostname()))
     ]
 
+# environmental variable name for the function computing ids of the trials of new
+# experiments, see `orion.core.worker.trial.Trial.hash_type`
+ENV_VAR_TRIAL_HASH = 'ORION_TRIAL_HASH'
+
 # TODO: Default resource from environmental (localhost)
 
 # dictionary describing lists of environmental tuples (e.g. `ENV_VARS_DB`)
@@ -153,6 +166,10 @@ def fetch_env_vars():
             if value is not None:
                 env_vars[signif][key] = value
 
+    trial_hash = os.getenv(ENV_VAR_TRIAL_HASH)
+    if trial_hash is not None:
+        env_vars['trial_hash'] = trial_hash
+
     return env_vars
 
 
@@ -10,6 +10,9 @@
 
 """
 
+import numpy
+
+from orion.algo.space import PointArray
 from orion.core.worker.trial import Trial
 
 
@@ -61,6 +64,41 @@ def get_trial_results(trial):
     return results
 
 
+class TrialBatch(object):
+    """Parameters and results of many `orion.core.worker.trial.Trial` objects.
+
+    Attributes
+    ----------
+    points : `orion.algo.space.PointArray`
+       Parameters of the trials, one column per dimension of the space.
+    results : list of dicts
+       Results of the trials, as formatted by `get_trial_results`.
+    objectives : `numpy.ndarray`
+       Objective of the trials, `nan` for those without one.
+
+    """
+
+    def __init__(self, points, results):
+        """Initialize from points and their corresponding results."""
+        assert len(points) == len(results)
+        self.points = points
+        self.results = results
+        self.objectives = numpy.array(
+            [result['objective'] if result['objective'] is not None else numpy.nan
+             for result in results], dtype=float)
+
+    @classmethod
+    def from_trials(cls, trials, space):
+        """Extract points and results from a list of `orion.core.worker.trial.Trial`."""
+        points = PointArray.from_points([trial_to_tuple(trial, space) for trial in trials],
+                                        space)
+        return cls(points, [get_trial_results(trial) for trial in trials])
+
+    def __len__(self):
+        """Return the number of trials."""
+        return len(self.results)
+
+
 def standard_param_name(name):
     """Convert parameter name to namespace format"""
     return name.lstrip("/").lstrip("-").replace("-", "_")
@@ -9,6 +9,8 @@
       with parameter values suggested.
 
 """
+import collections
+from concurrent import futures
 import io
 import logging
 import pprint
@@ -16,48 +18,223 @@ import pprint
 from orion.core.io.database import Database
 from orion.core.worker.consumer import Consumer
 from orion.core.worker.producer import Producer
+from orion.core.worker.reservation import HEARTBEAT_INTERVAL
+from orion.core.worker.scheduler import Scheduler
 
 log = logging.getLogger(__name__)
 
 
-def workon(experiment):
-    """Try to find solution to the search problem defined in `experiment`."""
-    producer = Producer(experiment)
-    consumer = Consumer(experiment)
+def _wait_for_slot(experiment, running, reserved, return_when=futures.FIRST_COMPLETED):
+    """Block until some of the `running` consumptions finish and forget about them.
 
-    log.debug("#####  Init Experiment  #####")
+    Meanwhile, the heartbeat of the `reserved` trials waiting to be consumed is
+    updated every `HEARTBEAT_INTERVAL` seconds, so that they are not considered lost.
+
+    Exceptions raised while consuming a trial (including `SystemExit`) are
+    re-raised in the calling thread.
+    """
     while True:
-        log.debug("#### Try to reserve a new trial to evaluate.")
-        trial = experiment.reserve_trial(score_handle=producer.algorithm.score)
+        done, not_done = futures.wait(running, timeout=HEARTBEAT_INTERVAL,
+                                      return_when=return_when)
+        if not not_done or (done and return_when == futures.FIRST_COMPLETED):
+            break
+
+        _update_heartbeats(experiment, reserved)
+
+    for future in done:
+        running.remove(future)
+        future.result()
+
+
+def _update_heartbeats(experiment, reserved):
+    """Update the heartbeat of `reserved` trials, forgetting those this worker lost."""
+    for trial in list(reserved):
+        if not experiment.update_heartbeat(trial):
+            log.debug("#### %s was reserved by another worker meanwhile, forget it.", trial)
+            reserved.remove(trial)
+
+
+def _reserve_trials(experiment, batch_size, score_handle):
+    """Reserve a batch of trials, or a single one if they must be scored.
+
+    A single trial is reserved by the database in one operation, see
+    `orion.core.worker.experiment.Experiment.reserve_trial`.
+    """
+    if score_handle is None and batch_size > 1:
+        return experiment.reserve_trials(batch_size)
+
+    trial = experiment.reserve_trial(score_handle=score_handle)
+    return [trial] if trial is not None else []
+
+
+def _reserve_next_trial(experiment, reserved, batch_size, score_handle):
+    """Return the next trial to evaluate, reserving new ones if none is waiting.
+
+    Trials waiting since the last reservation may have been lost meanwhile, those are
+    skipped. Return None if there is nothing to reserve.
+    """
+    while reserved:
+        trial = reserved.popleft()
+        if experiment.update_heartbeat(trial):
+            return trial
+
+        log.debug("#### %s was reserved by another worker meanwhile, skip it.", trial)
+
+    log.debug("#### Try to reserve new trials to evaluate.")
+    reserved.extend(_reserve_trials(experiment, batch_size, score_handle))
+    return reserved.popleft() if reserved else None
+
+
+def _idle_step(experiment, producer, scheduler, produced, running):
+    """Update the algorithm and produce new trials when there is nothing to reserve.
+
+    If the trials `produced` last time were all reserved by other workers, first wait
+    for trials to change according to `scheduler`.
+
+    Return False if the worker must stop, because the experiment is done or because
+    the search space is exhausted and no trial is `running` anymore.
+    """
+    log.debug("#### Failed to pull a new trial from database.")
+    if produced:
+        # Trials produced last time were reserved by other workers
+        scheduler.wait()
+
+    log.debug("#### Fetch most recent completed trials and update algorithm.")
+    producer.update()
+
+    log.debug("#### Poll for experiment termination.")
+    if experiment.is_done:
+        return False
+
+    if producer.is_exhausted:
+        log.info("#### All points of the search space were already suggested.")
+        return bool(running)
+
+    log.debug("#### Produce new trials.")
+    producer.produce()
+    return True
 
-        if trial is None:
-            log.debug("#### Failed to pull a new trial from database.")
 
-            log.debug("#### Fetch most recent completed trials and update algorithm.")
-            producer.update()
+def _submit(executor, consumer, trial, running):
+    """Start consuming `trial` in `executor` and add it to the `running` consumptions."""
+    log.debug("#### Successfully reserved %s to evaluate. Consuming...", trial)
+    running.add(executor.submit(consumer.consume, trial))
 
-            log.debug("#### Poll for experiment termination.")
-            if experiment.is_done:
+
+def _evaluate_trials(experiment, producer, consumer, scheduler, reserved, n_workers,
+                     batch_size):
+    """Reserve and evaluate trials of `experiment` until it is done.
+
+    Up to `n_workers` trials are evaluated concurrently. When there is nothing to
+    reserve, the `producer` suggests new trials, waiting according to `scheduler` if
+    those it produced previously were reserved by other workers. Trials reserved but not
+    evaluated yet are kept in `reserved`.
+    """
+    score_handle = None
+    if producer.algorithm.overrides_score:
+        score_handle = producer.algorithm.score
+
+    with futures.ThreadPoolExecutor(max_workers=n_workers) as executor:
+        running = set()
+        produced = False
+        while True:
+            if len(running) >= n_workers:
+                log.debug("#### All %d slots are busy, wait for a trial to complete.",
+                          n_workers)
+                _wait_for_slot(experiment, running, reserved)
+                if experiment.is_done:
+                    break
+                continue
+
+            if produced:
+                # Trials changing from now on must wake up the worker if it waits
+                # because other workers reserved those it produced
+                scheduler.mark()
+
+            trial = _reserve_next_trial(experiment, reserved, batch_size, score_handle)
+
+            if trial is not None:
+                _submit(executor, consumer, trial, running)
+                produced = False
+                scheduler.reset()
+
+            elif running and produced:
+                log.debug("#### Nothing left to reserve, wait for a running trial to complete.")
+                _wait_for_slot(experiment, running, reserved)
+                produced = False
+                if experiment.is_done:
+                    break
+
+            elif _idle_step(experiment, producer, scheduler, produced, running):
+                produced = True
+
+            else:
                 break
 
-            log.debug("#### Produce new trials.")
-            producer.produce()
+        if running:
+            log.debug("#### Wait for %d running trials to complete.", len(running))
+            _wait_for_slot(experiment, running, reserved, return_when=futures.ALL_COMPLETED)
 
-        else:
-            log.debug("#### Successfully reserved %s to evaluate. Consuming...", trial)
-            consumer.consume(trial)
 
+def _log_results(experiment):
+    """Log the statistics of `experiment` and the parameters of its best trial."""
     stats = experiment.stats
-    best = Database().read('trials', {'_id': stats['best_trials_id']})[0]
 
     stats_stream = io.StringIO()
     pprint.pprint(stats, stream=stats_stream)
     stats_string = stats_stream.getvalue()
 
+    log.info("#####  Search finished successfully  #####")
+    log.info("\nRESULTS\n=======\n%s\n", stats_string)
+
+    if stats['best_trials_id'] is None:
+        log.info("\nNo trials were completed.")
+        return
+
+    best = Database().read('trials', {'_id': stats['best_trials_id']},
+                           selection={'params': 1})[0]
+
     best_stream = io.StringIO()
     pprint.pprint(best['params'], stream=best_stream)
     best_string = best_stream.getvalue()
 
-    log.info("#####  Search finished successfully  #####")
-    log.info("\nRESULTS\n=======\n%s\n", stats_string)
     log.info("\nBEST PARAMETERS\n===============\n%s", best_string)
+
+
+def workon(experiment, n_workers=1, batch_size=1):
+    """Try to find solution to the search problem defined in `experiment`.
+
+    :param n_workers: How many trials can be evaluated concurrently by this
+       worker. Each of them is executed in its own subprocess, the worker
+       reserving new trials as soon as a slot is freed.
+    :type n_workers: int
+    :param batch_size: How many trials to reserve at once from the database.
+       Reserved trials are evaluated before reserving new ones, those remaining
+       when the worker exits are released. Ignored if the algorithm scores trials
+       to decide which one to reserve.
+    :type batch_size: int
+    """
+    if n_workers < 1:
+        raise ValueError("Number of workers must be at least 1, got: {}".format(n_workers))
+
+    if batch_size < 1:
+        raise ValueError("Batch size must be at least 1, got: {}".format(batch_size))
+
+    producer = Producer(experiment)
+    consumer = Consumer(experiment)
+    scheduler = Scheduler(experiment)
+
+    log.debug("#####  Init Experiment  #####")
+    reserved = collections.deque()
+    try:
+        _evaluate_trials(experiment, producer, consumer, scheduler, reserved,
+                         n_workers, batch_size)
+    finally:
+        if reserved:
+            log.debug("#### Release %d reserved trials not evaluated.", len(reserved))
+            experiment.release_trials(list(reserved))
+
+    log.info("#### Worker was idle for %(idle_time).1f seconds, waiting %(n_waits)d times "
+             "and woken up %(n_wakeups)d times by new trials.", scheduler.stats)
+
+    _log_results(experiment)
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# pylint:disable=protected-access
+"""
+:mod:`orion.core.worker.completion` -- Record and fetch completed trials
+=========================================================================
+
+.. module:: completion
+   :platform: Unix
+   :synopsis: Number completed trials in the database, count them and fetch those not yet seen.
+
+"""
+import datetime
+import logging
+import time
+
+from orion.core.io.database import Database
+from orion.core.worker.trial import Trial
+
+log = logging.getLogger(__name__)
+
+# How many completion sequence numbers are covered by each read of completed trials.
+FETCH_PAGE_SIZE = 1000
+
+# After how long a completion sequence number which matches no completed trial is not read
+# again, when the worker which took it died or found its trial already completed.
+MISSING_SEQ_TIMEOUT = datetime.timedelta(minutes=10)
+
+# Default number of seconds during which the number of completed trials last read from the
+# database is reused. With 0, it is read every time.
+IS_DONE_TTL = 0
+
+
+class CompletionTracker(object):
+    """Record completed trials of an experiment and fetch those completed since a watermark.
+
+    Each completed trial is given the next completion sequence number of the experiment,
+    assigned by the database whatever the clocks of the workers, and is added to a counter
+    of completed trials in the experiment's document.
+
+    A watermark is the pair of the last completion sequence number read and of the
+    sequence numbers below it which did not match any trial yet, by when they were first
+    found missing.
+
+    Attributes
+    ----------
+    ttl : float
+       Number of seconds during which `count_completed_trials` reuses the number of
+       completed trials last read from the database.
+
+    """
+
+    def __init__(self, experiment):
+        """Initialize a tracker.
+
+        :param experiment: `Experiment` whose completed trials are tracked, through its
+           database.
+        """
+        self.experiment = experiment
+        self.ttl = IS_DONE_TTL
+        self._num_completed_trials = None
+
+    @property
+    def _db(self):
+        """Database of the experiment, which may be replaced by a read-only one."""
+        return self.experiment._db
+
+    def push_completed_trial(self, trial):
+        """Inform database about an evaluated `trial` with results.
+
+        Change status from *reserved* to *completed*, giving the trial the next completion
+        sequence number, and add it to the counter of completed trials.
+
+        :type trial: `Trial`
+        """
+        trial.end_time = datetime.datetime.utcnow()
+        trial.status = 'completed'
+
+        # The sequence number is assigned by the database, whatever the clocks of the workers.
+        experiment = self._db.read_and_write('experiments', {'_id': self.experiment.id},
+                                             {'$inc': {'completion_seq': 1}},
+                                             selection={'completion_seq': 1})
+        document = trial.to_dict()
+        if experiment is not None:
+            document['completion_seq'] = experiment['completion_seq']
+
+        # Query on status so that a trial completed twice is only counted once.
+        query = {'_id': trial.id,
+                 'status': {'$in': [status for status in Trial.allowed_stati
+                                    if status != 'completed']}}
+        if self._db.read_and_write('trials', query, document, selection={'_id': 1}) is None:
+            log.warning("Trial %s was already completed, it is not counted again.", trial.id)
+            return
+
+        # Trials completed before the counter existed are added once, see `init_counter`.
+        self._db.write('experiments', {'$inc': {'trials_completed': 1}},
+                       query={'_id': self.experiment.id}, upsert=False)
+
+    def init_counter(self):
+        """Add to the counter of completed trials those completed by older versions of Oríon.
+
+        Trials completed since then are counted by `push_completed_trial` and have a
+        completion sequence number, so the others can be counted at any time without
+        missing concurrent completions. Only the first worker to add them succeeds, the
+        number added being saved in the experiment's document.
+        """
+        query = dict(
+            experiment=self.experiment.id,
+            status='completed',
+            completion_seq=None
+            )
+        num_legacy_trials = self._db.count('trials', query)
+        self._db.write('experiments',
+                       {'$inc': {'trials_completed': num_legacy_trials},
+                        '$set': {'legacy_trials_completed': num_legacy_trials}},
+                       query={'_id': self.experiment.id, 'legacy_trials_completed': None},
+                       upsert=False)
+
+    def count_completed_trials(self, max_trials):
+        """Return the number of completed trials, from cache if not older than `ttl`."""
+        now = time.time()
+        if (self._num_completed_trials is not None and
+                now - self._num_completed_trials[0] < self.ttl):
+            return self._num_completed_trials[1]
+
+        num_completed_trials = self._read_num_completed_trials(max_trials)
+        self._num_completed_trials = (now, num_completed_trials)
+        return num_completed_trials
+
+    def _read_num_completed_trials(self, max_trials):
+        """Read the number of completed trials from the counter in the experiment's document.
+
+        `push_completed_trial` increments the counter after marking the trial as completed,
+        so it is short while completions are in progress, and forever if a worker died in
+        between. Trials are counted instead when fewer completions were counted than
+        completion sequence numbers were assigned, unless the counter already reached
+        `max_trials`. They are also counted if the document has no complete counter yet.
+        """
+        experiment = self._db.read('experiments', {'_id': self.experiment.id},
+                                   selection={'trials_completed': 1,
+                                              'legacy_trials_completed': 1,
+                                              'completion_seq': 1})
+        if experiment and experiment[0].get('legacy_trials_completed') is not None:
+            num_completed_trials = experiment[0]['trials_completed']
+            num_counted = num_completed_trials - experiment[0]['legacy_trials_completed']
+            if (num_completed_trials >= max_trials or
+                    num_counted >= experiment[0].get('completion_seq', 0)):
+                return num_completed_trials
+
+        query = dict(
+            experiment=self.experiment.id,
+            status='completed'
+            )
+        return self._db.count('trials', query)
+
+    def fetch_new_completed_trials(self, watermarks, selection=None):
+        """Read trials completed since the watermark of the experiment in `watermarks`,
+        and move the watermark forward.
+
+        Missing sequence numbers mostly belong to trials being completed concurrently and
+        are read again until found, but for at most `MISSING_SEQ_TIMEOUT`: a worker which
+        dies or finds its trial already completed leaves its number unused. Trials completed
+        before sequence numbers were assigned are read the first time.
+
+        :param watermarks: Watermarks by experiment id, updated in place.
+        :type watermarks: dict
+        :param selection: Fields of the trials to read.
+        :return: list of documents of the completed trials.
+        """
+        experiment_id = self.experiment.id
+        experiment = self._db.read('experiments', {'_id': experiment_id},
+                                   selection={'completion_seq': 1})
+        last_seq = experiment[0].get('completion_seq', 0) if experiment else 0
+
+        query = dict(
+            experiment=experiment_id,
+            status='completed'
+            )
+
+        if selection:
+            selection = dict(selection, completion_seq=1)
+
+        documents = []
+        if experiment_id in watermarks:
+            first_seq, missing = watermarks[experiment_id]
+        else:
+            first_seq, missing = 0, {}
+            documents += self._db.read('trials', dict(query, completion_seq=None), selection)
+
+        if missing:
+            documents += self._db.read(
+                'trials', dict(query, completion_seq={'$in': sorted(missing)}), selection)
+
+        for start in range(first_seq, last_seq, FETCH_PAGE_SIZE):
+            end = min(start + FETCH_PAGE_SIZE, last_seq)
+            documents += self._db.read(
+                'trials', dict(query, completion_seq={'$gt': start, '$lte': end}), selection,
+                sort=[('completion_seq', Database.ASCENDING)])
+
+        now = datetime.datetime.utcnow()
+        missing = dict(missing)
+        missing.update((seq, now) for seq in range(first_seq + 1, last_seq + 1))
+        for document in documents:
+            missing.pop(document.get('completion_seq'), None)
+        expired = [seq for seq, since in missing.items() if now - since >= MISSING_SEQ_TIMEOUT]
+        if expired:
+            log.debug("Completion sequence numbers %s of experiment %s match no trial, "
+                      "stop reading them.", sorted(expired), experiment_id)
+            for seq in expired:
+                del missing[seq]
+        watermarks[experiment_id] = (max(first_seq, last_seq), missing)
+
+        return documents
+
+    def save_algorithm_state(self, state, watermarks):
+        """Save in database the `state` of the algorithm, as of the given `watermarks`.
+
+        Older states saved by any worker are removed.
+        """
+        experiment_id = self.experiment.id
+        watermark = watermarks.get(experiment_id, (0, {}))[0]
+        self._db.write('algorithms', dict(experiment=experiment_id, state=state,
+                                          watermark=watermark,
+                                          watermarks=dump_watermarks(watermarks)))
+        self._db.remove('algorithms', {'experiment': experiment_id,
+                                       'watermark': {'$lt': watermark}})
+
+    def load_algorithm_state(self):
+        """Fetch the most recent state of the algorithm saved in database.
+
+        :return: pair of the state and of the watermarks as of when it was saved,
+           ``(None, {})`` if none was saved.
+        """
+        documents = self._db.read('algorithms', {'experiment': self.experiment.id},
+                                  sort=[('watermark', Database.DESCENDING)], limit=1)
+        if not documents:
+            return None, {}
+
+        # Some databases do not keep empty dictionaries
+        return (documents[0].get('state', {}),
+                load_watermarks(documents[0].get('watermarks', [])))
+
+
+def dump_watermarks(watermarks):
+    """Convert watermarks by experiment id into documents which can be saved in database."""
+    return [dict(experiment=experiment_id, seq=seq,
+                 missing=[dict(seq=missing_seq, since=since)
+                          for missing_seq, since in sorted(missing.items())])
+            for experiment_id, (seq, missing) in watermarks.items()]
+
+
+def load_watermarks(documents):
+    """Convert documents saved by `dump_watermarks` back into watermarks by experiment id."""
+    return {
+        document['experiment']: (document['seq'], {missing['seq']: missing['since']
+                                                   for missing in document['missing']})
+        for document in documents}
@@ -17,6 +17,7 @@ import tempfile
 from orion.core.io.convert import JSONConverter
 from orion.core.io.database import Database
 from orion.core.io.space_builder import SpaceBuilder
+from orion.core.worker.reservation import HEARTBEAT_INTERVAL
 from orion.core.worker.trial import Trial
 
 log = logging.getLogger(__name__)
@@ -101,7 +102,7 @@ class Consumer(object):
         if script_process is None:
             return None
 
-        returncode = script_process.wait()
+        returncode = self._wait_for(script_process, trial)
 
         if returncode != 0:
             log.error("Something went wrong. Check logs. Process "
@@ -119,6 +120,15 @@ class Consumer(object):
 
         return trial
 
+    def _wait_for(self, process, trial):
+        """Wait for `process` to finish, updating the heartbeat of `trial` meanwhile."""
+        while True:
+            try:
+                return process.wait(timeout=HEARTBEAT_INTERVAL)
+            except subprocess.TimeoutExpired:
+                log.debug("## Update heartbeat of %s.", trial)
+                self.experiment.update_heartbeat(trial)
+
     def launch_process(self, results_filename, cmd_args):
         """Facilitate launching a black-box trial."""
         env = dict(os.environ)
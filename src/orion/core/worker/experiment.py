@@ -13,7 +13,6 @@ import copy
 import datetime
 import getpass
 import logging
-import random
 import sys
 
 from orion.core.cli.evc import fetch_branching_configuration
@@ -23,8 +22,10 @@ from orion.core.io.database import Database, DuplicateKeyError, ReadOnlyDB
 from orion.core.io.experiment_branch_builder import ExperimentBranchBuilder
 from orion.core.io.interactive_commands.branching_prompt import BranchingPrompt
 from orion.core.io.space_builder import SpaceBuilder
-from orion.core.utils.format_trials import trial_to_tuple
+from orion.core.worker.completion import CompletionTracker
 from orion.core.worker.primary_algo import PrimaryAlgo
+from orion.core.worker.reservation import Reserver
+from orion.core.worker.stats import compute_stats
 from orion.core.worker.trial import Trial
 
 log = logging.getLogger(__name__)
@@ -83,7 +84,8 @@ class Experiment(object):
     """
 
     __slots__ = ('name', 'refers', 'metadata', 'pool_size', 'max_trials',
-                 'algorithms', '_db', '_init_done', '_id', '_node', '_last_fetched')
+                 'algorithms', '_db', '_init_done', '_id', '_node', '_completion_watermarks',
+                 '_reserver', '_completions')
     non_branching_attrs = ('pool_size', 'max_trials')
 
     def __init__(self, name):
@@ -114,9 +116,13 @@ class Experiment(object):
         self.pool_size = None
         self.max_trials = None
         self.algorithms = None
+        self._completion_watermarks = {}
+        self._reserver = Reserver(self)
+        self._completions = CompletionTracker(self)
 
         config = self._db.read('experiments',
-                               {'name': name, 'metadata.user': user})
+                               {'name': name, 'metadata.user': user},
+                               sort=[('metadata.datetime', Database.DESCENDING)])
         if config:
             log.debug("Found existing experiment, %s, under user, %s, registered in database.",
                       name, user)
@@ -124,15 +130,12 @@ class Experiment(object):
                 log.warning("Many (%s) experiments for (%s, %s) are available but "
                             "only the most recent one can be accessed. "
                             "Experiment branches will be supported soon.", len(config), name, user)
-            config = sorted(config, key=lambda x: x['metadata']['datetime'],
-                            reverse=True)[0]
+            config = config[0]
             for attrname in self.__slots__:
                 if not attrname.startswith('_'):
                     setattr(self, attrname, config[attrname])
             self._id = config['_id']
 
-        self._last_fetched = self.metadata.get("datetime", datetime.datetime.utcnow())
-
     def _setup_db(self):
         self._db.ensure_index('experiments',
                               [('name', Database.ASCENDING),
@@ -141,6 +144,20 @@ class Experiment(object):
         self._db.ensure_index('experiments', 'metadata.datetime')
 
         self._db.ensure_index('trials', 'experiment')
+        self._db.ensure_index('algorithms',
+                              [('experiment', Database.ASCENDING),
+                               ('watermark', Database.ASCENDING)])
+        self._db.ensure_index('trials',
+                              [('experiment', Database.ASCENDING),
+                               ('completion_seq', Database.ASCENDING)])
+        self._db.ensure_index('trials',
+                              [('experiment', Database.ASCENDING),
+                               ('status', Database.ASCENDING),
+                               ('submit_time', Database.ASCENDING)])
+        self._db.ensure_index('trials',
+                              [('experiment', Database.ASCENDING),
+                               ('status', Database.ASCENDING),
+                               ('heartbeat', Database.ASCENDING)])
         self._db.ensure_index('trials', 'status')
         self._db.ensure_index('trials', 'results')
         self._db.ensure_index('trials', 'start_time')
@@ -153,6 +170,11 @@ class Experiment(object):
 
             The query is always updated with `{"experiment": self._id}`
 
+        .. note::
+
+            With a `selection`, the fields left out are loaded from the database the first
+            time one of them is accessed, see `orion.core.worker.trial.Trial.from_document`.
+
         .. seealso::
 
             :meth:`orion.core.io.database.AbstractDB.read` for more information about the
@@ -161,7 +183,55 @@ class Experiment(object):
         """
         query["experiment"] = self._id
 
-        return Trial.build(self._db.read('trials', query, selection))
+        return Trial.build(self._db.read('trials', query, selection), self.trial_hash,
+                           self._trial_loader(selection))
+
+    def iter_trials(self, query=None, selection=None, batch_size=None):
+        """Iterate over trials of the experiment in the database, reading and building
+        them lazily so that large experiments can be analyzed in constant memory.
+
+        .. note::
+
+            The query is always updated with `{"experiment": self._id}`
+
+        .. seealso::
+
+            :meth:`orion.core.io.database.AbstractDB.read_iter` for more information about the
+            arguments.
+
+        """
+        query = dict(query or {}, experiment=self._id)
+
+        loader = self._trial_loader(selection)
+        for document in self._db.read_iter('trials', query, selection, batch_size=batch_size):
+            yield Trial.from_document(document, self.trial_hash, loader)
+
+    def _trial_loader(self, selection):
+        """Return the function loading fields left out of trials by `selection`, if any."""
+        if not selection:
+            return None
+
+        return self._load_trial
+
+    def _load_trial(self, trial_id):
+        """Read the whole document of a trial, None if it does not exist anymore."""
+        documents = self._db.read('trials', {'_id': trial_id})
+        return documents[0] if documents else None
+
+    def fetch_registered_ids(self, since=None):
+        """Fetch the ids of the trials registered for this experiment.
+
+        :param since: If given, only trials submitted at this time or later are fetched.
+        :type since: `datetime.datetime`
+
+        :return: list of pairs of trial ids and submission times.
+        """
+        query = {'experiment': self._id}
+        if since is not None:
+            query['submit_time'] = {'$gte': since}
+
+        documents = self._db.read('trials', query, selection={'_id': 1, 'submit_time': 1})
+        return [(document['_id'], document.get('submit_time')) for document in documents]
 
     def fetch_trials_tree(self, query, selection=None):
         """Fetch trials recursively in the EVC tree
@@ -193,109 +263,136 @@ class Experiment(object):
         self._node = node
 
     def reserve_trial(self, score_handle=None):
-        """Find *new* trials that exist currently in database and select one of
-        them based on the highest score return from `score_handle` callable.
+        """Reserve a *new* trial, see :meth:`Reserver.reserve_trial
+        <orion.core.worker.reservation.Reserver.reserve_trial>`.
+        """
+        return self._reserver.reserve_trial(score_handle)
 
-        :param score_handle: A way to decide which trial out of the *new* ones to
-           to pick as *reserved*, defaults to a random choice.
-        :type score_handle: callable
-        :return: selected `Trial` object, None if could not find any.
+    def reserve_trials(self, k):
+        """Reserve up to `k` trials at once, see :meth:`Reserver.reserve_trials
+        <orion.core.worker.reservation.Reserver.reserve_trials>`.
         """
-        if score_handle is not None and not callable(score_handle):
-            raise ValueError("Argument `score_handle` must be callable with a `Trial`.")
+        return self._reserver.reserve_trials(k)
 
-        query = dict(
-            experiment=self._id,
-            status={'$in': ['new', 'suspended', 'interrupted']}
-            )
-        new_trials = self.fetch_trials(query)
+    def release_trials(self, trials):
+        """Set back to *new* unevaluated trials, see :meth:`Reserver.release_trials
+        <orion.core.worker.reservation.Reserver.release_trials>`.
+        """
+        self._reserver.release_trials(trials)
 
-        if not new_trials:
-            return None
+    def update_heartbeat(self, trial):
+        """Inform database that `trial` is still held, see :meth:`Reserver.update_heartbeat
+        <orion.core.worker.reservation.Reserver.update_heartbeat>`.
+        """
+        return self._reserver.update_heartbeat(trial)
 
-        if score_handle is not None and self.space:
-            scores = list(map(score_handle,
-                              map(lambda x: trial_to_tuple(x, self.space), new_trials)))
-            scored_trials = zip(scores, new_trials)
-            best_trials = filter(lambda st: st[0] == max(scores), scored_trials)
-            new_trials = list(zip(*best_trials))[1]
-        elif score_handle is not None:
-            log.warning("While reserving trial: `score_handle` was provided, but "
-                        "parameter space has not been defined yet.")
+    def interrupt_lost_trials(self):
+        """Interrupt trials whose heartbeat expired, see :meth:`Reserver.interrupt_lost_trials
+        <orion.core.worker.reservation.Reserver.interrupt_lost_trials>`.
+        """
+        self._reserver.interrupt_lost_trials()
 
-        selected_trial = random.sample(new_trials, 1)[0]
+    def push_completed_trial(self, trial):
+        """Inform database about an evaluated `trial` with results, see
+        :meth:`CompletionTracker.push_completed_trial
+        <orion.core.worker.completion.CompletionTracker.push_completed_trial>`.
+        """
+        self._completions.push_completed_trial(trial)
 
-        # Query on status to ensure atomicity. If another process change the
-        # status meanwhile, read_and_write will fail, because query will fail.
-        query = {'_id': selected_trial.id, 'status': selected_trial.status}
+    def register_trials(self, trials):
+        """Inform database about *new* suggested trial with specific parameter
+        values. Each of them correspond to a different possible run.
 
-        update = dict(status='reserved')
+        All trials are written at once. Those which are already registered are
+        skipped, without preventing the others from being registered.
 
-        if selected_trial.status == 'new':
-            update["start_time"] = datetime.datetime.utcnow()
+        :type trials: list of `Trial`
+        :return: number of trials actually registered.
+        """
+        stamp = datetime.datetime.utcnow()
+        for trial in trials:
+            trial.experiment = self._id
+            trial.hash_type = self.trial_hash
+            trial.status = 'new'
+            trial.submit_time = stamp
+        trials_dicts = list(map(lambda x: x.to_dict(), trials))
+        if not trials_dicts:
+            return 0
+
+        n_registered, duplicates = self._db.write_many('trials', trials_dicts, ordered=False)
+        if duplicates:
+            log.debug("%d trials were already registered.", len(duplicates))
+
+        return n_registered
+
+    def watch_trials(self):
+        """Return a token marking the current point in the changes of the trials, see
+        :meth:`Reserver.watch_trials <orion.core.worker.reservation.Reserver.watch_trials>`.
+        """
+        return self._reserver.watch_trials()
 
-        selected_trial_dict = self._db.read_and_write(
-            'trials', query=query, data=update)
+    def wait_for_trials(self, timeout, token=None):
+        """Wait until trials become reservable or get completed, see
+        :meth:`Reserver.wait_for_trials <orion.core.worker.reservation.Reserver.wait_for_trials>`.
+        """
+        return self._reserver.wait_for_trials(timeout, token)
 
-        if selected_trial_dict is None:
-            selected_trial = self.reserve_trial(score_handle=score_handle)
-        else:
-            selected_trial = Trial(**selected_trial_dict)
+    def fetch_completed_trials(self, selection=None):
+        """Fetch recent completed trials that this `Experiment` instance has not
+        yet seen.
 
-        return selected_trial
+        .. note::
 
-    def push_completed_trial(self, trial):
-        """Inform database about an evaluated `trial` with results.
+            Trials are fetched in the order of their completion sequence numbers, given by the
+            database in `push_completed_trial`. Each experiment of the EVC tree has its own
+            watermark, so that every completed trial is returned exactly once, whatever the
+            clocks of the workers.
 
-        :param trial: Corresponds to a successful evaluation of a particular run.
-        :type trial: `Trial`
+        :param selection: Fields of the trials to read at first, the others being loaded
+           when accessed, see :meth:`fetch_trials`.
+        :return: list of completed `Trial` objects
+        """
+        if self._node is None:
+            return self.fetch_new_completed_trials(self._completion_watermarks, selection)
 
-        .. note::
+        return self._node.fetch_new_completed_trials(self._completion_watermarks, selection)
 
-            Change status from *reserved* to *completed*.
+    def fetch_new_completed_trials(self, watermarks, selection=None):
+        """Fetch trials of this experiment completed since its watermark in `watermarks`,
+        and move the watermark forward.
 
-        """
-        trial.end_time = datetime.datetime.utcnow()
-        trial.status = 'completed'
-        self._db.write('trials', trial.to_dict(), query={'_id': trial.id})
+        .. seealso::
 
-    def register_trials(self, trials):
-        """Inform database about *new* suggested trial with specific parameter
-        values. Each of them correspond to a different possible run.
+            :meth:`orion.core.worker.completion.CompletionTracker.fetch_new_completed_trials`
 
-        :type trials: list of `Trial`
+        :param selection: Fields of the trials to read at first, see :meth:`fetch_trials`.
+        :return: list of completed `Trial` objects
         """
-        try:
-            stamp = datetime.datetime.utcnow()
-            for trial in trials:
-                trial.experiment = self._id
-                trial.status = 'new'
-                trial.submit_time = stamp
-            trials_dicts = list(map(lambda x: x.to_dict(), trials))
-            self._db.write('trials', trials_dicts)
-        except DuplicateKeyError:
-            pass
+        documents = self._completions.fetch_new_completed_trials(watermarks, selection)
+        return Trial.build(documents, self.trial_hash, self._trial_loader(selection))
 
-    def fetch_completed_trials(self):
-        """Fetch recent completed trials that this `Experiment` instance has not
-        yet seen.
+    def save_algorithm_state(self, state):
+        """Save in database the `state` of the algorithm, as of the last time completed
+        trials were fetched.
 
-        .. note::
+        :param state: State of the algorithm, see `orion.algo.base.BaseAlgorithm.state_dict`.
+        :type state: dict
+        """
+        self._completions.save_algorithm_state(state, self._completion_watermarks)
 
-            It will return only those with `Trial.end_time` after `_last_fetched`, for performance
-            reasons.
+    def load_algorithm_state(self):
+        """Fetch the most recent state of the algorithm saved in database.
 
-        :return: list of completed `Trial` objects
+        Later calls to `fetch_completed_trials` only return the trials completed since
+        this state was saved.
+
+        :return: the state of the algorithm, or None if none was saved.
         """
-        query = dict(
-            experiment=self._id,
-            status='completed',
-            end_time={'$gte': self._last_fetched}
-            )
-        completed_trials = self.fetch_trials_tree(query)
-        self._last_fetched = datetime.datetime.utcnow()
+        state, watermarks = self._completions.load_algorithm_state()
+        if state is not None:
+            self._completion_watermarks = watermarks
 
-        return completed_trials
+        return state
 
     # pylint: disable=invalid-name
     @property
@@ -306,6 +403,36 @@ class Experiment(object):
         """
         return self._id
 
+    @property
+    def trial_hash(self):
+        """Return the function computing ids of this experiment's trials.
+
+        It is set in :attr:`metadata` when the experiment is created, older experiments
+        use md5.
+
+        .. seealso:: `orion.core.worker.trial.Trial.hash_type`
+        """
+        return self.metadata.get('trial_hash', 'md5')
+
+    def _configure_trial_hash(self, metadata, is_new):
+        """Set the function computing trial ids in the `metadata` of the final configuration.
+
+        New experiments use the one requested, md5 by default. Existing experiments keep
+        their own, so that the ids of the trials already registered stay the same.
+
+        :raises ValueError: if the one requested for a new experiment is not available.
+        """
+        if is_new:
+            Trial.validate_hash_type(metadata.get('trial_hash', 'md5'))
+            return
+
+        trial_hash = metadata.pop('trial_hash', None)
+        if trial_hash is not None and trial_hash != self.trial_hash:
+            log.warning("Ignoring trial hash type '%s', experiment '%s' already uses '%s'.",
+                        trial_hash, self.name, self.trial_hash)
+        if 'trial_hash' in self.metadata:
+            metadata['trial_hash'] = self.metadata['trial_hash']
+
     @property
     def is_done(self):
         """Return True, if this experiment is considered to be finished.
@@ -313,20 +440,29 @@ class Experiment(object):
         1. Count how many trials have been completed and compare with `max_trials`.
         2. Ask `algorithms` if they consider there is a chance for further improvement.
 
+        The number of completed trials is read from a counter in the experiment's document,
+        and reused during `is_done_ttl` seconds.
+
         .. note::
 
             To be used as a terminating condition in a ``Worker``.
 
         """
-        query = dict(
-            experiment=self._id,
-            status='completed'
-            )
-        num_completed_trials = self._db.count('trials', query)
-
+        num_completed_trials = self._completions.count_completed_trials(self.max_trials)
         return ((num_completed_trials >= self.max_trials) or
                 (self._init_done and self.algorithms.is_done))
 
+    @property
+    def is_done_ttl(self):
+        """Number of seconds during which `is_done` reuses the number of completed trials
+        last read from the database.
+        """
+        return self._completions.ttl
+
+    @is_done_ttl.setter
+    def is_done_ttl(self, ttl):
+        self._completions.ttl = ttl
+
     @property
     def space(self):
         """Return problem's parameter `orion.algo.space.Space`.
@@ -408,6 +544,7 @@ class Experiment(object):
                 experiment._branch_config(conflicts, branching_configuration)
 
         final_config = experiment.configuration
+        self._configure_trial_hash(final_config['metadata'], is_new)
         self._instantiate_config(final_config)
 
         self._init_done = True
@@ -440,62 +577,15 @@ class Experiment(object):
             final_config.pop("name")
             self._db.write('experiments', final_config, {'_id': self._id})
 
+        self._completions.init_counter()
+
     @property
     def stats(self):
         """Calculate a stats dictionary for this particular experiment.
 
-        Returns
-        -------
-        stats : dict
-
-        Stats
-        -----
-        trials_completed : int
-           Number of completed trials
-        best_trials_id : int
-           Unique identifier of the `Trial` object in the database which achieved
-           the best known objective result.
-        best_evaluation : float
-           Evaluation score of the best trial
-        start_time : `datetime.datetime`
-           When Experiment was first dispatched and started running.
-        finish_time : `datetime.datetime`
-           When Experiment reached terminating condition and stopped running.
-        duration : `datetime.timedelta`
-           Elapsed time.
-
+        .. seealso:: :func:`orion.core.worker.stats.compute_stats` for the stats returned.
         """
-        query = dict(
-            experiment=self._id,
-            status='completed'
-            )
-        selection = {
-            'end_time': 1,
-            'results': 1,
-            'experiment': 1,
-            'params': 1
-            }
-        completed_trials = self.fetch_trials(query, selection)
-        stats = dict()
-        stats['trials_completed'] = len(completed_trials)
-        stats['best_trials_id'] = None
-        trial = completed_trials[0]
-        stats['best_evaluation'] = trial.objective.value
-        stats['best_trials_id'] = trial.id
-        stats['start_time'] = self.metadata['datetime']
-        stats['finish_time'] = stats['start_time']
-        for trial in completed_trials:
-            # All trials are going to finish certainly after the start date
-            # of the experiment they belong to
-            if trial.end_time > stats['finish_time']:  # pylint:disable=no-member
-                stats['finish_time'] = trial.end_time
-            objective = trial.objective.value
-            if objective < stats['best_evaluation']:
-                stats['best_evaluation'] = objective
-                stats['best_trials_id'] = trial.id
-        stats['duration'] = stats['finish_time'] - stats['start_time']
-
-        return stats
+        return compute_stats(self._db, self._id, self.metadata['datetime'])
 
     def _instantiate_config(self, config):
         """Check before dispatching experiment whether configuration corresponds
@@ -609,7 +699,8 @@ class ExperimentView(object):
                         # Properties
                         ["id", "is_done", "space", "algorithms", "stats", "configuration"] +
                         # Methods
-                        ["fetch_trials", "fetch_trials_tree", "fetch_completed_trials",
+                        ["fetch_trials", "iter_trials", "fetch_trials_tree",
+                         "fetch_completed_trials", "fetch_new_completed_trials",
                          "connect_to_version_control_tree"])
 
     def __init__(self, name):
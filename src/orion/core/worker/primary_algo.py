@@ -9,7 +9,10 @@
 
 """
 
+import numpy
+
 from orion.algo.base import BaseAlgorithm
+from orion.algo.space import PointArray
 from orion.core.worker.transformer import build_required_space
 
 
@@ -48,10 +51,16 @@ class PrimaryAlgo(BaseAlgorithm):
 
         .. note:: New parameters must be compliant with the problem's domain
            `orion.algo.space.Space`.
+
+        If the algorithm suggests a `orion.algo.space.PointArray`, it is checked and
+        reversed as a whole and a `orion.algo.space.PointArray` is returned.
         """
         points = self.algorithm.suggest(num)
-        for point in points:
-            assert point in self.transformed_space
+        if isinstance(points, PointArray):
+            assert points in self.transformed_space
+            return self.transformed_space.reverse_batch(points)
+
+        assert numpy.all(self.transformed_space.contains_many(points))
         return [self.transformed_space.reverse(point) for point in points]
 
     def observe(self, points, results):
@@ -59,14 +68,35 @@ class PrimaryAlgo(BaseAlgorithm):
         space.
 
         .. seealso:: `orion.algo.base.BaseAlgorithm.observe`
+
+        A `orion.algo.space.PointArray` is checked and transformed as a whole, and
+        passed as such to the algorithm.
         """
         assert len(points) == len(results)
-        tpoints = []
-        for point in points:
-            assert point in self.space
-            tpoints.append(self.transformed_space.transform(point))
+        if isinstance(points, PointArray):
+            assert points in self.space
+            self.algorithm.observe(self.transformed_space.transform_batch(points), results)
+            return
+
+        assert numpy.all(self.space.contains_many(points))
+        tpoints = [self.transformed_space.transform(point) for point in points]
         self.algorithm.observe(tpoints, results)
 
+    @property
+    def state_dict(self):
+        """Return the state of the wrapped algorithm, None if it cannot be saved.
+
+        .. seealso:: `orion.algo.base.BaseAlgorithm.state_dict`
+        """
+        return self.algorithm.state_dict
+
+    def set_state(self, state_dict):
+        """Restore the state of the wrapped algorithm.
+
+        .. seealso:: `orion.algo.base.BaseAlgorithm.set_state`
+        """
+        self.algorithm.set_state(state_dict)
+
     @property
     def is_done(self):
         """Return True, if an algorithm holds that there can be no further improvement."""
@@ -82,6 +112,14 @@ class PrimaryAlgo(BaseAlgorithm):
         assert point in self.space
         return self.algorithm.score(self.transformed_space.transform(point))
 
+    @property
+    def overrides_score(self):
+        """Return True, if the wrapped algorithm provides its own implementation of `score`.
+
+        Otherwise, every point has the same score and there is no need to compute it.
+        """
+        return type(self.algorithm).score is not BaseAlgorithm.score
+
     def judge(self, point, measurements):
         """Inform an algorithm about online `measurements` of a running trial.
 
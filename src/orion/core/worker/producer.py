@@ -14,6 +14,9 @@ from orion.core.utils import format_trials
 
 log = logging.getLogger(__name__)
 
+# Number of times the algorithm is asked to replace suggestions which were already registered
+MAX_PRODUCE_ATTEMPTS = 10
+
 
 class Producer(object):
     """Produce suggested sets of problem's parameter space to try out.
@@ -22,6 +25,9 @@ class Producer(object):
     have been already evaluated and to register new suggestions (points of
     the parameter `Space`) to be evaluated.
 
+    Ids of the trials already registered for the experiment are kept in memory,
+    so that suggestions which are duplicates are dropped before reaching the database.
+
     """
 
     def __init__(self, experiment):
@@ -38,30 +44,104 @@ class Producer(object):
             raise RuntimeError("Experiment object provided to Producer has not yet completed"
                                " initialization.")
         self.algorithm = experiment.algorithms
+        self._registered_ids = set()
+        self._last_submit_time = None
+        self._state_loaded = False
 
-    def produce(self):
-        """Create and register new trials."""
-        log.debug("### Suggest new ones.")
-        new_points = self.algorithm.suggest(self.num_new_trials)
+    @property
+    def is_exhausted(self):
+        """Return True if all the points of the space were already registered."""
+        return len(self._registered_ids) >= self.space.cardinality
 
-        log.debug("### Convert them to `Trial` objects.")
-        new_trials = list(map(lambda data: format_trials.tuple_to_trial(data, self.space),
-                              new_points))
+    def produce(self):
+        """Create and register new trials.
 
-        log.debug("### Register to database: %s", new_trials)
-        self.experiment.register_trials(new_trials)
+        Suggestions which were already registered are replaced by new ones, at most
+        `MAX_PRODUCE_ATTEMPTS` times.
+        """
+        log.debug("### Fetch ids of trials registered since last production.")
+        self._update_registered_ids()
+
+        num_missing = self.num_new_trials
+        for _ in range(MAX_PRODUCE_ATTEMPTS):
+            if self.is_exhausted:
+                log.debug("### All points of the space are already registered.")
+                break
+
+            log.debug("### Suggest %d new ones.", num_missing)
+            new_points = self.algorithm.suggest(num_missing)
+            if not new_points:
+                break
+
+            log.debug("### Convert them to `Trial` objects, dropping duplicates.")
+            new_trials = []
+            for point in new_points:
+                trial = format_trials.tuple_to_trial(point, self.space)
+                trial.experiment = self.experiment.id
+                trial.hash_type = self.experiment.trial_hash
+                if trial.id not in self._registered_ids:
+                    self._registered_ids.add(trial.id)
+                    new_trials.append(trial)
+
+            if not new_trials:
+                continue
+
+            log.debug("### Register to database: %s", new_trials)
+            num_missing -= self.experiment.register_trials(new_trials)
+            if num_missing <= 0:
+                break
+
+    def _update_registered_ids(self):
+        """Add to the known ids those of the trials registered by other workers."""
+        registered = self.experiment.fetch_registered_ids(since=self._last_submit_time)
+        for trial_id, submit_time in registered:
+            self._registered_ids.add(trial_id)
+            if submit_time is not None and (self._last_submit_time is None or
+                                            submit_time > self._last_submit_time):
+                self._last_submit_time = submit_time
 
     def update(self):
-        """Pull newest completed trials to update local model."""
+        """Pull newest completed trials to update local model.
+
+        The first time, the state of the algorithm saved by previous workers is restored,
+        so that only trials completed since then are observed. The state is saved again
+        after observing new trials, if the algorithm supports it.
+
+        Trials lost by dead workers are also made available for reservation again.
+        """
+        log.debug("### Interrupt reserved trials lost by their worker.")
+        self.experiment.interrupt_lost_trials()
+
+        if not self._state_loaded:
+            self._load_algorithm_state()
+
         log.debug("### Fetch trials to observe:")
-        completed_trials = self.experiment.fetch_completed_trials()
+        # Other fields, if ever needed, are loaded lazily
+        completed_trials = self.experiment.fetch_completed_trials(
+            selection={'experiment': 1, 'status': 1, 'params': 1, 'results': 1})
         log.debug("### %s", completed_trials)
 
         if completed_trials:
-            log.debug("### Convert them to list of points and their results.")
-            points = list(map(lambda trial: format_trials.trial_to_tuple(trial, self.space),
-                              completed_trials))
-            results = list(map(format_trials.get_trial_results, completed_trials))
+            log.debug("### Convert them to a batch of points and their results.")
+            batch = format_trials.TrialBatch.from_trials(completed_trials, self.space)
 
             log.debug("### Observe them.")
-            self.algorithm.observe(points, results)
+            self.algorithm.observe(batch.points, batch.results)
+
+            state = self.algorithm.state_dict
+            if state is not None:
+                log.debug("### Save state of the algorithm.")
+                self.experiment.save_algorithm_state(state)
+
+    def _load_algorithm_state(self):
+        """Restore the state of the algorithm saved by a previous worker, if any, so that
+        only trials completed since then need to be observed.
+        """
+        self._state_loaded = True
+        if self.algorithm.state_dict is None:
+            return
+
+        log.debug("### Load state of the algorithm saved by a previous worker.")
+        state = self.experiment.load_algorithm_state()
+        if state is not None:
+            self.algorithm.set_state(state)
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+# pylint:disable=protected-access
+"""
+:mod:`orion.core.worker.reservation` -- Reserve trials under leases
+===================================================================
+
+.. module:: reservation
+   :platform: Unix
+   :synopsis: Reserve trials of an experiment for a worker and keep them alive with heartbeats.
+
+"""
+import datetime
+import logging
+import random
+import uuid
+
+from orion.core.io.database import Database
+from orion.core.utils.format_trials import trial_to_tuple
+from orion.core.worker.trial import Trial
+
+log = logging.getLogger(__name__)
+
+RESERVABLE_STATI = ('new', 'suspended', 'interrupted')
+
+# How many times a worker tries to reserve its preferred trial before giving up,
+# when other workers keep reserving it first.
+MAX_RESERVATION_ATTEMPTS = 10
+
+# How often, in seconds, a worker updates the heartbeat of the trials it evaluates.
+HEARTBEAT_INTERVAL = 60
+
+# After how long without a heartbeat a reserved trial is considered lost by its worker.
+HEARTBEAT_TIMEOUT = datetime.timedelta(seconds=5 * HEARTBEAT_INTERVAL)
+
+
+class Reserver(object):
+    """Reserve trials of an experiment for workers, under leases kept alive by heartbeats.
+
+    A reserved trial is leased to a unique token, saved in its `Trial.worker` attribute.
+    Its worker updates its heartbeat every `HEARTBEAT_INTERVAL` seconds, otherwise it
+    is considered lost after `HEARTBEAT_TIMEOUT` and can be reserved again.
+
+    """
+
+    def __init__(self, experiment):
+        """Initialize a reserver.
+
+        :param experiment: `Experiment` whose trials are reserved, through its database.
+        """
+        self.experiment = experiment
+
+    @property
+    def _db(self):
+        """Database of the experiment, which may be replaced by a read-only one."""
+        return self.experiment._db
+
+    def reserve_trial(self, score_handle=None):
+        """Find *new* trials that exist currently in database and select one of
+        them based on the highest score return from `score_handle` callable.
+
+        Without `score_handle`, the trial is selected and reserved atomically by the
+        database in a single operation, *new* trials first, oldest submission first.
+        The trial is leased to a unique token, saved in its `Trial.worker` attribute.
+        Otherwise candidate trials are scored locally and reservation of the best
+        one is retried at most `MAX_RESERVATION_ATTEMPTS` times if other workers
+        reserve them first.
+
+        :param score_handle: A way to decide which trial out of the *new* ones to
+           to pick as *reserved*, defaults to the first submitted one.
+        :type score_handle: callable
+        :return: selected `Trial` object, None if could not find any.
+        """
+        if score_handle is not None and not callable(score_handle):
+            raise ValueError("Argument `score_handle` must be callable with a `Trial`.")
+
+        if score_handle is not None and not self.experiment.space:
+            log.warning("While reserving trial: `score_handle` was provided, but "
+                        "parameter space has not been defined yet.")
+            score_handle = None
+
+        if score_handle is None:
+            return self._reserve_first_trial()
+
+        for _ in range(MAX_RESERVATION_ATTEMPTS):
+            query = dict(
+                experiment=self.experiment.id,
+                status={'$in': list(RESERVABLE_STATI)}
+                )
+            # `experiment` and `params` are required to compute the id of a trial
+            selection = {'experiment': 1, 'params': 1, 'status': 1}
+            new_trials = self.experiment.fetch_trials(query, selection)
+
+            if not new_trials:
+                return None
+
+            scores = list(map(score_handle,
+                              map(lambda x: trial_to_tuple(x, self.experiment.space),
+                                  new_trials)))
+            best_score = max(scores)
+            best_trials = [trial for score, trial in zip(scores, new_trials)
+                           if score == best_score]
+
+            selected_trial = random.sample(best_trials, 1)[0]
+
+            # Query on status to ensure atomicity. If another process change the
+            # status meanwhile, read_and_write will fail, because query will fail.
+            query = {'_id': selected_trial.id, 'status': selected_trial.status}
+
+            selected_trial_dict = self._db.read_and_write(
+                'trials', query=query,
+                data=self._reservation_update(selected_trial.status))
+
+            if selected_trial_dict is not None:
+                return Trial.from_document(selected_trial_dict, self.experiment.trial_hash)
+
+            log.debug("Trial %s was reserved by another worker meanwhile.", selected_trial.id)
+
+        log.warning("Could not reserve a trial after %d attempts.", MAX_RESERVATION_ATTEMPTS)
+        return None
+
+    def _reserve_first_trial(self):
+        """Reserve atomically the oldest reservable trial, *new* ones first."""
+        for stati in (('new', ), ('suspended', 'interrupted')):
+            query = dict(
+                experiment=self.experiment.id,
+                status={'$in': list(stati)}
+                )
+            selected_trial_dict = self._db.read_and_write(
+                'trials', query=query, data=self._reservation_update(stati[0]),
+                sort=[('submit_time', Database.ASCENDING)])
+
+            if selected_trial_dict is not None:
+                return Trial.from_document(selected_trial_dict, self.experiment.trial_hash)
+
+        return None
+
+    def reserve_trials(self, k):
+        """Reserve up to `k` trials at once, for a worker evaluating trials in batches.
+
+        Trials are selected like in :meth:`reserve_trial` without `score_handle`,
+        *new* trials first, oldest submission first. They are all leased to the
+        same unique token, saved in their `Trial.worker` attribute. Trials which
+        were reserved by other workers meanwhile are skipped, so less than `k`
+        trials may be returned even if more were available.
+
+        .. seealso::
+
+            :meth:`orion.core.worker.reservation.Reserver.release_trials` to give
+            back trials which will not be evaluated.
+
+        :param k: Maximum number of trials to reserve.
+        :type k: int
+        :return: list of reserved `Trial` objects, empty if could not find any.
+        """
+        if k < 1:
+            raise ValueError("Number of trials to reserve must be at least 1, got: {}".format(k))
+
+        lease = uuid.uuid4().hex
+        n_candidates = 0
+        for stati in (('new', ), ('suspended', 'interrupted')):
+            query = dict(
+                experiment=self.experiment.id,
+                status={'$in': list(stati)}
+                )
+            candidates = self._db.read('trials', query, selection={'_id': 1},
+                                       sort=[('submit_time', Database.ASCENDING)],
+                                       limit=k - n_candidates)
+            if not candidates:
+                continue
+
+            n_candidates += len(candidates)
+
+            # Query on status to ensure atomicity. Trials reserved by another process
+            # meanwhile are not matched anymore and thus left untouched.
+            query['_id'] = {'$in': [candidate['_id'] for candidate in candidates]}
+            update = self._reservation_update(stati[0], lease)
+            self._db.write('trials', update, query=query, upsert=False)
+
+            if n_candidates >= k:
+                break
+
+        if not n_candidates:
+            return []
+
+        reserved_trials = self.experiment.fetch_trials({'status': 'reserved', 'worker': lease})
+        return sorted(reserved_trials, key=lambda x: (x.submit_time is not None, x.submit_time))
+
+    def release_trials(self, trials):
+        """Set back to *new* trials reserved with :meth:`reserve_trials` which
+        will not be evaluated, so that other workers may reserve them.
+
+        Their start time and heartbeat are cleared, as they were never evaluated.
+        Trials which are not *reserved* anymore under the same lease are left
+        untouched.
+
+        :type trials: list of `Trial`
+        """
+        for lease in set(trial.worker for trial in trials if trial.worker is not None):
+            query = dict(
+                experiment=self.experiment.id,
+                status='reserved',
+                worker=lease,
+                _id={'$in': [trial.id for trial in trials if trial.worker == lease]}
+                )
+            update = dict(status='new', worker=None, start_time=None, heartbeat=None)
+            self._db.write('trials', update, query=query, upsert=False)
+
+    @staticmethod
+    def _reservation_update(status, lease=None):
+        """Return the update setting a trial with given `status` as *reserved* under
+        `lease`, a new unique token by default.
+        """
+        now = datetime.datetime.utcnow()
+        update = dict(status='reserved', heartbeat=now, worker=lease or uuid.uuid4().hex)
+
+        if status == 'new':
+            update["start_time"] = now
+
+        return update
+
+    def update_heartbeat(self, trial):
+        """Inform database that `trial` is still held by this worker.
+
+        Nothing is updated if the trial is not *reserved* anymore under the lease saved
+        in `Trial.worker`, for instance if it was already considered lost and set as
+        *interrupted*, or reserved again by another worker.
+
+        :type trial: `Trial`
+        :return: True if the trial is still reserved under its lease.
+        """
+        heartbeat = datetime.datetime.utcnow()
+        query = {'_id': trial.id, 'status': 'reserved', 'worker': trial.worker}
+        if self._db.read_and_write('trials', query, {'heartbeat': heartbeat},
+                                   selection={'_id': 1}) is None:
+            return False
+
+        trial.heartbeat = heartbeat
+        return True
+
+    def interrupt_lost_trials(self):
+        """Set as *interrupted* the *reserved* trials whose heartbeat expired, so that
+        they can be reserved again.
+
+        Their worker is assumed to have died without releasing them, their heartbeat
+        not being updated since more than `HEARTBEAT_TIMEOUT`.
+        """
+        query = dict(
+            experiment=self.experiment.id,
+            status='reserved',
+            heartbeat={'$lt': datetime.datetime.utcnow() - HEARTBEAT_TIMEOUT}
+            )
+        self._db.write('trials', {'status': 'interrupted'}, query=query, upsert=False)
+
+    def watch_trials(self):
+        """Return a token marking the current point in the changes of the trials.
+
+        .. seealso:: :meth:`wait_for_trials`
+
+        :raises :exc:`NotImplementedError`: if the database cannot watch changes.
+        """
+        return self._db.watch_token('trials')
+
+    def wait_for_trials(self, timeout, token=None):
+        """Wait until trials of the experiment become reservable or get completed.
+
+        :param timeout: Maximum number of seconds to wait.
+        :param token: Token returned by :meth:`watch_trials`, to also consider the
+           trials which changed since then.
+        :return: True if a trial changed, False if `timeout` expired first.
+
+        :raises :exc:`NotImplementedError`: if the database cannot watch changes.
+        """
+        query = dict(
+            experiment=self.experiment.id,
+            status={'$in': list(RESERVABLE_STATI) + ['completed']}
+            )
+        return self._db.watch('trials', query, timeout, token)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`orion.core.worker.scheduler` -- Wait for trials when there is nothing to do
+=================================================================================
+
+.. module:: scheduler
+   :platform: Unix
+   :synopsis: Back off exponentially while a worker finds no trial to reserve.
+
+"""
+import logging
+import random
+import time
+
+log = logging.getLogger(__name__)
+
+# Seconds waited the first time a worker finds nothing to reserve.
+INITIAL_DELAY = 0.1
+
+# Maximum number of seconds waited between two attempts to reserve trials.
+MAX_DELAY = 30
+
+# Factor by which the delay grows every time the worker still finds nothing to do.
+BACKOFF_FACTOR = 2
+
+# Fraction of the delay which is randomly cut, so that idle workers do not poll together.
+JITTER = 0.5
+
+
+class Scheduler(object):
+    """Schedule the attempts of an idle worker to reserve trials.
+
+    Each time the worker finds nothing to reserve, it waits a bit longer before trying
+    again, exponentially up to `MAX_DELAY` seconds. The waiting is interrupted as soon as
+    trials of the experiment change, if the database can watch them. Otherwise it
+    simply sleeps. Changes made between `Scheduler.mark` and the waiting, typically while
+    the worker tried to reserve trials, interrupt it as well.
+
+    Attributes
+    ----------
+    idle_time : float
+       Total number of seconds spent waiting.
+    n_waits : int
+       Number of times the worker had to wait.
+    n_wakeups : int
+       Number of times the waiting was interrupted by a change in the database.
+
+    """
+
+    def __init__(self, experiment, initial_delay=INITIAL_DELAY, max_delay=MAX_DELAY,
+                 backoff_factor=BACKOFF_FACTOR, jitter=JITTER):
+        """Initialize a scheduler for workers of `experiment`."""
+        self.experiment = experiment
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+
+        self.idle_time = 0.
+        self.n_waits = 0
+        self.n_wakeups = 0
+        self._n_idle_rounds = 0
+        self._can_watch = True
+        self._token = None
+
+    @property
+    def delay(self):
+        """Return the maximum number of seconds of the next wait."""
+        return min(self.max_delay,
+                   self.initial_delay * self.backoff_factor ** self._n_idle_rounds)
+
+    def mark(self):
+        """Remember the current point in the changes of the trials, so that the next wait
+        ends right away if they changed since then.
+        """
+        if not self._can_watch:
+            return
+
+        try:
+            self._token = self.experiment.watch_trials()
+        except NotImplementedError as e:
+            log.debug("#### Cannot watch trials, poll them instead: %s", e)
+            self._can_watch = False
+
+    def wait(self):
+        """Wait before the next attempt to reserve trials, longer than the previous time."""
+        delay = self.delay * (1 - self.jitter * random.random())
+        log.debug("#### Nothing to do, wait at most %.2f seconds.", delay)
+
+        start = time.monotonic()
+        if self._can_watch and self._watch(delay):
+            self.n_wakeups += 1
+        else:
+            time.sleep(max(0, delay - (time.monotonic() - start)))
+
+        self.idle_time += time.monotonic() - start
+        self.n_waits += 1
+        self._n_idle_rounds += 1
+
+    def _watch(self, delay):
+        """Wait for changes of the trials, return False if there was none or if they cannot
+        be watched.
+        """
+        token, self._token = self._token, None
+        try:
+            return self.experiment.wait_for_trials(delay, token)
+        except NotImplementedError as e:
+            log.debug("#### Cannot watch trials, poll them instead: %s", e)
+            self._can_watch = False
+
+        return False
+
+    def reset(self):
+        """Go back to short waits, the worker found something to do."""
+        self._n_idle_rounds = 0
+        self._token = None
+
+    @property
+    def stats(self):
+        """Return a dictionary of metrics about the time the worker was idle."""
+        return dict(idle_time=self.idle_time, n_waits=self.n_waits, n_wakeups=self.n_wakeups)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+:mod:`orion.core.worker.stats` -- Calculate stats of experiments
+================================================================
+
+.. module:: stats
+   :platform: Unix
+   :synopsis: Calculate the stats of an experiment in a few passes over its trials.
+
+"""
+import collections
+
+
+def compute_stats(database, experiment_id, start_time):
+    """Calculate a stats dictionary for an experiment.
+
+    :param database: Database holding the trials.
+    :type database: `orion.core.io.database.AbstractDB`
+    :param experiment_id: Id of the experiment in the database.
+    :param start_time: When the experiment was first dispatched and started running.
+    :type start_time: `datetime.datetime`
+
+    Returns
+    -------
+    stats : dict
+
+    Stats
+    -----
+    trials_completed : int
+       Number of completed trials
+    best_trials_id : int
+       Unique identifier of the `Trial` object in the database which achieved
+       the best known objective result. None if no trials are completed.
+    best_evaluation : float
+       Evaluation score of the best trial. None if no trials are completed.
+    start_time : `datetime.datetime`
+       When Experiment was first dispatched and started running.
+    finish_time : `datetime.datetime`
+       When Experiment reached terminating condition and stopped running.
+    duration : `datetime.timedelta`
+       Elapsed time.
+    trials_by_status : dict
+       Number of trials of each status, for the stati of at least one trial.
+
+    """
+    query = dict(
+        experiment=experiment_id,
+        status='completed'
+        )
+
+    summary = summarize_completed_trials(database, query)
+
+    stats = dict()
+    stats['trials_completed'] = summary['trials_completed']
+    stats['best_trials_id'] = summary['best_trials_id']
+    stats['best_evaluation'] = summary['best_evaluation']
+    stats['start_time'] = start_time
+    # All trials are going to finish certainly after the start date
+    # of the experiment they belong to
+    stats['finish_time'] = max(summary['finish_time'] or stats['start_time'],
+                               stats['start_time'])
+    stats['duration'] = stats['finish_time'] - stats['start_time']
+
+    groups = database.group('trials', {'experiment': experiment_id}, keys=['status'],
+                            accumulators={'n_trials': ('count', None)})
+    stats['trials_by_status'] = dict((group['status'], group['n_trials'])
+                                     for group in groups)
+
+    return stats
+
+
+def summarize_completed_trials(database, query):
+    """Summarize the completed trials matching `query`.
+
+    The summary is computed inside the database if it supports aggregations, otherwise
+    by streaming the minimal set of fields of the trials.
+
+    :param database: Database holding the trials.
+    :type database: `orion.core.io.database.AbstractDB`
+    :param query: Query matching the completed trials of an experiment.
+    :return: dict with `trials_completed`, `best_trials_id`, `best_evaluation` and
+       `finish_time`, the latter three being None if no trials are completed.
+    """
+    try:
+        return _aggregate_summary(database, query)
+    except NotImplementedError:
+        return _stream_summary(database, query)
+
+
+def _aggregate_summary(database, query):
+    """Summarize completed trials inside the database, in a single pass.
+
+    :raises :exc:`NotImplementedError`: if the database does not support aggregations.
+    """
+    pipeline = [
+        {'$match': query},
+        {'$project': {
+            'end_time': 1,
+            'objective': {'$filter': {'input': '$results', 'as': 'result',
+                                      'cond': {'$eq': ['$$result.type', 'objective']}}}}},
+        {'$group': {
+            '_id': None,
+            'trials_completed': {'$sum': 1},
+            'finish_time': {'$max': '$end_time'},
+            # Documents are compared field by field in order, best objective first.
+            'best': {'$min': collections.OrderedDict([
+                ('value', {'$arrayElemAt': ['$objective.value', 0]}),
+                ('id', '$_id')])}}}]
+
+    summary = database.aggregate('trials', pipeline)
+    if not summary:
+        return _empty_summary()
+
+    return dict(
+        trials_completed=summary[0]['trials_completed'],
+        best_trials_id=summary[0]['best']['id'],
+        best_evaluation=summary[0]['best']['value'],
+        finish_time=summary[0]['finish_time'])
+
+
+def _stream_summary(database, query):
+    """Summarize completed trials in a single pass over the minimal set of fields."""
+    summary = _empty_summary()
+    selection = {'_id': 1, 'end_time': 1, 'results': 1}
+    for trial in database.read_iter('trials', query, selection):
+        summary['trials_completed'] += 1
+
+        if (trial['end_time'] is not None and
+                (summary['finish_time'] is None or trial['end_time'] > summary['finish_time'])):
+            summary['finish_time'] = trial['end_time']
+
+        objective = [result['value'] for result in trial['results']
+                     if result['type'] == 'objective']
+        if objective and (summary['best_evaluation'] is None or
+                          objective[0] < summary['best_evaluation']):
+            summary['best_evaluation'] = objective[0]
+            summary['best_trials_id'] = trial['_id']
+
+    return summary
+
+
+def _empty_summary():
+    """Return the summary of an experiment without any completed trials."""
+    return dict(trials_completed=0, best_trials_id=None, best_evaluation=None,
+                finish_time=None)
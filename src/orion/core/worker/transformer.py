@@ -15,7 +15,7 @@ from abc import (ABCMeta, abstractmethod)
 
 import numpy
 
-from orion.algo.space import (Dimension, Space)
+from orion.algo.space import (Dimension, PointArray, Space)
 
 
 def build_required_space(requirements, original_space):
@@ -100,6 +100,22 @@ class Transformer(object, metaclass=ABCMeta):
         """Reverse transform a point from target dimension to the domain dimension."""
         pass
 
+    def transform_batch(self, points):
+        """Transform an array of points, stacked along its first axis, from domain
+        dimension to the target dimension.
+
+        By default, points are transformed one by one.
+        """
+        return numpy.asarray([self.transform(point) for point in points])
+
+    def reverse_batch(self, transformed_points):
+        """Reverse transform an array of points, stacked along its first axis, from
+        target dimension to the domain dimension.
+
+        By default, points are reversed one by one.
+        """
+        return numpy.asarray([self.reverse(point) for point in transformed_points])
+
     def infer_target_shape(self, shape):
         """Return the shape of the dimension after transformation."""
         return shape
@@ -135,6 +151,14 @@ class Identity(Transformer):
         """Return `transformed_point` as it is."""
         return transformed_point
 
+    def transform_batch(self, points):
+        """Return `points` as they are."""
+        return points
+
+    def reverse_batch(self, transformed_points):
+        """Return `transformed_points` as they are."""
+        return transformed_points
+
     def repr_format(self, what):
         """Format a string for calling ``__repr__`` in `TransformedDimension`."""
         return what
@@ -177,6 +201,16 @@ class Compose(Transformer):
         transformed_point = self.apply.reverse(transformed_point)
         return self.composition.reverse(transformed_point)
 
+    def transform_batch(self, points):
+        """Apply batch transformations in the increasing order of the `transformers` list."""
+        points = self.composition.transform_batch(points)
+        return self.apply.transform_batch(points)
+
+    def reverse_batch(self, transformed_points):
+        """Reverse batch transformations in the opposite order of the `transformers` list."""
+        transformed_points = self.apply.reverse_batch(transformed_points)
+        return self.composition.reverse_batch(transformed_points)
+
     def infer_target_shape(self, shape):
         """Return the shape of the dimension after transformation."""
         shape = self.composition.infer_target_shape(shape)
@@ -224,6 +258,14 @@ class Reverse(Transformer):
         """Use `transform` of composed `transformer`."""
         return self.transformer.transform(transformed_point)
 
+    def transform_batch(self, points):
+        """Use `reverse_batch` of composed `transformer`."""
+        return self.transformer.reverse_batch(points)
+
+    def reverse_batch(self, transformed_points):
+        """Use `transform_batch` of composed `transformer`."""
+        return self.transformer.transform_batch(transformed_points)
+
     def repr_format(self, what):
         """Format a string for calling ``__repr__`` in `TransformedDimension`."""
         return "{}{}".format(self.__class__.__name__, self.transformer.repr_format(what))
@@ -253,6 +295,14 @@ class Quantize(Transformer):
         """Cast `transformed_point` to floats, as numpy arrays."""
         return numpy.asarray(transformed_point).astype(float)
 
+    def transform_batch(self, points):
+        """Cast all `points` at once, as casting is element-wise."""
+        return self.transform(points)
+
+    def reverse_batch(self, transformed_points):
+        """Cast all `transformed_points` at once, as casting is element-wise."""
+        return self.reverse(transformed_points)
+
 
 class Enumerate(Transformer):
     """Enumerate categories.
@@ -266,23 +316,35 @@ class Enumerate(Transformer):
     def __init__(self, categories):
         """Initialize `Enumerate` transformation with a list of `categories`."""
         self.categories = categories
-        map_dict = {cat: i for i, cat in enumerate(categories)}
-        self._map = numpy.vectorize(lambda x: map_dict[x], otypes='i')
-        self._imap = numpy.vectorize(lambda x: categories[x], otypes=[numpy.object])
+        self._map = {cat: i for i, cat in enumerate(categories)}
+        # Filled one by one, so that categories which are sequences stay objects
+        self._imap = numpy.empty(len(categories), dtype=object)
+        for i, cat in enumerate(categories):
+            self._imap[i] = cat
 
     def transform(self, point):
         """Return integers corresponding uniquely to the categories in `point`.
 
         :rtype: numpy.ndarray, integer
         """
-        return self._map(point)
+        point_ = point if isinstance(point, numpy.ndarray) else numpy.asarray(point, dtype=object)
+        return numpy.fromiter((self._map[cat] for cat in point_.flat),
+                              dtype=int, count=point_.size).reshape(point_.shape)
 
     def reverse(self, transformed_point):
         """Return categories corresponding to their positions inside `transformed_point`.
 
-        :rtype: numpy.ndarray, numpy.object
+        :rtype: numpy.ndarray, object
         """
-        return self._imap(transformed_point)
+        return self._imap[numpy.asarray(transformed_point, dtype=int)]
+
+    def transform_batch(self, points):
+        """Look up the integers of all categories in `points` at once."""
+        return self.transform(points)
+
+    def reverse_batch(self, transformed_points):
+        """Index the array of categories with all `transformed_points` at once."""
+        return self.reverse(transformed_points)
 
 
 class OneHotEncode(Transformer):
@@ -312,11 +374,7 @@ class OneHotEncode(Transformer):
         if self.num_cats <= 2:
             return numpy.asarray(point_, dtype=float)
 
-        hot = numpy.zeros(self.infer_target_shape(point_.shape))
-        grid = numpy.meshgrid(*[numpy.arange(dim) for dim in point_.shape],
-                              indexing='ij')
-        hot[grid + [point_]] = 1
-        return hot
+        return numpy.eye(self.num_cats)[point_.astype(int)]
 
     def reverse(self, transformed_point):
         """Match real vector representations to integers using an argmax function.
@@ -338,6 +396,14 @@ class OneHotEncode(Transformer):
         assert point_.shape[-1] == self.num_cats
         return point_.argmax(axis=-1)
 
+    def transform_batch(self, points):
+        """Encode all `points` at once, by indexing rows of an identity matrix."""
+        return self.transform(points)
+
+    def reverse_batch(self, transformed_points):
+        """Decode all `transformed_points` at once, along their last axis."""
+        return self.reverse(transformed_points)
+
     def infer_target_shape(self, shape):
         """Infer that transformed points will have one more tensor dimension,
         if the number of supported integers to transform is larger than 2.
@@ -372,11 +438,23 @@ class TransformedDimension(object):
         """Expose `Transformer.reverse` interface from underlying instance."""
         return self.transformer.reverse(transformed_point)
 
+    def transform_batch(self, points):
+        """Expose `Transformer.transform_batch` interface from underlying instance."""
+        return self.transformer.transform_batch(points)
+
+    def reverse_batch(self, transformed_points):
+        """Expose `Transformer.reverse_batch` interface from underlying instance."""
+        return self.transformer.reverse_batch(transformed_points)
+
     def sample(self, n_samples=1, seed=None):
         """Sample from the original dimension and forward transform them."""
         samples = self.original_dimension.sample(n_samples, seed)
         return [self.transform(sample) for sample in samples]
 
+    def sample_array(self, n_samples=1, seed=None):
+        """Sample from the original dimension and forward transform them all at once."""
+        return self.transform_batch(self.original_dimension.sample_array(n_samples, seed))
+
     def interval(self, alpha=1.0):
         """Map the interval bounds to the transformed ones."""
         try:
@@ -397,6 +475,16 @@ class TransformedDimension(object):
             return False
         return orig_point in self.original_dimension
 
+    def contains_array(self, points):
+        """Reverse transform all `points` at once and ask the original dimension which
+        of them are possible samples.
+        """
+        try:
+            orig_points = self.reverse_batch(points)
+        except AssertionError:
+            return numpy.array([point in self for point in points], dtype=bool)
+        return self.original_dimension.contains_array(orig_points)
+
     def __repr__(self):
         """Represent the object as a string."""
         return self.transformer.repr_format(repr(self.original_dimension))
@@ -467,11 +555,37 @@ class TransformedSpace(Space):
     contains = TransformedDimension
 
     def transform(self, point):
-        """Transform a point that was in the original space to be in this one."""
+        """Transform a point that was in the original space to be in this one.
+
+        If `point` is a `orion.algo.space.PointArray`, all its points are transformed at once.
+        """
+        if isinstance(point, PointArray):
+            return self.transform_batch(point)
+
         return tuple([dim.transform(point[i]) for i, dim in enumerate(self.values())])
 
     def reverse(self, transformed_point):
         """Reverses transformation so that a point from this `TransformedSpace`
         to be in the original one.
+
+        If `transformed_point` is a `orion.algo.space.PointArray`, all its points are
+        reversed at once.
         """
+        if isinstance(transformed_point, PointArray):
+            return self.reverse_batch(transformed_point)
+
         return tuple([dim.reverse(transformed_point[i]) for i, dim in enumerate(self.values())])
+
+    def transform_batch(self, points):
+        """Transform a `orion.algo.space.PointArray` from the original space, one column
+        per dimension.
+        """
+        return PointArray([dim.transform_batch(column)
+                           for column, dim in zip(points.columns, self.values())])
+
+    def reverse_batch(self, transformed_points):
+        """Reverse a `orion.algo.space.PointArray` of this `TransformedSpace` to the
+        original one, one column per dimension.
+        """
+        return PointArray([dim.reverse_batch(column)
+                           for column, dim in zip(transformed_points.columns, self.values())])
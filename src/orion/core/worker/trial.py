@@ -9,12 +9,55 @@
    :synopsis: Describe a particular training run, parameters and results
 
 """
+import copy
 import hashlib
 import logging
+import numbers
+import struct
 
 log = logging.getLogger(__name__)
 
 
+def _encode(value):
+    """Encode `value` into bytes which do not depend on its exact Python or NumPy type.
+
+    Values of different kinds (e.g. the integer ``1`` and the string ``'1'``) never share
+    the same encoding, while equal numbers (e.g. ``1``, ``1.0`` and ``numpy.int64(1)``) do.
+    """
+    if hasattr(value, 'tolist'):  # NumPy scalars and arrays
+        value = value.tolist()
+
+    if value is None:
+        return b'N'
+    if isinstance(value, bool):
+        return b'T' if value else b'F'
+    if isinstance(value, numbers.Integral) or (isinstance(value, numbers.Real) and
+                                               float(value).is_integer()):
+        return _encode_bytes(b'I', str(int(value)).encode('ascii'))
+    if isinstance(value, numbers.Real):
+        return b'R' + struct.pack('>d', float(value))
+    if isinstance(value, str):
+        return _encode_bytes(b'S', value.encode('utf-8'))
+    if isinstance(value, (list, tuple)):
+        return b''.join([b'L', struct.pack('>I', len(value))] + [_encode(item) for item in value])
+
+    return _encode_bytes(b'O', repr(value).encode('utf-8'))
+
+
+def _encode_bytes(tag, data):
+    """Prefix `data` with its `tag` and length so that concatenations are not ambiguous."""
+    return tag + struct.pack('>I', len(data)) + data
+
+
+def _is_set(obj, slot):
+    """Tell if `slot` has a value, without loading it lazily."""
+    try:
+        object.__getattribute__(obj, slot)
+    except AttributeError:
+        return False
+    return True
+
+
 class Trial(object):
     """Represents an entry in database/trials collection.
 
@@ -48,6 +91,8 @@ class Trial(object):
        When was this trial first reserved?
     end_time : `datetime.datetime`
        When was this trial evaluated successfully?
+    heartbeat : `datetime.datetime`
+       Last time the worker evaluating this *reserved* trial reported to be alive.
     results : list of `Trial.Result`
        List of evaluated metrics for this particular set of params. One and only
        one of them is necessarily an *objective* function value. The other are
@@ -55,22 +100,117 @@ class Trial(object):
     params : list of `Trial.Param`
        List of suggested values for the `Experiment` parameter space.
        Consists a sample to be evaluated.
+    hash_type : str
+       Function used to compute `Trial.hash_name`, one of `Trial.hash_types`.
+       It is a property of the `Experiment` and it is not saved with the trial.
+
+       * 'md5' : md5 of the string representation of the params, as done
+          since the first versions of **Oríon**.
+       * 'blake2b' : blake2b of a binary encoding of the params which does not
+          depend on the Python or NumPy types of their values. Requires Python 3.6
+          or later.
 
     """
 
+    hash_types = ('md5', 'blake2b')
+
+    @classmethod
+    def validate_hash_type(cls, hash_type):
+        """Raise `ValueError` if `hash_type` is not one of `Trial.hash_types` available
+        with this version of Python.
+        """
+        if hash_type not in cls.hash_types:
+            raise ValueError("Given hash type, {0}, not one of: {1}".format(
+                hash_type, cls.hash_types))
+        if not hasattr(hashlib, hash_type):
+            raise ValueError("Given hash type, {0}, is not available with this version of "
+                             "Python, use one of: {1}".format(
+                                 hash_type, tuple(name for name in cls.hash_types
+                                                  if hasattr(hashlib, name))))
+
     @classmethod
-    def build(cls, trial_entries):
+    def build(cls, trial_entries, hash_type='md5', loader=None):
         """Builder method for a list of trials.
 
         :param trial_entries: List of trial representation in dictionary form,
            as expected to be saved in a database.
+        :param hash_type: Function computing the ids of the trials, see `Trial.hash_type`.
+        :param loader: Function loading the fields missing from partial entries,
+           see `Trial.from_document`.
 
         :returns: a list of corresponding `Trial` objects.
         """
-        trials = []
-        for entry in trial_entries:
-            trials.append(cls(**entry))
-        return trials
+        return [cls.from_document(entry, hash_type, loader) for entry in trial_entries]
+
+    @classmethod
+    def from_document(cls, document, hash_type='md5', loader=None):
+        """Build a `Trial` from a document read from the database.
+
+        Contrarily to `Trial(**document)`, the content of `document` is trusted and not
+        validated again. `Trial.params` and `Trial.results` are only converted to
+        `Trial.Param` and `Trial.Result` objects when first accessed.
+
+        :param document: Trial representation in dictionary form, possibly partial
+           if only some fields were selected.
+        :param hash_type: Function computing the id of the trial, see `Trial.hash_type`.
+        :param loader: Function returning the whole document given the id of the trial.
+           If given, fields missing from a partial `document` are loaded the first time
+           one of them is accessed, otherwise they are left empty.
+
+        :returns: the corresponding `Trial` object.
+        """
+        trial = cls.__new__(cls)
+        trial._hash_name = None
+        trial._hash_type = None
+        trial.hash_type = hash_type
+        trial._document_id = document.get('_id')
+        trial._loader = loader if trial._document_id is not None else None
+        trial._set_fields(document)
+        if trial._loader is None:
+            trial._set_fields({})
+        return trial
+
+    def _set_fields(self, document):
+        """Set the fields found in `document` which are not set yet, or all of them to
+        their default values if `document` is empty.
+        """
+        for attrname in self._attributes:
+            slot = '_' + attrname if attrname in ('status', 'experiment') else attrname
+            if not _is_set(self, slot) and (attrname in document or not document):
+                setattr(self, slot, document.get(attrname, 'new' if slot == '_status' else None))
+        for attrname in ('params', 'results'):
+            slot = '_' + attrname
+            if not _is_set(self, slot) and (attrname in document or not document):
+                setattr(self, slot, tuple(document.get(attrname, ())))
+        self._hash_name = None
+
+    def __getattr__(self, name):
+        """Load the fields missing from a partial document, see `Trial.from_document`."""
+        if name not in self.__slots__ or name == '_loader' or self._loader is None:
+            raise AttributeError("'{}' object has no attribute '{}'".format(
+                type(self).__name__, name))
+
+        loader, self._loader = self._loader, None
+        log.debug("Loading fields of trial %s missing from a partial document.",
+                  self._document_id)
+        self._set_fields(loader(self._document_id) or {'_id': self._document_id})
+        self._set_fields({})
+        return getattr(self, name)
+
+    def __deepcopy__(self, memo):
+        """Copy the trial, sharing the loader of the fields not loaded yet.
+
+        The hash is not copied, since copies are usually made to modify `params` in place.
+        """
+        trial = type(self).__new__(type(self))
+        for slot in self.__slots__:
+            if _is_set(self, slot):
+                value = object.__getattribute__(self, slot)
+                if slot != '_loader':
+                    value = copy.deepcopy(value, memo)
+                setattr(trial, slot, value)
+        trial._hash_name = None
+        return trial
 
     class Value(object):
         """Container for a value object.
@@ -97,6 +237,15 @@ class Trial(object):
             for attrname, value in kwargs.items():
                 setattr(self, attrname, value)
 
+        @classmethod
+        def from_dict(cls, document):
+            """Build a `Value` from its dictionary form without validating its type."""
+            value = cls.__new__(cls)
+            value.name = document.get('name')
+            value._type = document.get('type')
+            value.value = document.get('value')
+            return value
+
         def to_dict(self):
             """Needed to be able to convert `Value` to `dict` form."""
             ret = dict(
@@ -147,17 +296,23 @@ class Trial(object):
         __slots__ = ()
         allowed_types = ('integer', 'real', 'categorical')
 
-    __slots__ = ('experiment', '_status', 'worker',
-                 'submit_time', 'start_time', 'end_time', 'results', 'params')
+    __slots__ = ('_experiment', '_status', 'worker',
+                 'submit_time', 'start_time', 'end_time', 'heartbeat', '_results', '_params',
+                 '_hash_name', '_hash_type', '_document_id', '_loader')
     allowed_stati = ('new', 'reserved', 'suspended', 'completed', 'interrupted', 'broken')
+    _attributes = ('experiment', 'status', 'worker',
+                   'submit_time', 'start_time', 'end_time', 'heartbeat')
 
     def __init__(self, **kwargs):
         """See attributes of `Trial` for meaning and possible arguments for `kwargs`."""
-        for attrname in self.__slots__:
-            if attrname in ('results', 'params'):
-                setattr(self, attrname, list())
-            else:
-                setattr(self, attrname, None)
+        for attrname in self._attributes:
+            setattr(self, attrname, None)
+        self._results = []
+        self._params = []
+        self._hash_name = None
+        self._hash_type = 'md5'
+        self._document_id = None
+        self._loader = None
 
         self.status = 'new'
 
@@ -166,13 +321,9 @@ class Trial(object):
 
         for attrname, value in kwargs.items():
             if attrname == 'results':
-                attr = getattr(self, attrname)
-                for item in value:
-                    attr.append(self.Result(**item))
+                self.results = [self.Result(**item) for item in value]
             elif attrname == 'params':
-                attr = getattr(self, attrname)
-                for item in value:
-                    attr.append(self.Param(**item))
+                self.params = [self.Param(**item) for item in value]
             else:
                 setattr(self, attrname, value)
 
@@ -180,16 +331,17 @@ class Trial(object):
         """Needed to be able to convert `Trial` to `dict` form."""
         trial_dictionary = dict()
 
-        for attrname in self.__slots__:
-
-            attrname = attrname.lstrip("_")
+        for attrname in self._attributes:
             trial_dictionary[attrname] = getattr(self, attrname)
 
-        # Overwrite "results" and "params" with list of dictionaries rather
+        # Add "results" and "params" as list of dictionaries rather
         # than list of Value objects
         for attrname in ('results', 'params'):
-            trial_dictionary[attrname] = list(map(lambda x: x.to_dict(),
-                                                  getattr(self, attrname)))
+            values = getattr(self, '_' + attrname)
+            if isinstance(values, tuple):  # Not converted to `Value` objects yet
+                trial_dictionary[attrname] = [dict(document) for document in values]
+            else:
+                trial_dictionary[attrname] = [value.to_dict() for value in values]
 
         trial_dictionary['_id'] = self.id
 
@@ -203,6 +355,16 @@ class Trial(object):
 
     __repr__ = __str__
 
+    @property
+    def experiment(self):
+        """For meaning of property experiment, see `Trial.experiment`."""
+        return self._experiment
+
+    @experiment.setter
+    def experiment(self, experiment):
+        self._experiment = experiment
+        self._hash_name = None
+
     @property
     def status(self):
         """For meaning of property type, see `Trial.status`."""
@@ -215,6 +377,41 @@ class Trial(object):
                 status, self.allowed_stati))
         self._status = status
 
+    @property
+    def results(self):
+        """For meaning of property results, see `Trial.results`."""
+        if isinstance(self._results, tuple):
+            self._results = [self.Result.from_dict(document) for document in self._results]
+        return self._results
+
+    @results.setter
+    def results(self, results):
+        self._results = list(results)
+
+    @property
+    def params(self):
+        """For meaning of property params, see `Trial.params`."""
+        if isinstance(self._params, tuple):
+            self._params = [self.Param.from_dict(document) for document in self._params]
+        return self._params
+
+    @params.setter
+    def params(self, params):
+        self._params = list(params)
+        self._hash_name = None
+
+    @property
+    def hash_type(self):
+        """For meaning of property hash_type, see `Trial.hash_type`."""
+        return self._hash_type
+
+    @hash_type.setter
+    def hash_type(self, hash_type):
+        self.validate_hash_type(hash_type)
+        if hash_type != self._hash_type:
+            self._hash_type = hash_type
+            self._hash_name = None
+
     @property
     def id(self):
         """Return hash_name which is also the database key `_id`."""
@@ -249,11 +446,33 @@ class Trial(object):
         """Generate a unique name with an md5sum hash for this `Trial`.
 
         .. note:: Two trials that have the same `params` must have the same `hash_name`.
+
+        .. note:: The hash is computed once and cached until `params`, `experiment` or
+           `hash_type` are set again. Assign `params` again after modifying them in place.
+
+        .. seealso:: `Trial.hash_type` for the functions used to compute it.
         """
+        if self._hash_name is not None:
+            return self._hash_name
+
+        if self._document_id is not None and not (_is_set(self, '_params') and
+                                                  _is_set(self, '_experiment')):
+            # Left out of a partial document, which gave the id
+            return self._document_id
+
         if not self.params and not self.experiment:
             raise ValueError("Cannot distinguish this trial, as 'params' or 'experiment' "
                              "have not been set.")
-        return hashlib.md5((self.params_repr() + str(self.experiment)).encode('utf-8')).hexdigest()
+        if self._hash_type == 'md5':
+            self._hash_name = hashlib.md5(
+                (self.params_repr() + str(self.experiment)).encode('utf-8')).hexdigest()
+        else:
+            encoded = [_encode(str(self.experiment))]
+            for param in self.params:
+                encoded.append(_encode(param.name))
+                encoded.append(_encode(param.value))
+            self._hash_name = hashlib.blake2b(b''.join(encoded), digest_size=16).hexdigest()
+        return self._hash_name
 
     def __hash__(self):
         """Return the hashname for this trial"""
@@ -127,6 +127,45 @@ def test_demo_two_workers(database, monkeypatch):
     assert params[0]['type'] == 'real'
 
 
+@pytest.mark.usefixtures("clean_db")
+@pytest.mark.usefixtures("null_db_instances")
+def test_demo_n_workers(database, monkeypatch):
+    """Test a single worker evaluating many trials concurrently."""
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+    orion.core.cli.main(["hunt", "-n", "n_workers_demo",
+                         "--config", "./orion_config_random.yaml",
+                         "--max-trials", "40", "--n-workers", "4",
+                         "./black_box.py", "-x~norm(34, 3)"])
+
+    exp = list(database.experiments.find({'name': 'n_workers_demo'}))
+    assert len(exp) == 1
+    exp_id = exp[0]['_id']
+
+    trials = list(database.trials.find({'experiment': exp_id, 'status': 'completed'}))
+    # At most `n_workers - 1` trials may still be running when `max_trials` is reached.
+    assert len(trials) >= 40
+    assert len(trials) <= 43
+    assert database.trials.count({'experiment': exp_id, 'status': 'reserved'}) == 0
+
+
+@pytest.mark.usefixtures("clean_db")
+@pytest.mark.usefixtures("null_db_instances")
+def test_demo_batch_size(database, monkeypatch):
+    """Test a worker reserving trials by batches, releasing those it did not evaluate."""
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+    orion.core.cli.main(["hunt", "-n", "batch_size_demo",
+                         "--config", "./orion_config_random.yaml",
+                         "--max-trials", "20", "--batch-size", "8",
+                         "./black_box.py", "-x~norm(34, 3)"])
+
+    exp = list(database.experiments.find({'name': 'batch_size_demo'}))
+    assert len(exp) == 1
+    exp_id = exp[0]['_id']
+
+    assert database.trials.count({'experiment': exp_id, 'status': 'completed'}) == 20
+    assert database.trials.count({'experiment': exp_id, 'status': 'reserved'}) == 0
+
+
 @pytest.mark.usefixtures("clean_db")
 def test_workon(database):
     """Test scenario having a configured experiment already setup."""
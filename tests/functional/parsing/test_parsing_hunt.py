@@ -38,3 +38,63 @@ def test_hunt_command_full_parsing(database, monkeypatch):
     assert args['user_args'] == ['./black_box.py', '-x~normal(1,1)']
     assert args['pool_size'] == 4
     assert args['max_trials'] == 400
+    assert args['n_workers'] == 1
+    assert args['batch_size'] == 1
+    assert args['is_done_ttl'] == 0
+    assert args['trial_hash'] is None
+
+
+def test_hunt_command_n_workers_parsing(monkeypatch):
+    """Test the parsing of the `--n-workers` option of the `hunt` command"""
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+    parser, subparsers = _create_parser()
+    args_list = ["hunt", "-n", "test", "--n-workers", "8",
+                 "./black_box.py", "-x~normal(1,1)"]
+
+    hunt.add_subparser(subparsers)
+    subparsers.choices['hunt'].set_defaults(func='')
+
+    args = vars(parser.parse_args(args_list))
+    assert args['n_workers'] == 8
+
+
+def test_hunt_command_batch_size_parsing(monkeypatch):
+    """Test the parsing of the `--batch-size` option of the `hunt` command"""
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+    parser, subparsers = _create_parser()
+    args_list = ["hunt", "-n", "test", "--batch-size", "4",
+                 "./black_box.py", "-x~normal(1,1)"]
+
+    hunt.add_subparser(subparsers)
+    subparsers.choices['hunt'].set_defaults(func='')
+
+    args = vars(parser.parse_args(args_list))
+    assert args['batch_size'] == 4
+
+
+def test_hunt_command_is_done_ttl_parsing(monkeypatch):
+    """Test the parsing of the `--is-done-ttl` option of the `hunt` command"""
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+    parser, subparsers = _create_parser()
+    args_list = ["hunt", "-n", "test", "--is-done-ttl", "2.5",
+                 "./black_box.py", "-x~normal(1,1)"]
+
+    hunt.add_subparser(subparsers)
+    subparsers.choices['hunt'].set_defaults(func='')
+
+    args = vars(parser.parse_args(args_list))
+    assert args['is_done_ttl'] == 2.5
+
+
+def test_hunt_command_trial_hash_parsing(monkeypatch):
+    """Test the parsing of the `--trial-hash` option of the `hunt` command"""
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+    parser, subparsers = _create_parser()
+    args_list = ["hunt", "-n", "test", "--trial-hash", "blake2b",
+                 "./black_box.py", "-x~normal(1,1)"]
+
+    hunt.add_subparser(subparsers)
+    subparsers.choices['hunt'].set_defaults(func='')
+
+    args = vars(parser.parse_args(args_list))
+    assert args['trial_hash'] == 'blake2b'
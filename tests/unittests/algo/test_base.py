@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 """Example usage and tests for :mod:`orion.algo.base`."""
 
+import pytest
+
 from orion.algo.base import BaseAlgorithm
 
 
@@ -67,3 +69,11 @@ def test_space_setter(dumbalgo):
     assert algo.naedw.value == 9
     assert algo.naekei.space == 'etsh'
     assert algo.naekei.judgement == 10
+
+
+def test_state_dict_not_supported(dumbalgo):
+    """Check algorithms cannot save their state by default."""
+    algo = dumbalgo(8, value=1)
+    assert algo.state_dict is None
+    with pytest.raises(NotImplementedError):
+        algo.set_state({})
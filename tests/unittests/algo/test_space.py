@@ -9,7 +9,7 @@ from numpy.testing import assert_array_equal as assert_eq
 import pytest
 from scipy.stats import distributions as dists
 
-from orion.algo.space import (Categorical, Dimension, Integer, Real, Space)
+from orion.algo.space import (Categorical, Dimension, Integer, PointArray, Real, Space)
 
 
 class TestDimension(object):
@@ -83,11 +83,41 @@ class TestDimension(object):
         assert len(samples) == 4
         assert_eq(dists.uniform.rvs(-3, 4, size=(4, 4)), samples[0])
 
+    def test_sample_array(self, seed):
+        """Draw all samples at once in a single array."""
+        dim = Dimension('yolo', 'uniform', -3, 4, shape=(4, 4))
+        samples = dim.sample_array(n_samples=4, seed=seed)
+        assert samples.shape == (4, 4, 4)
+        assert_eq(dists.uniform.rvs(-3, 4, size=(4, 4, 4)), samples)
+
     def test_interval(self):
         """Test that bounds on variable."""
         dim = Dimension('yolo', 'uniform', -3, 4)
         assert dim.interval(1.0) == (-3.0, 1.0)  # reminder that `scale` is not upper bound
 
+    def test_cached_shape_and_interval(self, monkeypatch):
+        """Test that shape and full support are computed once, until validated again."""
+        dim = Dimension('yolo', 'uniform', -3, 4, shape=2)
+        assert dim.shape == (2, )
+        assert dim.interval() == (-3.0, 1.0)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("Should have been cached")
+
+        monkeypatch.setattr(dim.prior, '_parse_args_rvs', fail)
+        monkeypatch.setattr(dim.prior, 'interval', fail)
+        assert dim.shape == (2, )
+        assert dim.interval() == (-3.0, 1.0)
+        with pytest.raises(AssertionError):
+            dim.interval(0.5)
+
+        monkeypatch.undo()
+        dim._shape = 3
+        dim._args = (-2, 4)
+        dim.validate()
+        assert dim.shape == (3, )
+        assert dim.interval() == (-2.0, 2.0)
+
     def test_contains_bounds(self):
         """Test __contains__ for bounds."""
         dim = Dimension('yolo', 'uniform', -3, 4)
@@ -154,6 +184,14 @@ class TestReal(object):
             for sample in samples:
                 assert sample in dim
 
+    def test_sample_redraws_out_of_bounds(self, seed):
+        """Only samples out of the extra bounds should be drawn again."""
+        dim = Real('yolo', 'norm', 0, 1, low=-2, high=+2)
+        samples = dim.sample_array(1000, seed=seed)
+        assert samples.shape == (1000, )
+        assert np.all(samples >= -2) and np.all(samples < 2)
+        assert len(np.unique(samples)) == 1000
+
     def test_sample_from_extra_bounds_bad(self):
         """Randomized test **unsuccessfully** sampling with the extra bounds."""
         dim = Real('yolo', 'norm', 0, 2, low=-2, high=+2, shape=(4, 4))
@@ -257,6 +295,12 @@ class TestInteger(object):
         dim = Integer('yolo2', 'randint', -2, 4, loc=8)
         assert dim.interval() == (6, 12)
 
+    def test_cardinality(self):
+        """Count the integers within the interval, for each item of the shape."""
+        assert Integer('yolo', 'uniform', -3, 6).cardinality == 6
+        assert Integer('yolo', 'uniform', -3, 6, shape=2).cardinality == 36
+        assert Integer('yolo', 'poisson', 5).cardinality == np.inf
+
     def test_init_with_default_value(self):
         """Make sure the type of the default value is int"""
         dim = Integer('yolo', 'uniform', -3, 10, default_value=2)
@@ -327,6 +371,14 @@ class TestCategorical(object):
         assert dim.type == 'categorical'
         assert dim.shape == ()
 
+    def test_sample_array(self, seed):
+        """Draw all samples at once in a single array."""
+        dim = Categorical('yolo', ('asdfa', 2, 3), shape=2)
+        samples = dim.sample_array(n_samples=5, seed=seed)
+        assert samples.shape == (5, 2)
+        assert all(sample in dim for sample in samples)
+        assert all(sample in dim for sample in dim.sample(5))
+
     def test_probabilities_are_ok(self, seed):
         """Test that the probabilities given are legit using law of big numbers."""
         bins = defaultdict(int)
@@ -350,6 +402,32 @@ class TestCategorical(object):
         assert 3 not in dim
         assert ('asdfa', 2) in dim
 
+    def test_contains_array(self):
+        """Check categories of many points at once."""
+        categories = {'asdfa': 0.1, 2: 0.2, 3: 0.3, 4: 0.4}
+        dim = Categorical('yolo', categories, shape=2)
+
+        points = np.array([['asdfa', 2], [3, '2'], [4, 4], [2., 3]], dtype=np.object)
+        assert_eq(dim.contains_array(points), [True, False, True, True])
+        assert_eq(dim.contains_array(np.array(['asdfa', 2], dtype=np.object)), [False, False])
+
+    def test_unhashable_categories(self):
+        """Categories which cannot be hashed are still found."""
+        dim = Categorical('yolo', ({'a': 1}, 2))
+
+        assert {'a': 1} in dim
+        assert 2 in dim
+        assert {'a': 2} not in dim
+        points = np.empty(3, dtype=np.object)
+        points[:] = [{'a': 1}, 3, 2]
+        assert_eq(dim.contains_array(points), [True, False, True])
+
+    def test_cardinality(self):
+        """Count the combinations of categories."""
+        categories = {'asdfa': 0.1, 2: 0.2, 3: 0.3, 4: 0.4}
+        assert Categorical('yolo', categories).cardinality == 4
+        assert Categorical('yolo', categories, shape=2).cardinality == 16
+
     def test_repr_too_many_cats(self):
         """Check ellipsis on str/repr of too many categories."""
         categories = tuple(range(10))
@@ -484,6 +562,16 @@ class TestSpace(object):
         assert (('asdfa', 2), 0, 3.5) in space
         assert (('asdfa', 2), 7, 3.5) not in space
 
+    def test_cardinality(self):
+        """Multiply cardinalities of dimensions, infinite with any continuous one."""
+        space = Space()
+        space.register(Categorical('yolo', ('asdfa', 2, 3), shape=2))
+        space.register(Integer('yolo2', 'uniform', -3, 6))
+        assert space.cardinality == 9 * 6
+
+        space.register(Real('yolo3', 'norm', 0.9))
+        assert space.cardinality == np.inf
+
     def test_bad_contain(self):
         """Checking with no iterables does no good."""
         space = Space()
@@ -594,3 +682,90 @@ class TestSpace(object):
                              "default value=None),\n"\
                              "       Real(name=yolo3, prior={norm: (0.9,), {}}, shape=(), "\
                              "default value=None)])"
+
+
+@pytest.fixture
+def space():
+    """Construct a space with every kind of dimension."""
+    space = Space()
+    space.register(Categorical('yolo', ('asdfa', 2, 3, 4), shape=2))
+    space.register(Integer('yolo2', 'uniform', -3, 6))
+    space.register(Real('yolo3', 'norm', 0.9))
+    return space
+
+
+class TestPointArray(object):
+    """Test methods of a `PointArray` object."""
+
+    def test_from_points(self, space):
+        """Stack points in one column per dimension."""
+        points = [(('asdfa', 2), 0, 3.5), ((3, 4), -2, 0.5)]
+        point_array = PointArray.from_points(points, space)
+        assert len(point_array) == 2
+        assert point_array.columns[0].shape == (2, 2)
+        assert point_array.columns[0].dtype == object
+        assert_eq(point_array.columns[1], [0, -2])
+        assert_eq(point_array.columns[2], [3.5, 0.5])
+
+        assert point_array[1][1:] == (-2, 0.5)
+        assert_eq(point_array[-1][0], (3, 4))
+        assert len(point_array[:1]) == 1
+        assert [point[1] for point in point_array] == [0, -2]
+
+    def test_from_no_points(self, space):
+        """An empty list gives empty columns."""
+        point_array = PointArray.from_points([], space)
+        assert len(point_array) == 0
+        assert list(point_array) == []
+        assert point_array in space
+
+    def test_bad_columns(self):
+        """All columns must hold the same number of points."""
+        with pytest.raises(ValueError):
+            PointArray([np.zeros(2), np.zeros(3)])
+
+    def test_sample_array(self, space, seed):
+        """Sample all points at once, the same as with `Space.sample`."""
+        point_array = space.sample_array(5, seed=seed)
+        assert isinstance(point_array, PointArray)
+        assert len(point_array) == 5
+        assert point_array in space
+
+        points = space.sample(5, seed=5)
+        point_array = space.sample_array(5, seed=5)
+        for point, other in zip(points, point_array):
+            assert_eq(point[0], other[0])
+            assert point[1:] == other[1:]
+
+    def test_contains(self, space):
+        """All points must be in the space."""
+        points = [(('asdfa', 2), 0, 3.5), ((3, 4), -2, 0.5)]
+        assert PointArray.from_points(points, space) in space
+
+        assert PointArray.from_points(points + [(('asdfa', 2), 0.5, 3.5)], space) not in space
+        assert PointArray.from_points(points + [(('asdfa', 5), 0, 3.5)], space) not in space
+        assert PointArray.from_points(points + [(('asdfa', 2), 0, 'lalala')], space) not in space
+        assert PointArray(PointArray.from_points(points, space).columns[:2]) not in space
+
+    def test_contains_many(self, space):
+        """Tell which points are in the space, from a list or a `PointArray`."""
+        points = [(('asdfa', 2), 0, 3.5), (('asdfa', 5), 0, 3.5), ((3, 4), -2, 0.5),
+                  (('asdfa', 2), 0.5, 3.5)]
+        assert_eq(space.contains_many(points), [True, False, True, False])
+        assert_eq(space.contains_many(PointArray.from_points(points, space)),
+                  [True, False, True, False])
+
+        ragged = [(('asdfa', 2), 0, 3.5), (('asdfa', 2, 3), 0, 3.5), ((3, ), 0, 3.5)]
+        assert_eq(space.contains_many(ragged), [True, False, False])
+        assert_eq(Space().contains_many(points), [False] * 4)
+
+    def test_contains_array(self):
+        """Check points of a dimension all at once."""
+        dim = Integer('yolo', 'uniform', -3, 6, shape=2)
+        assert_eq(dim.contains_array(np.array([[0, 1], [0, 3], [0.5, 1]])),
+                  [True, False, False])
+        assert_eq(dim.contains_array(np.array([0, 1])), [False, False])
+
+        dim = Real('yolo', 'uniform', -3, 6)
+        assert_eq(dim.contains_array(np.array([0, 3, -3.5])), [True, False, False])
+        assert_eq(dim.contains_array(np.array(['0', 2], dtype=object)), [False, True])
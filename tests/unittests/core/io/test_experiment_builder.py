@@ -124,6 +124,17 @@ def test_fetch_full_config_no_hit(config_file, exp_config, random_dt):
     assert 'refers' not in full_config
 
 
+@pytest.mark.usefixtures("clean_db", "null_db_instances", "with_user_tsirif")
+def test_fetch_full_config_trial_hash(config_file, monkeypatch):
+    """Verify trial hash type is moved to metadata, cmd-arg preceding env var"""
+    monkeypatch.setenv('ORION_TRIAL_HASH', 'md5')
+    cmdargs = {'name': 'supernaekei', 'config': config_file, 'trial_hash': 'blake2b'}
+    full_config = ExperimentBuilder().fetch_full_config(cmdargs)
+
+    assert full_config['metadata']['trial_hash'] == 'blake2b'
+    assert 'trial_hash' not in full_config
+
+
 @pytest.mark.usefixtures("clean_db", "null_db_instances", "with_user_tsirif")
 def test_build_view_from_no_hit(config_file, create_db_instance, exp_config):
     """Try building experiment view when not in db"""
@@ -146,7 +157,7 @@ def test_build_view_from(config_file, create_db_instance, exp_config, random_dt)
     assert exp_view.name == exp_config[0][0]['name']
     assert exp_view.configuration['refers'] == exp_config[0][0]['refers']
     assert exp_view.metadata == exp_config[0][0]['metadata']
-    assert exp_view._experiment._last_fetched == exp_config[0][0]['metadata']['datetime']
+    assert exp_view._experiment._completion_watermarks == {}
     assert exp_view.pool_size == exp_config[0][0]['pool_size']
     assert exp_view.max_trials == exp_config[0][0]['max_trials']
     assert exp_view.algorithms.configuration == exp_config[0][0]['algorithms']
@@ -172,7 +183,7 @@ def test_build_from_no_hit(config_file, create_db_instance, exp_config, random_d
     assert exp.metadata['user'] == 'tsirif'
     assert exp.metadata['user_script'] == cmdargs['user_args'][0]
     assert exp.metadata['user_args'] == cmdargs['user_args'][1:]
-    assert exp._last_fetched == random_dt
+    assert exp._completion_watermarks == {}
     assert exp.pool_size == 1
     assert exp.max_trials == 100
     assert exp.algorithms.configuration == {'random': {}}
@@ -197,7 +208,7 @@ def test_build_from_hit(old_config_file, create_db_instance, exp_config):
     assert exp.name == exp_config[0][0]['name']
     assert exp.configuration['refers'] == exp_config[0][0]['refers']
     assert exp.metadata == exp_config[0][0]['metadata']
-    assert exp._last_fetched == exp_config[0][0]['metadata']['datetime']
+    assert exp._completion_watermarks == {}
     assert exp.pool_size == exp_config[0][0]['pool_size']
     assert exp.max_trials == exp_config[0][0]['max_trials']
     assert exp.algorithms.configuration == exp_config[0][0]['algorithms']
@@ -224,7 +235,7 @@ def test_build_from_config_no_hit(config_file, create_db_instance, exp_config, r
     assert exp.metadata['user'] == 'tsirif'
     assert exp.metadata['user_script'] == cmdargs['user_args'][0]
     assert exp.metadata['user_args'] == cmdargs['user_args'][1:]
-    assert exp._last_fetched == random_dt
+    assert exp._completion_watermarks == {}
     assert exp.pool_size == 1
     assert exp.max_trials == 100
     assert not exp.is_done
@@ -252,7 +263,7 @@ def test_build_from_config_hit(old_config_file, create_db_instance, exp_config):
     assert exp.name == exp_config[0][0]['name']
     assert exp.configuration['refers'] == exp_config[0][0]['refers']
     assert exp.metadata == exp_config[0][0]['metadata']
-    assert exp._last_fetched == exp_config[0][0]['metadata']['datetime']
+    assert exp._completion_watermarks == {}
     assert exp.pool_size == exp_config[0][0]['pool_size']
     assert exp.max_trials == exp_config[0][0]['max_trials']
     assert exp.algorithms.configuration == exp_config[0][0]['algorithms']
@@ -53,6 +53,13 @@ def test_fetch_env_vars():
     assert env_vars_config == {'database': {'name': db_name, 'type': db_type}}
 
 
+def test_fetch_env_vars_trial_hash(monkeypatch):
+    """Verify the trial hash type is fetched from env vars"""
+    monkeypatch.setenv('ORION_TRIAL_HASH', 'blake2b')
+    env_vars_config = resolve_config.fetch_env_vars()
+    assert env_vars_config['trial_hash'] == 'blake2b'
+
+
 @pytest.mark.usefixtures("version_XYZ")
 def test_fetch_metadata_orion_version():
     """Verify orion version"""
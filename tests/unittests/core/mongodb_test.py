@@ -10,7 +10,7 @@ from pymongo import MongoClient
 import pytest
 
 from orion.core.io.database import Database, DatabaseError, DuplicateKeyError
-from orion.core.io.database.mongodb import AUTH_FAILED_MESSAGES, MongoDB
+from orion.core.io.database.mongodb import AUTH_FAILED_MESSAGES, HEALTH_CHECK_INTERVAL, MongoDB
 
 
 @pytest.fixture(scope='module')
@@ -99,6 +99,62 @@ class TestConnection(object):
         orion_db.close_connection()
         assert MongoDB() is orion_db
 
+    def test_pool_options(self):
+        """Check pool size and timeout are passed to the client."""
+        orion_db = MongoDB(username='user', password='pass', name='orion_test',
+                           max_pool_size=8, min_pool_size=2, timeout=1.5)
+        assert orion_db.options['maxPoolSize'] == 8
+        assert orion_db.options['minPoolSize'] == 2
+        assert orion_db.options['serverSelectionTimeoutMS'] == 1500
+        assert orion_db.options['connectTimeoutMS'] == 1500
+        assert orion_db.is_connected
+
+    def test_is_connected_cached(self, monkeypatch):
+        """Check the server is not checked again before `HEALTH_CHECK_INTERVAL`."""
+        orion_db = MongoDB(username='user', password='pass', name='orion_test')
+        assert orion_db.is_connected
+
+        def fail(*args, **kwargs):
+            raise pymongo.errors.ConnectionFailure('unreachable')
+
+        monkeypatch.setattr(orion_db, '_check_server', fail)
+        assert orion_db.is_connected
+
+        orion_db._last_check -= HEALTH_CHECK_INTERVAL
+        assert not orion_db.is_connected
+        monkeypatch.undo()
+        assert orion_db.is_connected
+
+    def test_is_connected_after_failure(self, monkeypatch):
+        """Check the server is checked again after an operation failed to reach it."""
+        orion_db = MongoDB(username='user', password='pass', name='orion_test')
+        assert orion_db.is_connected
+
+        def fail(*args, **kwargs):
+            raise pymongo.errors.ConnectionFailure('unreachable')
+
+        monkeypatch.setattr(orion_db, '_check_server', fail)
+        assert orion_db.is_connected
+
+        monkeypatch.setattr(pymongo.collection.Collection, 'insert_many', fail)
+        with pytest.raises(DatabaseError):
+            orion_db.write('experiments', {'name': 'unreachable'})
+        assert not orion_db.is_connected
+
+    def test_reconnect_after_fork(self, monkeypatch):
+        """Check a new client is created when used from another process."""
+        orion_db = MongoDB(username='user', password='pass', name='orion_test')
+        conn = orion_db._conn
+        child_pid = orion_db._pid + 1
+        assert orion_db.is_connected
+
+        monkeypatch.setattr('os.getpid', lambda: child_pid)
+        assert not orion_db.is_connected
+        assert orion_db.count('experiments') >= 0
+        assert orion_db._conn is not conn
+        assert orion_db._pid == child_pid
+        assert orion_db.is_connected
+
 
 @pytest.mark.usefixtures("clean_db")
 class TestExceptionWrapper(object):
@@ -258,6 +314,74 @@ class TestRead(object):
              'submit_time': {'$gt': datetime(2017, 11, 23, 0, 0, 0)}})
         assert value == exp_config[1][3:7]
 
+    def test_read_sort_limit_skip(self, exp_config, orion_db):
+        """Fetch a range of documents in sort order."""
+        ids = sorted((trial['_id'] for trial in exp_config[1]
+                      if trial['experiment'] == 'supernaedo2'), reverse=True)
+        documents = orion_db.read('trials', {'experiment': 'supernaedo2'},
+                                  selection={'_id': 1}, sort=[('_id', orion_db.DESCENDING)],
+                                  limit=2, skip=1)
+        assert [document['_id'] for document in documents] == ids[1:3]
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestReadIter(object):
+    """Calls to :meth:`orion.core.io.database.mongodb.MongoDB.read_iter`."""
+
+    def test_read_iter_trials(self, exp_config, orion_db):
+        """Iterate lazily over the same documents as `read`."""
+        documents = orion_db.read_iter('trials', {'experiment': 'supernaedo2'}, batch_size=2)
+        assert not isinstance(documents, list)
+        assert list(documents) == orion_db.read('trials', {'experiment': 'supernaedo2'})
+
+    def test_read_iter_sort_and_limit(self, exp_config, orion_db):
+        """Iterate over the first documents in sort order."""
+        documents = orion_db.read_iter('trials', {'experiment': 'supernaedo2'},
+                                       selection={'_id': 1},
+                                       sort=[('_id', orion_db.DESCENDING)], limit=2)
+        ids = sorted((trial['_id'] for trial in exp_config[1]
+                      if trial['experiment'] == 'supernaedo2'), reverse=True)
+        assert [document['_id'] for document in documents] == ids[:2]
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestGroup(object):
+    """Calls to :meth:`orion.core.io.database.mongodb.MongoDB.group`."""
+
+    def test_group_by_key(self, exp_config, orion_db):
+        """Count documents and summarize their values by group."""
+        summaries = orion_db.group(
+            'experiments', {'metadata.user': 'tsirif'}, keys=['name'],
+            accumulators={'n': ('count', None), 'pool_size': ('sum', 'pool_size'),
+                          'max_trials': ('max', 'max_trials'), 'missing': ('min', 'nope')})
+
+        expected = {}
+        for experiment in exp_config[0]:
+            if experiment['metadata']['user'] == 'tsirif':
+                summary = expected.setdefault(experiment['name'], dict(
+                    name=experiment['name'], n=0, pool_size=0, max_trials=None, missing=None))
+                summary['n'] += 1
+                summary['pool_size'] += experiment['pool_size']
+                summary['max_trials'] = max(summary['max_trials'] or 0, experiment['max_trials'])
+
+        assert sorted(summaries, key=lambda x: x['name']) == \
+            sorted(expected.values(), key=lambda x: x['name'])
+
+    def test_group_all(self, exp_config, orion_db):
+        """Summarize all matching documents in a single group."""
+        summaries = orion_db.group('trials', {'status': 'completed'},
+                                   accumulators={'n': ('count', None),
+                                                 'finish_time': ('max', 'end_time')})
+        completed = [trial for trial in exp_config[1] if trial['status'] == 'completed']
+        assert summaries == [{'n': len(completed),
+                              'finish_time': max(trial['end_time'] for trial in completed)}]
+
+    def test_group_bad_operator(self, orion_db):
+        """Reject operators which are not portable."""
+        with pytest.raises(ValueError) as exc:
+            orion_db.group('trials', accumulators={'n': ('$avg', 'end_time')})
+        assert "is not one of" in str(exc.value)
+
 
 @pytest.mark.usefixtures("clean_db")
 class TestWrite(object):
@@ -289,6 +413,44 @@ class TestWrite(object):
         value = database.experiments.find_one({'exp_name': 'supernaekei3'})
         assert value == item[1]
 
+    def test_write_many_unordered(self, exp_config, database, orion_db):
+        """Should insert all entries which are not duplicates and report the others."""
+        items = [{'_id': 'lalalathisisnew'}, exp_config[1][0], {'_id': 'lalalathisisnew2'},
+                 {'_id': 'lalalathisisnew'}]
+        count_before = database.trials.count()
+        assert orion_db.write_many('trials', items, ordered=False) == (2, [1, 3])
+        assert database.trials.count() == count_before + 2
+        assert orion_db.read('trials', {'_id': 'lalalathisisnew2'}) == [items[2]]
+
+    def test_write_many_ordered(self, exp_config, database, orion_db):
+        """Should insert entries until a duplicate is found and report it."""
+        items = [{'_id': 'lalalathisisnew'}, exp_config[1][0], {'_id': 'lalalathisisnew2'}]
+        count_before = database.trials.count()
+        assert orion_db.write_many('trials', items) == (1, [1])
+        assert database.trials.count() == count_before + 1
+        assert orion_db.read('trials', {'_id': 'lalalathisisnew2'}) == []
+
+    def test_write_many_other_errors(self, monkeypatch, orion_db):
+        """Should raise DatabaseError with the errors which are not duplicates."""
+        details = {'nInserted': 1, 'writeConcernErrors': [], 'writeErrors': [
+            {'index': 1, 'code': 11000, 'errmsg': 'E11000 duplicate key error'},
+            {'index': 2, 'code': 121, 'errmsg': 'Document failed validation'}]}
+
+        def insert_many(*args, **kwargs):
+            raise pymongo.errors.BulkWriteError(details)
+
+        monkeypatch.setattr(pymongo.collection.Collection, 'insert_many', insert_many)
+        items = [{'_id': 'lalalathisisnew'}, {'_id': 'lalalathisisnew2'}, {'_id': 'invalid'}]
+        with pytest.raises(DatabaseError) as exc_info:
+            orion_db.write_many('trials', items, ordered=False)
+        assert not isinstance(exc_info.value, DuplicateKeyError)
+        assert str(exc_info.value) == \
+            "Bulk write failure: Document failed validation (document 2)"
+
+        with pytest.raises(DatabaseError) as exc_info:
+            orion_db.write('trials', items)
+        assert not isinstance(exc_info.value, DuplicateKeyError)
+
     def test_update_many_default(self, database, orion_db):
         """Should match existing entries, and update some of their keys."""
         filt = {'metadata.user': 'tsirif'}
@@ -327,6 +489,25 @@ class TestWrite(object):
         assert value[0]['_id'] == 'lalalathisisnew'
         assert value[0]['pool_size'] == 66
 
+    def test_no_upsert_with_id(self, database, orion_db):
+        """Query with a non-existent ``_id`` should not upsert if `upsert` is False."""
+        filt = {'_id': 'lalalathisisnew'}
+        count_before = database.experiments.count()
+        # call interface
+        assert orion_db.write('experiments', {'pool_size': 66}, filt, upsert=False) is True
+        assert database.experiments.count() == count_before
+        assert list(database.experiments.find(filt)) == []
+
+    def test_update_with_operators(self, exp_config, database, orion_db):
+        """Increment values with `$inc` operator, starting from 0 if missing."""
+        filt = {'_id': exp_config[0][1]['_id']}
+        # call interface
+        assert orion_db.write('experiments', {'$inc': {'pool_size': 3, 'counter': 1}},
+                              filt) is True
+        value = database.experiments.find_one(filt)
+        assert value['pool_size'] == exp_config[0][1]['pool_size'] + 3
+        assert value['counter'] == 1
+
 
 @pytest.mark.usefixtures("clean_db")
 class TestReadAndWrite(object):
@@ -426,3 +607,24 @@ class TestCount(object):
         """Call with argument that will not find anything."""
         found = orion_db.count('experiments', {'name': 'lalalanotfound'})
         assert found == 0
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestAggregate(object):
+    """Calls :meth:`orion.core.io.database.mongodb.MongoDB.aggregate`."""
+
+    def test_aggregate_group(self, exp_config, orion_db):
+        """Summarize documents matching a query."""
+        pipeline = [{'$match': {'status': 'completed'}},
+                    {'$group': {'_id': None, 'count': {'$sum': 1},
+                                'finish_time': {'$max': '$end_time'}}}]
+        summary = orion_db.aggregate('trials', pipeline)
+        completed = [x for x in exp_config[1] if x['status'] == 'completed']
+        assert summary == [{'_id': None, 'count': len(completed),
+                            'finish_time': max(x['end_time'] for x in completed)}]
+
+    def test_aggregate_nothing(self, orion_db):
+        """Return no documents if nothing matches."""
+        pipeline = [{'$match': {'status': 'lalalanotfound'}},
+                    {'$group': {'_id': None, 'count': {'$sum': 1}}}]
+        assert orion_db.aggregate('trials', pipeline) == []
@@ -6,7 +6,7 @@ from datetime import datetime
 
 import pytest
 
-from orion.core.io.database import Database
+from orion.core.io.database import Database, DuplicateKeyError
 from orion.core.io.database.ephemeraldb import EphemeralDB
 
 
@@ -46,26 +46,24 @@ class TestEnsureIndex(object):
         assert ("status", ) not in orion_db._db['trials']._indexes
 
         orion_db.ensure_index('trials', 'status', unique=False)
-        assert ("status", ) not in orion_db._db['trials']._indexes
-
-        orion_db.ensure_index('trials', 'status', unique=True)
         assert ("status", ) in orion_db._db['trials']._indexes
+        assert not orion_db._db['trials']._indexes[("status", )].unique
 
     def test_existing_index(self, orion_db):
         """Index should be added to ephemeral database and reattempt should do nothing"""
         assert ("status", ) not in orion_db._db['trials']._indexes
 
-        orion_db.ensure_index('trials', 'status', unique=True)
-        assert ("status", ) in orion_db._db['trials']._indexes
+        orion_db.ensure_index('trials', 'status')
+        index = orion_db._db['trials']._indexes[("status", )]
 
         # reattempt
-        orion_db.ensure_index('trials', 'status', unique=True)
-        assert ("status", ) in orion_db._db['trials']._indexes
+        orion_db.ensure_index('trials', 'status')
+        assert orion_db._db['trials']._indexes[("status", )] is index
 
     def test_ordered_index(self, orion_db):
         """Sort order should be added to index"""
         assert ("end_time", ) not in orion_db._db['trials']._indexes
-        orion_db.ensure_index('trials', [('end_time', Database.DESCENDING)], unique=True)
+        orion_db.ensure_index('trials', [('end_time', Database.DESCENDING)])
         assert ("end_time", ) in orion_db._db['trials']._indexes
 
     def test_compound_index(self, orion_db):
@@ -76,6 +74,36 @@ class TestEnsureIndex(object):
                                ('metadata.user', Database.ASCENDING)], unique=True)
         assert ("name", "metadata.user") in orion_db._db['experiments']._indexes
 
+    def test_unique_index(self, orion_db):
+        """Unique index should prevent duplicated keys on insert and update."""
+        orion_db.ensure_index('experiments',
+                              [('name', Database.ASCENDING),
+                               ('metadata.user', Database.ASCENDING)], unique=True)
+        with pytest.raises(DuplicateKeyError):
+            orion_db.write('experiments', {'name': 'supernaedo2', 'metadata': {'user': 'dendi'}})
+
+        with pytest.raises(DuplicateKeyError):
+            orion_db.write('experiments', {'metadata.user': 'dendi'},
+                           {'name': 'supernaedo2', 'metadata.user': 'tsirif'})
+        assert orion_db.count('experiments', {'metadata.user': 'dendi'}) == 1
+
+    def test_unique_index_with_duplicates(self, orion_db):
+        """Unique index cannot be created on keys already duplicated."""
+        with pytest.raises(DuplicateKeyError):
+            orion_db.ensure_index('experiments', 'name', unique=True)
+        assert ("name", ) not in orion_db._db['experiments']._indexes
+
+    def test_index_follows_updates(self, exp_config, orion_db):
+        """Queries answered by an index should reflect updates and removals."""
+        orion_db.ensure_index('trials', 'status')
+        orion_db.write('trials', {'status': 'broken'}, {'_id': exp_config[1][3]['_id']})
+        assert orion_db.read('trials', {'status': 'new'}) == [exp_config[1][4]]
+        assert orion_db.count('trials', {'status': {'$in': ['broken', 'interrupted']}}) == 2
+
+        orion_db.remove('trials', {'status': 'broken'})
+        assert orion_db.count('trials', {'status': 'broken'}) == 0
+        assert orion_db.count('trials', {'_id': exp_config[1][3]['_id']}) == 0
+
 
 @pytest.mark.usefixtures("clean_db")
 class TestRead(object):
@@ -127,6 +155,108 @@ class TestRead(object):
              'submit_time': {'$gt': datetime(2017, 11, 23, 0, 0, 0)}})
         assert value == exp_config[1][3:7]
 
+        value = orion_db.read(
+            'trials',
+            {'experiment': 'supernaedo2',
+             'submit_time': {'$lt': datetime(2017, 11, 23, 0, 0, 0)}})
+        assert value == exp_config[1][:2]
+
+        value = orion_db.read(
+            'trials',
+            {'experiment': 'supernaedo2',
+             'submit_time': {'$lte': datetime(2017, 11, 23, 0, 0, 0)}})
+        assert value == exp_config[1][:3]
+
+    def test_read_with_negations(self, exp_config, orion_db):
+        """Fetch entries not matching values, including those without the key."""
+        value = orion_db.read('trials', {'status': {'$ne': 'completed'}})
+        assert value == [trial for trial in exp_config[1] if trial['status'] != 'completed']
+
+        value = orion_db.read('trials', {'status': {'$nin': ['completed', 'new']}})
+        assert value == [trial for trial in exp_config[1]
+                         if trial['status'] not in ['completed', 'new']]
+
+        value = orion_db.read('experiments', {'metadata.user': {'$ne': 'tsirif'}})
+        assert value == [exp_config[0][3]]
+
+    def test_read_with_exists(self, exp_config, orion_db):
+        """Fetch entries according to the presence of a key, possibly nested."""
+        orion_db.write('trials', {'lalala': None}, {'_id': exp_config[1][0]['_id']})
+
+        value = orion_db.read('trials', {'lalala': {'$exists': True}})
+        assert [trial['_id'] for trial in value] == [exp_config[1][0]['_id']]
+        assert orion_db.count('trials', {'lalala': {'$exists': False}}) == len(exp_config[1]) - 1
+
+        assert orion_db.count('experiments', {'metadata': {'$exists': True}}) == len(exp_config[0])
+
+    def test_read_sort_limit_skip(self, exp_config, orion_db):
+        """Fetch a range of documents in sort order."""
+        ids = sorted((trial['_id'] for trial in exp_config[1]
+                      if trial['experiment'] == 'supernaedo2'), reverse=True)
+        documents = orion_db.read('trials', {'experiment': 'supernaedo2'},
+                                  selection={'_id': 1}, sort=[('_id', orion_db.DESCENDING)],
+                                  limit=2, skip=1)
+        assert [document['_id'] for document in documents] == ids[1:3]
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestReadIter(object):
+    """Calls to :meth:`orion.core.io.database.ephemeraldb.EphemeralDB.read_iter`."""
+
+    def test_read_iter_trials(self, exp_config, orion_db):
+        """Iterate lazily over the same documents as `read`."""
+        documents = orion_db.read_iter('trials', {'experiment': 'supernaedo2'}, batch_size=2)
+        assert not isinstance(documents, list)
+        assert list(documents) == orion_db.read('trials', {'experiment': 'supernaedo2'})
+
+    def test_read_iter_sort_and_limit(self, exp_config, orion_db):
+        """Iterate over the first documents in sort order."""
+        documents = orion_db.read_iter('trials', {'experiment': 'supernaedo2'},
+                                       selection={'_id': 1},
+                                       sort=[('_id', orion_db.DESCENDING)], limit=2)
+        ids = sorted((trial['_id'] for trial in exp_config[1]
+                      if trial['experiment'] == 'supernaedo2'), reverse=True)
+        assert [document['_id'] for document in documents] == ids[:2]
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestGroup(object):
+    """Calls to :meth:`orion.core.io.database.ephemeraldb.EphemeralDB.group`."""
+
+    def test_group_by_key(self, exp_config, orion_db):
+        """Count documents and summarize their values by group."""
+        summaries = orion_db.group(
+            'experiments', {'metadata.user': 'tsirif'}, keys=['name'],
+            accumulators={'n': ('count', None), 'pool_size': ('sum', 'pool_size'),
+                          'max_trials': ('max', 'max_trials'), 'missing': ('min', 'nope')})
+
+        expected = {}
+        for experiment in exp_config[0]:
+            if experiment['metadata']['user'] == 'tsirif':
+                summary = expected.setdefault(experiment['name'], dict(
+                    name=experiment['name'], n=0, pool_size=0, max_trials=None, missing=None))
+                summary['n'] += 1
+                summary['pool_size'] += experiment['pool_size']
+                summary['max_trials'] = max(summary['max_trials'] or 0, experiment['max_trials'])
+
+        assert sorted(summaries, key=lambda x: x['name']) == \
+            sorted(expected.values(), key=lambda x: x['name'])
+
+    def test_group_all(self, exp_config, orion_db):
+        """Summarize all matching documents in a single group."""
+        summaries = orion_db.group('trials', {'status': 'completed'},
+                                   accumulators={'n': ('count', None),
+                                                 'finish_time': ('max', 'end_time')})
+        completed = [trial for trial in exp_config[1] if trial['status'] == 'completed']
+        assert summaries == [{'n': len(completed),
+                              'finish_time': max(trial['end_time'] for trial in completed)}]
+
+    def test_group_bad_operator(self, orion_db):
+        """Reject operators which are not portable."""
+        with pytest.raises(ValueError) as exc:
+            orion_db.group('trials', accumulators={'n': ('$avg', 'end_time')})
+        assert "is not one of" in str(exc.value)
+
 
 @pytest.mark.usefixtures("clean_db")
 class TestWrite(object):
@@ -158,6 +288,23 @@ class TestWrite(object):
         value = database['experiments'].find({'exp_name': 'supernaekei3'})[0]
         assert value == item[1]
 
+    def test_write_many_unordered(self, exp_config, database, orion_db):
+        """Should insert all entries which are not duplicates and report the others."""
+        items = [{'_id': 'lalalathisisnew'}, exp_config[1][0], {'_id': 'lalalathisisnew2'},
+                 {'_id': 'lalalathisisnew'}]
+        count_before = database['trials'].count()
+        assert orion_db.write_many('trials', items, ordered=False) == (2, [1, 3])
+        assert database['trials'].count() == count_before + 2
+        assert orion_db.read('trials', {'_id': 'lalalathisisnew2'}) == [items[2]]
+
+    def test_write_many_ordered(self, exp_config, database, orion_db):
+        """Should insert entries until a duplicate is found and report it."""
+        items = [{'_id': 'lalalathisisnew'}, exp_config[1][0], {'_id': 'lalalathisisnew2'}]
+        count_before = database['trials'].count()
+        assert orion_db.write_many('trials', items) == (1, [1])
+        assert database['trials'].count() == count_before + 1
+        assert orion_db.read('trials', {'_id': 'lalalathisisnew2'}) == []
+
     def test_update_many_default(self, database, orion_db):
         """Should match existing entries, and update some of their keys."""
         filt = {'metadata.user': 'tsirif'}
@@ -196,6 +343,34 @@ class TestWrite(object):
         assert value[0]['_id'] == 'lalalathisisnew'
         assert value[0]['pool_size'] == 66
 
+    def test_no_upsert_with_id(self, database, orion_db):
+        """Query with a non-existent ``_id`` should not upsert if `upsert` is False."""
+        filt = {'_id': 'lalalathisisnew'}
+        count_before = database['experiments'].count()
+        # call interface
+        assert orion_db.write('experiments', {'pool_size': 66}, filt, upsert=False) is True
+        assert database['experiments'].count() == count_before
+        assert list(database['experiments'].find(filt)) == []
+
+    def test_update_with_operators(self, exp_config, database, orion_db):
+        """Increment values with `$inc` operator, starting from 0 if missing."""
+        filt = {'_id': exp_config[0][1]['_id']}
+        # call interface
+        assert orion_db.write('experiments', {'$inc': {'pool_size': 3, 'counter': 1}},
+                              filt) is True
+        value = database['experiments'].find(filt)[0]
+        assert value['pool_size'] == exp_config[0][1]['pool_size'] + 3
+        assert value['counter'] == 1
+
+    def test_update_matching_missing_key(self, exp_config, database, orion_db):
+        """Query with null value should match documents without the key."""
+        filt = {'_id': exp_config[0][1]['_id'], 'counter': None}
+        # call interface
+        assert orion_db.write('experiments', {'counter': 0}, filt, upsert=False) is True
+        assert database['experiments'].find({'_id': exp_config[0][1]['_id']})[0]['counter'] == 0
+        assert orion_db.write('experiments', {'counter': 1}, filt, upsert=False) is True
+        assert database['experiments'].find({'_id': exp_config[0][1]['_id']})[0]['counter'] == 0
+
 
 @pytest.mark.usefixtures("clean_db")
 class TestReadAndWrite(object):
@@ -296,3 +471,18 @@ class TestCount(object):
         """Call with argument that will not find anything."""
         found = orion_db.count('experiments', {'name': 'lalalanotfound'})
         assert found == 0
+
+
+def test_aggregate_not_supported(orion_db):
+    """Aggregation pipelines are not supported, callers must fall back on `read`."""
+    with pytest.raises(NotImplementedError):
+        orion_db.aggregate('trials', [{'$match': {'status': 'completed'}}])
+
+
+def test_watch_not_supported(orion_db):
+    """Changes cannot be watched, callers must poll them with `read`."""
+    with pytest.raises(NotImplementedError):
+        orion_db.watch_token('trials')
+
+    with pytest.raises(NotImplementedError):
+        orion_db.watch('trials', {'status': 'new'}, timeout=0.1)
@@ -2,14 +2,18 @@
 # -*- coding: utf-8 -*-
 """Collection of tests for :mod:`orion.core.worker.experiment`."""
 
+import collections
 import copy
+import datetime
 import random
 
 import pytest
 
 from orion.algo.base import BaseAlgorithm
 from orion.core.io.database import Database, DuplicateKeyError
+from orion.core.worker.completion import MISSING_SEQ_TIMEOUT
 from orion.core.worker.experiment import Experiment, ExperimentView
+from orion.core.worker.reservation import HEARTBEAT_TIMEOUT
 from orion.core.worker.trial import Trial
 
 
@@ -19,7 +23,7 @@ def patch_sample(monkeypatch):
     def mock_sample(a_list, should_be_one):
         assert type(a_list) == list
         assert len(a_list) >= 1
-        # Part of `TestReserveTrial.test_reserve_success`
+        # Part of `TestReserveTrial.test_reserve_success_with_score`
         assert a_list[0].status == 'interrupted'
         assert a_list[1].status == 'new'
         assert a_list[2].status == 'new'
@@ -36,7 +40,7 @@ def patch_sample2(monkeypatch):
     def mock_sample(a_list, should_be_one):
         assert type(a_list) == list
         assert len(a_list) >= 1
-        # Part of `TestReserveTrial.test_reserve_success2`
+        # Part of `TestReserveTrial.test_reserve_success2_with_score`
         assert a_list[0].status == 'interrupted'
         assert a_list[1].status == 'new'
         assert a_list[2].status == 'new'
@@ -150,7 +154,7 @@ class TestInitExperiment(object):
         assert exp.name == 'supernaekei'
         assert exp.refers == {}
         assert exp.metadata['user'] == 'tsirif'
-        assert exp._last_fetched == random_dt
+        assert exp._completion_watermarks == {}
         assert len(exp.metadata) == 1
         assert exp.pool_size is None
         assert exp.max_trials is None
@@ -168,7 +172,7 @@ class TestInitExperiment(object):
         assert exp.name == 'supernaedo2'
         assert exp.refers == {}
         assert exp.metadata['user'] == 'bouthilx'
-        assert exp._last_fetched == random_dt
+        assert exp._completion_watermarks == {}
         assert len(exp.metadata) == 1
         assert exp.pool_size is None
         assert exp.max_trials is None
@@ -186,7 +190,7 @@ class TestInitExperiment(object):
         assert exp.name == exp_config[0][0]['name']
         assert exp.refers == exp_config[0][0]['refers']
         assert exp.metadata == exp_config[0][0]['metadata']
-        assert exp._last_fetched == exp_config[0][0]['metadata']['datetime']
+        assert exp._completion_watermarks == {}
         assert exp.pool_size == exp_config[0][0]['pool_size']
         assert exp.max_trials == exp_config[0][0]['max_trials']
         assert exp.algorithms == exp_config[0][0]['algorithms']
@@ -301,6 +305,8 @@ class TestConfigProperty(object):
         new_config['algorithms']['dumbalgo']['suspend'] = False
         new_config['algorithms']['dumbalgo']['value'] = 5
         new_config['refers'] = {'adapter': [], 'parent_id': None, 'root_id': _id}
+        assert found_config[0].pop('trials_completed') == 0
+        assert found_config[0].pop('legacy_trials_completed') == 0
         assert found_config[0] == new_config
         assert exp.name == new_config['name']
         assert exp.configuration['refers'] == new_config['refers']
@@ -513,36 +519,86 @@ class TestReserveTrial(object):
         trial = exp.reserve_trial()
         assert trial is None
 
-    @pytest.mark.usefixtures("patch_sample")
     def test_reserve_success(self, exp_config, hacked_exp, random_dt):
-        """Successfully find new trials in db and reserve one at 'random'."""
+        """Successfully reserve the first submitted new trial atomically."""
+        trial = hacked_exp.reserve_trial()
+        exp_config[1][3]['status'] = 'reserved'
+        exp_config[1][3]['heartbeat'] = random_dt
+        exp_config[1][3]['worker'] = trial.worker
+        exp_config[1][3]['start_time'] = random_dt
+        assert trial.to_dict() == exp_config[1][3]
+
+    def test_reserve_success2(self, exp_config, hacked_exp, random_dt):
+        """Reserve suspended or interrupted trials once new trials are exhausted.
+
+        Version that start_time does not get written, because the selected trial
+        was not a 'new' one.
+        """
+        hacked_exp.reserve_trial()
+        hacked_exp.reserve_trial()
         trial = hacked_exp.reserve_trial()
         exp_config[1][5]['status'] = 'reserved'
+        exp_config[1][5]['heartbeat'] = random_dt
+        exp_config[1][5]['worker'] = trial.worker
+        assert trial.to_dict() == exp_config[1][5]
+
+    def test_reserve_in_order(self, exp_config, hacked_exp):
+        """Reserve new trials first, then others, by order of submission."""
+        reserved_ids = []
+        for _ in range(4):
+            reserved_ids.append(hacked_exp.reserve_trial().id)
+
+        assert reserved_ids == [trial['_id'] for trial in exp_config[1][3:7]]
+        assert hacked_exp.reserve_trial() is None
+
+    def test_reserve_does_not_fetch_trials(self, monkeypatch, hacked_exp):
+        """Reserve without scoring trials in a single database operation."""
+        def fail_fetch(*args, **kwargs):
+            raise AssertionError("Trials should not be fetched.")
+
+        monkeypatch.setattr(Experiment, 'fetch_trials', fail_fetch)
+        assert hacked_exp.reserve_trial() is not None
+
+    @pytest.mark.usefixtures("patch_sample")
+    def test_reserve_success_with_score(self, exp_config, hacked_exp, random_dt):
+        """Successfully find new trials in db and reserve one at 'random'."""
+        hacked_exp.configure(exp_config[0][3])
+        trial = hacked_exp.reserve_trial(score_handle=lambda point: 0)
+        exp_config[1][5]['status'] = 'reserved'
+        exp_config[1][5]['heartbeat'] = random_dt
+        exp_config[1][5]['worker'] = trial.worker
         assert trial.to_dict() == exp_config[1][5]
 
     @pytest.mark.usefixtures("patch_sample2")
-    def test_reserve_success2(self, exp_config, hacked_exp):
+    def test_reserve_success2_with_score(self, exp_config, hacked_exp, random_dt):
         """Successfully find new trials in db and reserve one at 'random'.
 
         Version that start_time does not get written, because the selected trial
         was not a 'new' one.
         """
-        trial = hacked_exp.reserve_trial()
+        hacked_exp.configure(exp_config[0][3])
+        trial = hacked_exp.reserve_trial(score_handle=lambda point: 0)
         exp_config[1][6]['status'] = 'reserved'
+        exp_config[1][6]['heartbeat'] = random_dt
+        exp_config[1][6]['worker'] = trial.worker
         assert trial.to_dict() == exp_config[1][6]
 
     @pytest.mark.usefixtures("patch_sample_concurrent")
     def test_reserve_race_condition(self, exp_config, hacked_exp, random_dt):
         """Get its trials reserved before by another process once."""
-        trial = hacked_exp.reserve_trial()
+        hacked_exp.configure(exp_config[0][3])
+        trial = hacked_exp.reserve_trial(score_handle=lambda point: 0)
         exp_config[1][3]['status'] = 'reserved'
+        exp_config[1][3]['heartbeat'] = random_dt
+        exp_config[1][3]['worker'] = trial.worker
         exp_config[1][3]['start_time'] = random_dt
         assert trial.to_dict() == exp_config[1][3]
 
     @pytest.mark.usefixtures("patch_sample_concurrent2")
     def test_reserve_dead_race_condition(self, exp_config, hacked_exp):
         """Always get its trials reserved before by another process."""
-        trial = hacked_exp.reserve_trial()
+        hacked_exp.configure(exp_config[0][3])
+        trial = hacked_exp.reserve_trial(score_handle=lambda point: 0)
         assert trial is None
 
     def test_reserve_with_uncallable_score(self, hacked_exp):
@@ -555,16 +611,127 @@ class TestReserveTrial(object):
         self.times_called += 1
         return self.times_called
 
-    def test_reserve_with_score(self, hacked_exp, exp_config):
+    def test_reserve_with_score(self, hacked_exp, exp_config, random_dt):
         """Reserve with a score object that can do its job."""
         self.times_called = 0
         hacked_exp.configure(exp_config[0][3])
         trial = hacked_exp.reserve_trial(score_handle=self.fake_handle)
         exp_config[1][6]['status'] = 'reserved'
+        exp_config[1][6]['heartbeat'] = random_dt
+        exp_config[1][6]['worker'] = trial.worker
         assert trial.to_dict() == exp_config[1][6]
 
 
-@pytest.mark.usefixtures("patch_sample")
+class TestReserveTrials(object):
+    """Calls to batch reservation of trials and their release."""
+
+    def test_reserve_batch(self, exp_config, hacked_exp, database, random_dt):
+        """Reserve the oldest new trials under a common lease."""
+        trials = hacked_exp.reserve_trials(3)
+        assert [trial.id for trial in trials] == [trial['_id'] for trial in exp_config[1][3:6]]
+        assert len(set(trial.worker for trial in trials)) == 1
+        assert trials[0].worker is not None
+        for trial, trial_config in zip(trials, exp_config[1][3:6]):
+            assert trial.status == 'reserved'
+            if trial_config['status'] == 'new':
+                assert trial.start_time == random_dt
+            else:
+                assert trial.start_time == trial_config['start_time']
+            assert database.trials.find_one({'_id': trial.id})['worker'] == trial.worker
+
+    def test_reserve_batch_then_others(self, exp_config, hacked_exp):
+        """Reserve interrupted or suspended trials when not enough new ones."""
+        trials = hacked_exp.reserve_trials(10)
+        assert [trial.id for trial in trials] == [trial['_id'] for trial in exp_config[1][3:7]]
+        assert hacked_exp.reserve_trials(10) == []
+
+    def test_reserve_batch_different_leases(self, hacked_exp):
+        """Give a different lease to each batch."""
+        trials1 = hacked_exp.reserve_trials(1)
+        trials2 = hacked_exp.reserve_trials(1)
+        assert trials1[0].worker != trials2[0].worker
+
+    def test_reserve_batch_invalid_size(self, hacked_exp):
+        """Reserve at least one trial."""
+        with pytest.raises(ValueError) as exc:
+            hacked_exp.reserve_trials(0)
+
+        assert "must be at least 1" in str(exc.value)
+
+    def test_release(self, exp_config, hacked_exp, database):
+        """Set back unused trials to new, without upserting anything."""
+        n_trials = database.trials.count()
+        trials = hacked_exp.reserve_trials(3)
+        hacked_exp.release_trials(trials[1:])
+
+        assert database.trials.count() == n_trials
+        assert database.trials.find_one({'_id': trials[0].id})['status'] == 'reserved'
+        for trial in trials[1:]:
+            trial_doc = database.trials.find_one({'_id': trial.id})
+            assert trial_doc['status'] == 'new'
+            assert trial_doc['worker'] is None
+            assert trial_doc['start_time'] is None
+            assert trial_doc['heartbeat'] is None
+
+        assert ([trial.id for trial in hacked_exp.reserve_trials(2)] ==
+                [trial.id for trial in trials[1:]])
+
+    def test_release_only_own_lease(self, hacked_exp, database):
+        """Do not release trials reserved meanwhile under another lease."""
+        trials = hacked_exp.reserve_trials(1)
+        database.trials.update_one({'_id': trials[0].id}, {'$set': {'worker': 'other'}})
+        hacked_exp.release_trials(trials)
+        assert database.trials.find_one({'_id': trials[0].id})['status'] == 'reserved'
+
+
+class TestHeartbeat(object):
+    """Calls to update heartbeat of trials and interrupt those which are lost."""
+
+    def test_update_heartbeat(self, hacked_exp, database, random_dt):
+        """Update heartbeat of a reserved trial only."""
+        trial = hacked_exp.reserve_trial()
+        database.trials.update_one({'_id': trial.id}, {'$set': {'heartbeat': None}})
+        assert hacked_exp.update_heartbeat(trial)
+        assert trial.heartbeat == random_dt
+        assert database.trials.find_one({'_id': trial.id})['heartbeat'] == random_dt
+
+        database.trials.update_one({'_id': trial.id}, {'$set': {'status': 'interrupted',
+                                                                'heartbeat': None}})
+        assert not hacked_exp.update_heartbeat(trial)
+        assert database.trials.find_one({'_id': trial.id})['heartbeat'] is None
+
+    def test_update_heartbeat_other_lease(self, hacked_exp, database):
+        """Do not update heartbeat of a trial reserved again by another worker."""
+        trial = hacked_exp.reserve_trial()
+        assert trial.worker is not None
+        database.trials.update_one({'_id': trial.id}, {'$set': {'worker': 'other',
+                                                                'heartbeat': None}})
+        assert not hacked_exp.update_heartbeat(trial)
+        assert database.trials.find_one({'_id': trial.id})['heartbeat'] is None
+
+    def test_interrupt_lost_trials(self, hacked_exp, database, random_dt):
+        """Interrupt reserved trials with an expired heartbeat only."""
+        lost_trial, alive_trial = hacked_exp.reserve_trials(2)
+        expired = random_dt - HEARTBEAT_TIMEOUT - datetime.timedelta(seconds=1)
+        database.trials.update_one({'_id': lost_trial.id}, {'$set': {'heartbeat': expired}})
+
+        hacked_exp.interrupt_lost_trials()
+
+        assert database.trials.find_one({'_id': lost_trial.id})['status'] == 'interrupted'
+        assert database.trials.find_one({'_id': alive_trial.id})['status'] == 'reserved'
+
+    def test_reserve_lost_trial(self, hacked_exp, database, random_dt):
+        """Reserve again a trial once it is interrupted."""
+        trials = hacked_exp.reserve_trials(4)
+        expired = random_dt - HEARTBEAT_TIMEOUT - datetime.timedelta(seconds=1)
+        database.trials.update_one({'_id': trials[0].id}, {'$set': {'heartbeat': expired}})
+        assert hacked_exp.reserve_trial() is None
+
+        hacked_exp.interrupt_lost_trials()
+
+        assert hacked_exp.reserve_trial().id == trials[0].id
+
+
 def test_push_completed_trial(hacked_exp, database, random_dt):
     """Successfully push a completed trial into database."""
     trial = hacked_exp.reserve_trial()
@@ -579,6 +746,51 @@ def test_push_completed_trial(hacked_exp, database, random_dt):
     assert yo['end_time'] == random_dt
 
 
+def test_push_completed_trial_count(hacked_exp, database):
+    """Count completed trials in experiment's document, only once per trial."""
+    database.experiments.insert_one({'_id': hacked_exp.id})
+    hacked_exp._completions.init_counter()
+    assert database.experiments.find_one({'_id': hacked_exp.id})['trials_completed'] == 3
+
+    trial = hacked_exp.reserve_trial()
+    hacked_exp.push_completed_trial(trial)
+    assert database.experiments.find_one({'_id': hacked_exp.id})['trials_completed'] == 4
+
+    hacked_exp.push_completed_trial(trial)
+    assert database.experiments.find_one({'_id': hacked_exp.id})['trials_completed'] == 4
+
+
+def test_push_completed_trial_sequence(hacked_exp, database):
+    """Give completed trials consecutive sequence numbers from experiment's document."""
+    database.experiments.insert_one({'_id': hacked_exp.id})
+
+    trials = hacked_exp.reserve_trials(2)
+    for trial in trials:
+        hacked_exp.push_completed_trial(trial)
+
+    assert [database.trials.find_one({'_id': trial.id})['completion_seq']
+            for trial in trials] == [1, 2]
+
+
+def test_init_completed_trials_counter_once(hacked_exp, database):
+    """Do not reset the counter of completed trials once initialized."""
+    database.experiments.insert_one({'_id': hacked_exp.id, 'trials_completed': 10,
+                                     'legacy_trials_completed': 3})
+    hacked_exp._completions.init_counter()
+    assert database.experiments.find_one({'_id': hacked_exp.id})['trials_completed'] == 10
+
+
+def test_init_completed_trials_counter_after_completion(hacked_exp, database):
+    """Keep trials completed before the counter is initialized."""
+    database.experiments.insert_one({'_id': hacked_exp.id})
+    hacked_exp.push_completed_trial(hacked_exp.reserve_trial())
+    hacked_exp._completions.init_counter()
+
+    experiment = database.experiments.find_one({'_id': hacked_exp.id})
+    assert experiment['trials_completed'] == 4
+    assert experiment['legacy_trials_completed'] == 3
+
+
 @pytest.mark.usefixtures("with_user_tsirif")
 def test_register_trials(database, random_dt, hacked_exp):
     """Register a list of newly proposed trials/parameters."""
@@ -598,16 +810,101 @@ def test_register_trials(database, random_dt, hacked_exp):
     assert yo[1]['submit_time'] == random_dt
 
 
+@pytest.mark.usefixtures("with_user_tsirif")
+def test_register_duplicate_trials(database, random_dt, hacked_exp):
+    """Register the trials of a list which are not duplicates, even after a duplicate."""
+    hacked_exp._id = 'lalala'  # white box hack
+    trials = [
+        Trial(params=[{'name': 'a', 'type': 'integer', 'value': 5}]),
+        Trial(params=[{'name': 'b', 'type': 'integer', 'value': 6}]),
+        ]
+    assert hacked_exp.register_trials(trials[:1]) == 1
+    assert hacked_exp.register_trials(trials + trials[1:]) == 1
+    yo = list(database.trials.find({'experiment': hacked_exp._id}))
+    assert len(yo) == len(trials)
+    assert yo[1]['params'] == list(map(lambda x: x.to_dict(), trials[1].params))
+
+
 def test_fetch_completed_trials(hacked_exp, exp_config, random_dt):
     """Fetch a list of the unseen yet completed trials."""
     trials = hacked_exp.fetch_completed_trials()
-    assert hacked_exp._last_fetched == random_dt
+    assert hacked_exp._completion_watermarks == {hacked_exp.id: (0, {})}
     assert len(trials) == 3
     assert trials[0].to_dict() == exp_config[1][0]
     assert trials[1].to_dict() == exp_config[1][1]
     assert trials[2].to_dict() == exp_config[1][2]
 
 
+def test_fetch_trials_with_selection(hacked_exp, exp_config):
+    """Load lazily the fields left out of fetched trials."""
+    trials = hacked_exp.fetch_trials({'status': 'completed'}, selection={'params': 1})
+    assert [trial.id for trial in trials] == [trial['_id'] for trial in exp_config[1][:3]]
+    assert [trial.to_dict() for trial in trials] == exp_config[1][:3]
+
+
+def test_iter_trials(hacked_exp, exp_config):
+    """Build lazily the trials of the experiment."""
+    trials = hacked_exp.iter_trials({'status': 'completed'}, batch_size=1)
+    assert not isinstance(trials, list)
+    assert [trial.to_dict() for trial in trials] == exp_config[1][:3]
+
+
+def test_fetch_completed_trials_once(hacked_exp, database, random_dt):
+    """Fetch every completed trial exactly once, even when completed out of order."""
+    database.experiments.insert_one({'_id': hacked_exp.id})
+    assert len(hacked_exp.fetch_completed_trials()) == 3
+    assert hacked_exp.fetch_completed_trials() == []
+
+    # Sequence number taken by a worker which did not complete its trial yet
+    database.experiments.update_one({'_id': hacked_exp.id}, {'$inc': {'completion_seq': 1}})
+    first_trial, second_trial = hacked_exp.reserve_trials(2)
+    hacked_exp.push_completed_trial(second_trial)
+
+    assert [trial.id for trial in hacked_exp.fetch_completed_trials()] == [second_trial.id]
+    assert hacked_exp._completion_watermarks == {hacked_exp.id: (2, {1: random_dt})}
+
+    first_trial.status = 'completed'
+    document = first_trial.to_dict()
+    document['completion_seq'] = 1
+    database.trials.update_one({'_id': first_trial.id}, {'$set': document})
+
+    assert [trial.id for trial in hacked_exp.fetch_completed_trials()] == [first_trial.id]
+    assert hacked_exp._completion_watermarks == {hacked_exp.id: (2, {})}
+    assert hacked_exp.fetch_completed_trials() == []
+
+
+def test_fetch_completed_trials_missing_timeout(hacked_exp, database, random_dt):
+    """Stop reading sequence numbers which match no trial after a timeout."""
+    database.experiments.insert_one({'_id': hacked_exp.id})
+    hacked_exp.fetch_completed_trials()
+
+    # Sequence number taken by a worker which died before completing its trial
+    database.experiments.update_one({'_id': hacked_exp.id}, {'$inc': {'completion_seq': 1}})
+    assert hacked_exp.fetch_completed_trials() == []
+    assert hacked_exp._completion_watermarks == {hacked_exp.id: (1, {1: random_dt})}
+
+    since = random_dt - MISSING_SEQ_TIMEOUT / 2
+    hacked_exp._completion_watermarks = {hacked_exp.id: (1, {1: since})}
+    hacked_exp.fetch_completed_trials()
+    assert hacked_exp._completion_watermarks == {hacked_exp.id: (1, {1: since})}
+
+    since = random_dt - MISSING_SEQ_TIMEOUT
+    hacked_exp._completion_watermarks = {hacked_exp.id: (1, {1: since})}
+    hacked_exp.fetch_completed_trials()
+    assert hacked_exp._completion_watermarks == {hacked_exp.id: (1, {})}
+
+
+def test_save_and_load_algorithm_state(hacked_exp, random_dt):
+    """Restore the watermarks of the saved algorithm state, with their missing numbers."""
+    watermarks = {hacked_exp.id: (3, {1: random_dt}), 'parent': (2, {})}
+    hacked_exp._completion_watermarks = dict(watermarks)
+    hacked_exp.save_algorithm_state({'n_points': 3})
+
+    hacked_exp._completion_watermarks = {}
+    assert hacked_exp.load_algorithm_state() == {'n_points': 3}
+    assert hacked_exp._completion_watermarks == watermarks
+
+
 def test_is_done_property(hacked_exp):
     """Check experiment stopping conditions for maximum number of trials completed."""
     assert hacked_exp.is_done is False
@@ -615,6 +912,46 @@ def test_is_done_property(hacked_exp):
     assert hacked_exp.is_done is True
 
 
+def test_is_done_property_with_counter(hacked_exp, database):
+    """Check experiment stopping conditions using the counter of completed trials."""
+    database.experiments.insert_one({'_id': hacked_exp.id, 'trials_completed': 2,
+                                     'legacy_trials_completed': 0})
+    hacked_exp.max_trials = 3
+    assert hacked_exp.is_done is False
+    hacked_exp.max_trials = 2
+    assert hacked_exp.is_done is True
+
+
+def test_is_done_property_ttl(hacked_exp, database):
+    """Check number of completed trials is reused during `is_done_ttl` seconds."""
+    database.experiments.insert_one({'_id': hacked_exp.id, 'trials_completed': 2,
+                                     'legacy_trials_completed': 0})
+    hacked_exp.max_trials = 3
+    hacked_exp.is_done_ttl = 60
+    assert hacked_exp.is_done is False
+
+    database.experiments.update_one({'_id': hacked_exp.id}, {'$set': {'trials_completed': 3}})
+    assert hacked_exp.is_done is False
+
+    hacked_exp.is_done_ttl = 0
+    assert hacked_exp.is_done is True
+
+
+def test_is_done_property_with_uncounted_completions(hacked_exp, database):
+    """Check completed trials are counted if some completions were not added to the counter."""
+    n_completed = database.trials.count({'experiment': hacked_exp.id, 'status': 'completed'})
+    database.experiments.insert_one({'_id': hacked_exp.id, 'trials_completed': 0,
+                                     'legacy_trials_completed': 0,
+                                     'completion_seq': n_completed})
+    hacked_exp.max_trials = n_completed
+    hacked_exp.is_done_ttl = 0
+    assert hacked_exp.is_done is True
+
+    # The counter is trusted when all the sequence numbers were counted
+    database.experiments.update_one({'_id': hacked_exp.id}, {'$set': {'completion_seq': 0}})
+    assert hacked_exp.is_done is False
+
+
 def test_is_done_property_with_algo(hacked_exp):
     """Check experiment stopping conditions for algo which converged."""
     # Configure experiment to have instantiated algo
@@ -624,6 +961,12 @@ def test_is_done_property_with_algo(hacked_exp):
     assert hacked_exp.is_done is True
 
 
+def trials_by_status(exp_config, experiment):
+    """Count the trials of `experiment` in `exp_config` by status."""
+    return dict(collections.Counter(trial['status'] for trial in exp_config[1]
+                                    if trial['experiment'] == experiment.id))
+
+
 def test_experiment_stats(hacked_exp, exp_config, random_dt):
     """Check that property stats is returning a proper summary of experiment's results."""
     stats = hacked_exp.stats
@@ -633,7 +976,38 @@ def test_experiment_stats(hacked_exp, exp_config, random_dt):
     assert stats['start_time'] == exp_config[0][3]['metadata']['datetime']
     assert stats['finish_time'] == exp_config[1][2]['end_time']
     assert stats['duration'] == stats['finish_time'] - stats['start_time']
-    assert len(stats) == 6
+    assert stats['trials_by_status'] == trials_by_status(exp_config, hacked_exp)
+    assert len(stats) == 7
+
+
+def test_experiment_stats_without_aggregation(hacked_exp, exp_config, random_dt, monkeypatch):
+    """Check that stats are the same when computed outside of the database."""
+    def no_aggregation(*args, **kwargs):
+        raise NotImplementedError()
+
+    monkeypatch.setattr(type(hacked_exp._db), 'aggregate', no_aggregation)
+    stats = hacked_exp.stats
+    assert stats['trials_completed'] == 3
+    assert stats['best_trials_id'] == exp_config[1][1]['_id']
+    assert stats['best_evaluation'] == 2
+    assert stats['start_time'] == exp_config[0][3]['metadata']['datetime']
+    assert stats['finish_time'] == exp_config[1][2]['end_time']
+    assert stats['duration'] == stats['finish_time'] - stats['start_time']
+    assert stats['trials_by_status'] == trials_by_status(exp_config, hacked_exp)
+    assert len(stats) == 7
+
+
+def test_experiment_stats_no_completed_trials(hacked_exp, exp_config):
+    """Check that stats of an experiment without completed trials are empty."""
+    hacked_exp._id = 'supernaekei'
+    stats = hacked_exp.stats
+    assert stats['trials_completed'] == 0
+    assert stats['best_trials_id'] is None
+    assert stats['best_evaluation'] is None
+    assert stats['start_time'] == exp_config[0][3]['metadata']['datetime']
+    assert stats['finish_time'] == stats['start_time']
+    assert stats['duration'] == datetime.timedelta()
+    assert stats['trials_by_status'] == {}
 
 
 class TestInitExperimentView(object):
@@ -665,7 +1039,7 @@ class TestInitExperimentView(object):
         assert exp.name == exp_config[0][0]['name']
         assert exp.configuration['refers'] == exp_config[0][0]['refers']
         assert exp.metadata == exp_config[0][0]['metadata']
-        assert exp._experiment._last_fetched == exp_config[0][0]['metadata']['datetime']
+        assert exp._experiment._completion_watermarks == {}
         assert exp.pool_size == exp_config[0][0]['pool_size']
         assert exp.max_trials == exp_config[0][0]['max_trials']
         assert exp.algorithms.configuration == exp_config[0][0]['algorithms']
@@ -691,7 +1065,7 @@ def test_fetch_completed_trials_from_view(hacked_exp, exp_config, random_dt):
     experiment_view._experiment = hacked_exp
 
     trials = experiment_view.fetch_completed_trials()
-    assert experiment_view._experiment._last_fetched == random_dt
+    assert experiment_view._experiment._completion_watermarks == {hacked_exp.id: (0, {})}
     assert len(trials) == 3
     assert trials[0].to_dict() == exp_config[1][0]
     assert trials[1].to_dict() == exp_config[1][1]
@@ -745,7 +1119,8 @@ def test_experiment_view_stats(hacked_exp, exp_config, random_dt):
     assert stats['start_time'] == exp_config[0][3]['metadata']['datetime']
     assert stats['finish_time'] == exp_config[1][2]['end_time']
     assert stats['duration'] == stats['finish_time'] - stats['start_time']
-    assert len(stats) == 6
+    assert stats['trials_by_status'] == trials_by_status(exp_config, hacked_exp)
+    assert len(stats) == 7
 
 
 @pytest.mark.usefixtures("with_user_tsirif")
@@ -777,7 +1152,7 @@ class TestInitExperimentWithEVC(object):
         assert exp.configuration['refers'] == exp_config[0][4]['refers']
         exp_config[0][4]['metadata']['datetime'] = random_dt
         assert exp.metadata == exp_config[0][4]['metadata']
-        assert exp._last_fetched == random_dt
+        assert exp._completion_watermarks == {}
         assert exp.pool_size is None
         assert exp.max_trials is None
         assert exp.configuration['algorithms'] == {'random': {}}
@@ -2,8 +2,10 @@
 # -*- coding: utf-8 -*-
 """Example usage and tests for :mod:`orion.core.worker.primary_algo`."""
 
+import numpy
 import pytest
 
+from orion.algo.space import PointArray
 from orion.core.worker.primary_algo import PrimaryAlgo
 
 
@@ -74,6 +76,36 @@ class TestPrimaryAlgoWraps(object):
         with pytest.raises(AssertionError):
             palgo.observe([(5,)], [5])
 
+    def test_suggest_point_array(self, palgo, space, fixed_suggestion):
+        """Suggested `PointArray` are checked and reversed as a whole."""
+        palgo.algorithm.suggest = lambda num: PointArray.from_points([fixed_suggestion] * num,
+                                                                     space)
+        points = palgo.suggest(3)
+        assert isinstance(points, PointArray)
+        assert len(points) == 3
+        assert all(tuple(point[0]) == fixed_suggestion[0] for point in points)
+        assert all(point[1:] == fixed_suggestion[1:] for point in points)
+
+        palgo.algorithm.suggest = lambda num: PointArray.from_points([(('asdfa', 5), 0, 3.5)],
+                                                                     space)
+        with pytest.raises(AssertionError):
+            palgo.suggest()
+
+    def test_observe_point_array(self, palgo, space, fixed_suggestion):
+        """Observed `PointArray` are checked and transformed as a whole."""
+        points = PointArray.from_points([fixed_suggestion] * 2, space)
+        palgo.observe(points, [5, 6])
+        assert isinstance(palgo.algorithm._points, PointArray)
+        assert len(palgo.algorithm._points) == 2
+        assert all(tuple(point[0]) == fixed_suggestion[0] for point in palgo.algorithm._points)
+        assert all(point[1:] == fixed_suggestion[1:] for point in palgo.algorithm._points)
+        assert palgo.algorithm._results == [5, 6]
+        with pytest.raises(AssertionError):
+            palgo.observe(points, [5])
+        points.columns[1] = numpy.array([0, 10])
+        with pytest.raises(AssertionError):
+            palgo.observe(points, [5, 6])
+
     def test_isdone(self, palgo):
         """Wrap isdone."""
         palgo.algorithm.done = 10
@@ -94,6 +126,11 @@ class TestPrimaryAlgoWraps(object):
         with pytest.raises(AssertionError):
             palgo.score((5,))
 
+    def test_overrides_score(self, palgo, space):
+        """Detect whether wrapped algorithm implements its own score."""
+        assert palgo.overrides_score
+        assert not PrimaryAlgo(space, 'random').overrides_score
+
     def test_judge(self, palgo, fixed_suggestion):
         """Wrap judge."""
         palgo.algorithm.judgement = 'naedw'
@@ -1,9 +1,12 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """Collection of tests for :mod:`orion.core.worker.producer`."""
+import datetime
+
 import pytest
 
 from orion.core.worker.producer import Producer
+from orion.core.worker.reservation import HEARTBEAT_TIMEOUT
 
 
 @pytest.fixture()
@@ -46,6 +49,81 @@ def test_update(producer):
         }
 
 
+def test_update_interrupts_lost_trials(producer, database, random_dt):
+    """Test that producer.update() makes trials lost by dead workers available again."""
+    trial = producer.experiment.reserve_trial()
+    expired = random_dt - HEARTBEAT_TIMEOUT - datetime.timedelta(seconds=1)
+    database.trials.update_one({'_id': trial.id}, {'$set': {'heartbeat': expired}})
+
+    producer.update()
+
+    assert database.trials.find_one({'_id': trial.id})['status'] == 'interrupted'
+
+
+def test_update_saves_and_loads_algorithm_state(producer, database, monkeypatch):
+    """Test that a new producer restores the saved state instead of observing trials again."""
+    restored = []
+    algo_type = type(producer.algorithm.algorithm)
+    monkeypatch.setattr(algo_type, 'state_dict',
+                        property(lambda self: {'n_points': len(self._points or [])}),
+                        raising=False)
+    monkeypatch.setattr(algo_type, 'set_state', lambda self, state: restored.append(state),
+                        raising=False)
+
+    producer.update()
+    assert database.algorithms.find_one({'experiment': producer.experiment.id})['state'] == \
+        {'n_points': 3}
+
+    new_producer = Producer(producer.experiment)
+    new_producer.experiment._completion_watermarks = {}
+    new_producer.algorithm.algorithm._points = None
+    new_producer.update()
+
+    assert restored == [{'n_points': 3}]
+    assert new_producer.algorithm.algorithm._points is None
+
+
+def test_produce_replaces_duplicates(producer, database, monkeypatch):
+    """Test that producer.produce() only suggests again as many points as duplicates."""
+    suggestions = [[('gru', 'rnn'), ('gru', 'rnn')], [('rnn', 'gru')]]
+    requested = []
+
+    def suggest(num):
+        requested.append(num)
+        return suggestions.pop(0)
+
+    monkeypatch.setattr(producer.algorithm, 'suggest', suggest)
+    new_trials_in_db_before = database.trials.count({'status': 'new'})
+
+    producer.produce()
+
+    assert requested == [2, 1]
+    assert database.trials.count({'status': 'new'}) == new_trials_in_db_before + 2
+
+
+def test_produce_drops_known_duplicates(producer, database):
+    """Test that producer.produce() does not register points already in the database."""
+    producer.algorithm.algorithm.value = ('lstm', 'rnn')
+    producer.experiment.register_trials = lambda trials: pytest.fail("Should not register")
+
+    producer.produce()
+
+    assert producer.algorithm.algorithm._num == 2
+
+
+def test_produce_exhausted(producer, database):
+    """Test that producer.produce() stops when all points of the space were registered."""
+    producer.num_new_trials = 20
+    producer.algorithm.suggest = lambda num: [(encoding, decoding)
+                                              for encoding in ('rnn', 'lstm', 'gru')
+                                              for decoding in ('rnn', 'lstm_with_attention', 'gru')]
+
+    assert not producer.is_exhausted
+    producer.produce()
+    assert producer.is_exhausted
+    assert database.trials.count({'experiment': producer.experiment.id}) == 9
+
+
 @pytest.mark.skip(reason="DumbAlgo generates duplicate trials")
 def test_update_and_produce(producer, database, random_dt):
     """Test functionality of producer.produce()."""
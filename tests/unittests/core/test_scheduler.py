@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Collection of tests for :mod:`orion.core.worker.scheduler`."""
+import pytest
+
+from orion.core.worker import scheduler as scheduler_module
+from orion.core.worker.scheduler import Scheduler
+
+
+class FakeExperiment(object):
+    """Record calls to `wait_for_trials`, answering with `changes`."""
+
+    def __init__(self, changes=None):
+        """Watching is not implemented if `changes` is None."""
+        self.changes = changes
+        self.timeouts = []
+        self.tokens = []
+        self.n_marks = 0
+
+    def watch_trials(self):
+        """Return a new token or raise if trials cannot be watched."""
+        if self.changes is None:
+            raise NotImplementedError()
+        self.n_marks += 1
+        return 'token{}'.format(self.n_marks)
+
+    def wait_for_trials(self, timeout, token=None):
+        """Return next change or raise if trials cannot be watched."""
+        self.timeouts.append(timeout)
+        self.tokens.append(token)
+        if self.changes is None:
+            raise NotImplementedError()
+        return self.changes.pop(0)
+
+
+@pytest.fixture()
+def sleeps(monkeypatch):
+    """Record sleeps instead of sleeping."""
+    sleeps = []
+    monkeypatch.setattr(scheduler_module.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def test_exponential_backoff(sleeps):
+    """Test that delays grow exponentially up to the maximum and are reset."""
+    scheduler = Scheduler(FakeExperiment(), initial_delay=1, max_delay=5,
+                          backoff_factor=2, jitter=0)
+
+    for _ in range(5):
+        scheduler.wait()
+
+    assert sleeps == pytest.approx([1, 2, 4, 5, 5], abs=0.1)
+    assert scheduler.n_waits == 5
+    assert scheduler.n_wakeups == 0
+
+    scheduler.reset()
+    assert scheduler.delay == 1
+
+
+def test_jitter(sleeps):
+    """Test that delays are randomly shortened by at most the jitter fraction."""
+    scheduler = Scheduler(FakeExperiment(), initial_delay=1, jitter=0.5)
+
+    for _ in range(20):
+        scheduler.wait()
+        scheduler.reset()
+
+    assert all(0.5 - 0.1 <= sleep <= 1 for sleep in sleeps)
+    assert len(set(sleeps)) > 1
+
+
+def test_poll_when_cannot_watch(sleeps):
+    """Test that the scheduler stops trying to watch trials if it is not supported."""
+    experiment = FakeExperiment()
+    scheduler = Scheduler(experiment, initial_delay=1, jitter=0)
+
+    scheduler.wait()
+    scheduler.wait()
+
+    assert experiment.timeouts == [1]
+    assert len(sleeps) == 2
+
+    scheduler.mark()
+    scheduler.wait()
+    assert experiment.n_marks == 0
+    assert experiment.timeouts == [1]
+
+
+def test_wakeup_on_change(sleeps):
+    """Test that the scheduler does not sleep after it was notified of a change."""
+    experiment = FakeExperiment(changes=[True, False])
+    scheduler = Scheduler(experiment, initial_delay=1, jitter=0)
+
+    scheduler.wait()
+    assert sleeps == []
+    assert scheduler.n_wakeups == 1
+
+    scheduler.wait()
+    assert len(sleeps) == 1
+    assert experiment.timeouts == [1, 2]
+    assert scheduler.stats['n_waits'] == 2
+    assert scheduler.stats['n_wakeups'] == 1
+
+
+def test_wait_from_mark(sleeps):
+    """Test that the scheduler waits for changes made since it was marked, only once."""
+    experiment = FakeExperiment(changes=[True, False, False])
+    scheduler = Scheduler(experiment, initial_delay=1, jitter=0)
+
+    scheduler.mark()
+    scheduler.wait()
+    scheduler.wait()
+    assert experiment.tokens == ['token1', None]
+
+    scheduler.mark()
+    scheduler.reset()
+    scheduler.wait()
+    assert experiment.tokens == ['token1', None, None]
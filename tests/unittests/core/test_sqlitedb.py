@@ -0,0 +1,502 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""Collection of tests for :mod:`orion.core.io.database.sqlitedb`."""
+
+from datetime import datetime
+import multiprocessing
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from orion.core.io.database import Database, DuplicateKeyError
+from orion.core.io.database import sqlitedb
+from orion.core.io.database.sqlitedb import MIN_SQLITE_VERSION, SQLiteDB
+
+pytestmark = pytest.mark.skipif(sqlite3.sqlite_version_info < MIN_SQLITE_VERSION,
+                                reason="SQLite is too old")
+
+
+@pytest.fixture()
+def db_path(tmpdir):
+    """Return path to a temporary database file."""
+    return str(tmpdir.join('orion_test.sqlite'))
+
+
+@pytest.fixture()
+def orion_db(db_path):
+    """Return SQLiteDB wrapper instance initiated with test opts."""
+    SQLiteDB.instance = None
+    orion_db = SQLiteDB(host=db_path)
+    yield orion_db
+    orion_db.close_connection()
+    SQLiteDB.instance = None
+
+
+@pytest.fixture()
+def clean_db(orion_db, exp_config):
+    """Clean insert example experiment entries to collections."""
+    for collection_name, documents in zip(['experiments', 'trials', 'workers', 'resources'],
+                                          exp_config):
+        orion_db.write(collection_name, documents)
+
+
+def test_wal_mode(orion_db):
+    """Database should be in WAL mode to let readers and a writer work concurrently."""
+    assert orion_db._db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+
+
+def test_factory(db_path):
+    """SQLiteDB should be available through the `Database` factory."""
+    Database.instance = None
+    try:
+        orion_db = Database(of_type='SQLiteDB', host=db_path)
+        assert isinstance(orion_db, SQLiteDB)
+        orion_db.close_connection()
+    finally:
+        Database.instance = None
+
+
+def test_reconnect_after_fork(orion_db, monkeypatch):
+    """Check the database file is opened again when used from another process."""
+    conn = orion_db._conn
+    child_pid = orion_db._pid + 1
+    assert orion_db.is_connected
+
+    monkeypatch.setattr('os.getpid', lambda: child_pid)
+    assert not orion_db.is_connected
+    assert orion_db.count('experiments') == 0
+    assert orion_db._conn is not conn
+    assert orion_db._pid == child_pid
+    assert orion_db.is_connected
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="Processes cannot be forked")
+def test_write_from_forked_process(orion_db):
+    """Check a forked process can write with the database of its parent."""
+    orion_db.write('experiments', {'_id': 'parent'})
+
+    def write():
+        orion_db.write('experiments', {'_id': 'child'})
+
+    process = multiprocessing.get_context('fork').Process(target=write)
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+
+    assert orion_db.read('experiments', {'_id': 'child'}) == [{'_id': 'child'}]
+    assert orion_db.count('experiments') == 2
+
+
+@pytest.mark.usefixtures("clean_db")
+def test_persistence(exp_config, orion_db, db_path):
+    """Documents should be found again after reconnection."""
+    orion_db.close_connection()
+    assert not orion_db.is_connected
+    orion_db.initiate_connection()
+    assert orion_db.read('trials') == exp_config[1]
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestEnsureIndex(object):
+    """Calls to :meth:`orion.core.io.database.sqlitedb.SQLiteDB.ensure_index`."""
+
+    def _indexes(self, orion_db, collection_name):
+        return [row[1] for row in orion_db._db.execute(
+            'PRAGMA index_list("{}")'.format(collection_name))]
+
+    def test_new_index(self, orion_db):
+        """Index should be added to database and reattempt should do nothing"""
+        orion_db.ensure_index('trials', 'status')
+        assert 'trials_status' in self._indexes(orion_db, 'trials')
+        orion_db.ensure_index('trials', 'status')
+        assert self._indexes(orion_db, 'trials').count('trials_status') == 1
+
+    def test_compound_index(self, orion_db):
+        """Tuple of Index should be added as a compound index."""
+        orion_db.ensure_index('trials',
+                              [('experiment', Database.ASCENDING),
+                               ('status', Database.ASCENDING),
+                               ('submit_time', Database.ASCENDING)])
+        assert 'trials_experiment_status_submit_time' in self._indexes(orion_db, 'trials')
+
+    def test_unique_index(self, orion_db):
+        """Unique index should prevent duplicated keys."""
+        orion_db.ensure_index('experiments',
+                              [('name', Database.ASCENDING),
+                               ('metadata.user', Database.ASCENDING)], unique=True)
+        with pytest.raises(DuplicateKeyError):
+            orion_db.write('experiments', {'name': 'supernaedo2', 'metadata': {'user': 'dendi'}})
+
+    def test_unique_index_with_duplicates(self, orion_db):
+        """Unique index cannot be created on keys already duplicated."""
+        with pytest.raises(DuplicateKeyError):
+            orion_db.ensure_index('experiments', 'name', unique=True)
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestRead(object):
+    """Calls to :meth:`orion.core.io.database.sqlitedb.SQLiteDB.read`."""
+
+    def test_read_experiment(self, exp_config, orion_db):
+        """Fetch a whole experiment entries."""
+        loaded_config = orion_db.read(
+            'trials', {'experiment': 'supernaedo2', 'status': 'new'})
+        assert loaded_config == [exp_config[1][3], exp_config[1][4]]
+
+        loaded_config = orion_db.read(
+            'trials',
+            {'experiment': 'supernaedo2',
+             'submit_time': exp_config[1][3]['submit_time']})
+        assert loaded_config == [exp_config[1][3]]
+
+    def test_read_with_id(self, exp_config, orion_db):
+        """Query using ``_id`` key."""
+        loaded_config = orion_db.read('experiments', {'_id': exp_config[0][2]['_id']})
+        assert loaded_config == [exp_config[0][2]]
+
+    def test_read_with_in(self, exp_config, orion_db):
+        """Query using ``$in`` operator on filtered and other keys."""
+        loaded_config = orion_db.read(
+            'trials', {'status': {'$in': ['suspended', 'interrupted']}})
+        assert loaded_config == exp_config[1][5:7]
+
+        loaded_config = orion_db.read(
+            'experiments', {'metadata.user': {'$in': ['dendi']}})
+        assert loaded_config == [exp_config[0][3]]
+
+    def test_read_default(self, exp_config, orion_db):
+        """Fetch value(s) from an entry."""
+        value = orion_db.read(
+            'experiments', {'name': 'supernaedo2', 'metadata.user': 'tsirif'},
+            selection={'algorithms': 1, '_id': 0})
+        assert value == [{'algorithms': exp_config[0][0]['algorithms']}]
+
+    def test_read_nothing(self, orion_db):
+        """Fetch value(s) from an entry."""
+        value = orion_db.read(
+            'experiments', {'name': 'not_found', 'metadata.user': 'tsirif'},
+            selection={'algorithms': 1})
+        assert value == []
+
+    def test_read_trials(self, exp_config, orion_db):
+        """Fetch value(s) from an entry, comparing datetimes."""
+        value = orion_db.read(
+            'trials',
+            {'experiment': 'supernaedo2',
+             'submit_time': {'$gte': datetime(2017, 11, 23, 0, 0, 0)}})
+        assert value == exp_config[1][2:7]
+
+    def test_read_unknown_collection(self, orion_db):
+        """Fetch nothing from a collection never written."""
+        assert orion_db.read('lalala') == []
+
+    def test_read_sort_limit_skip(self, exp_config, orion_db):
+        """Fetch a range of documents in sort order."""
+        ids = sorted((trial['_id'] for trial in exp_config[1]
+                      if trial['experiment'] == 'supernaedo2'), reverse=True)
+        documents = orion_db.read('trials', {'experiment': 'supernaedo2'},
+                                  selection={'_id': 1}, sort=[('_id', orion_db.DESCENDING)],
+                                  limit=2, skip=1)
+        assert [document['_id'] for document in documents] == ids[1:3]
+
+    def test_read_limit_skip_in_python(self, exp_config, orion_db):
+        """Fetch a range of documents matching a query SQLite cannot evaluate alone."""
+        ids = [trial['_id'] for trial in exp_config[1] if trial['worker'] in (None, 1251231)]
+        documents = orion_db.read('trials', {'worker': {'$in': [None, 1251231]}},
+                                  selection={'_id': 1}, limit=3, skip=1)
+        assert [document['_id'] for document in documents] == ids[1:4]
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestReadIter(object):
+    """Calls to :meth:`orion.core.io.database.sqlitedb.SQLiteDB.read_iter`."""
+
+    def test_read_iter_trials(self, exp_config, orion_db):
+        """Iterate lazily over the same documents as `read`."""
+        documents = orion_db.read_iter('trials', {'experiment': 'supernaedo2'}, batch_size=2)
+        assert not isinstance(documents, list)
+        assert list(documents) == orion_db.read('trials', {'experiment': 'supernaedo2'})
+
+    def test_read_iter_sort_and_limit(self, exp_config, orion_db):
+        """Iterate over the first documents in sort order."""
+        documents = orion_db.read_iter('trials', {'experiment': 'supernaedo2'},
+                                       selection={'_id': 1},
+                                       sort=[('_id', orion_db.DESCENDING)], limit=2)
+        ids = sorted((trial['_id'] for trial in exp_config[1]
+                      if trial['experiment'] == 'supernaedo2'), reverse=True)
+        assert [document['_id'] for document in documents] == ids[:2]
+
+    def test_read_iter_snapshot(self, exp_config, orion_db):
+        """Iterate over the documents as they were when the first one was read."""
+        documents = orion_db.read_iter('trials', {'status': 'new'})
+        first = next(documents)
+        orion_db.write('trials', {'status': 'new'}, query={'status': 'completed'})
+        assert [document['_id'] for document in [first] + list(documents)] == \
+            [trial['_id'] for trial in exp_config[1] if trial['status'] == 'new']
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestGroup(object):
+    """Calls to :meth:`orion.core.io.database.sqlitedb.SQLiteDB.group`."""
+
+    def test_group_by_key(self, exp_config, orion_db):
+        """Count documents and summarize their values by group."""
+        summaries = orion_db.group(
+            'experiments', {'metadata.user': 'tsirif'}, keys=['name'],
+            accumulators={'n': ('count', None), 'pool_size': ('sum', 'pool_size'),
+                          'max_trials': ('max', 'max_trials'), 'missing': ('min', 'nope')})
+
+        expected = {}
+        for experiment in exp_config[0]:
+            if experiment['metadata']['user'] == 'tsirif':
+                summary = expected.setdefault(experiment['name'], dict(
+                    name=experiment['name'], n=0, pool_size=0, max_trials=None, missing=None))
+                summary['n'] += 1
+                summary['pool_size'] += experiment['pool_size']
+                summary['max_trials'] = max(summary['max_trials'] or 0, experiment['max_trials'])
+
+        assert sorted(summaries, key=lambda x: x['name']) == \
+            sorted(expected.values(), key=lambda x: x['name'])
+
+    def test_group_all(self, exp_config, orion_db):
+        """Summarize all matching documents in a single group."""
+        summaries = orion_db.group('trials', {'status': 'completed'},
+                                   accumulators={'n': ('count', None),
+                                                 'finish_time': ('max', 'end_time')})
+        completed = [trial for trial in exp_config[1] if trial['status'] == 'completed']
+        assert summaries == [{'n': len(completed),
+                              'finish_time': max(trial['end_time'] for trial in completed)}]
+
+    def test_group_bad_operator(self, orion_db):
+        """Reject operators which are not portable."""
+        with pytest.raises(ValueError) as exc:
+            orion_db.group('trials', accumulators={'n': ('$avg', 'end_time')})
+        assert "is not one of" in str(exc.value)
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestWrite(object):
+    """Calls to :meth:`orion.core.io.database.sqlitedb.SQLiteDB.write`."""
+
+    def test_insert_one(self, orion_db):
+        """Should insert a single new entry in the collection."""
+        item = {'exp_name': 'supernaekei',
+                'user': 'tsirif'}
+        count_before = orion_db.count('experiments')
+        # call interface
+        assert orion_db.write('experiments', item) is True
+        assert orion_db.count('experiments') == count_before + 1
+        assert '_id' in item
+        value = orion_db.read('experiments', {'exp_name': 'supernaekei'})[0]
+        assert value == item
+
+    def test_insert_duplicates(self, exp_config, orion_db):
+        """Should insert entries until a duplicate is found."""
+        items = [{'_id': 'lalalathisisnew'}, exp_config[1][0], {'_id': 'lalalathisisnew2'}]
+        count_before = orion_db.count('trials')
+        with pytest.raises(DuplicateKeyError):
+            orion_db.write('trials', items)
+        assert orion_db.count('trials') == count_before + 1
+        assert orion_db.read('trials', {'_id': 'lalalathisisnew'}) == [items[0]]
+
+    def test_write_many_unordered(self, exp_config, orion_db):
+        """Should insert all entries which are not duplicates and report the others."""
+        items = [{'_id': 'lalalathisisnew'}, exp_config[1][0], {'_id': 'lalalathisisnew2'},
+                 {'_id': 'lalalathisisnew'}]
+        count_before = orion_db.count('trials')
+        assert orion_db.write_many('trials', items, ordered=False) == (2, [1, 3])
+        assert orion_db.count('trials') == count_before + 2
+        assert orion_db.read('trials', {'_id': 'lalalathisisnew2'}) == [items[2]]
+
+    def test_write_many_ordered(self, exp_config, orion_db):
+        """Should insert entries until a duplicate is found and report it."""
+        items = [{'_id': 'lalalathisisnew'}, exp_config[1][0], {'_id': 'lalalathisisnew2'}]
+        count_before = orion_db.count('trials')
+        assert orion_db.write_many('trials', items) == (1, [1])
+        assert orion_db.count('trials') == count_before + 1
+        assert orion_db.read('trials', {'_id': 'lalalathisisnew2'}) == []
+
+    def test_update_many_default(self, exp_config, orion_db):
+        """Should match existing entries, and update some of their keys."""
+        filt = {'metadata.user': 'tsirif'}
+        count_before = orion_db.count('experiments')
+        # call interface
+        assert orion_db.write('experiments', {'pool_size': 16}, filt) is True
+        assert orion_db.count('experiments') == count_before
+        value = orion_db.read('experiments')
+        assert ([document['pool_size'] for document in value] ==
+                [16 if document['metadata']['user'] == 'tsirif' else 2
+                 for document in exp_config[0]])
+
+    def test_upsert_with_id(self, orion_db):
+        """Query with a non-existent ``_id`` should upsert something."""
+        filt = {'_id': 'lalalathisisnew'}
+        count_before = orion_db.count('experiments')
+        # call interface
+        assert orion_db.write('experiments', {'pool_size': 66}, filt) is True
+        assert orion_db.count('experiments') == count_before + 1
+        assert orion_db.read('experiments', filt) == [{'_id': 'lalalathisisnew', 'pool_size': 66}]
+
+    def test_no_upsert_with_id(self, orion_db):
+        """Query with a non-existent ``_id`` should not upsert if `upsert` is False."""
+        filt = {'_id': 'lalalathisisnew'}
+        count_before = orion_db.count('experiments')
+        # call interface
+        assert orion_db.write('experiments', {'pool_size': 66}, filt, upsert=False) is True
+        assert orion_db.count('experiments') == count_before
+        assert orion_db.read('experiments', filt) == []
+
+    def test_update_with_operators(self, exp_config, orion_db):
+        """Increment values with `$inc` operator, starting from 0 if missing."""
+        filt = {'_id': exp_config[0][1]['_id']}
+        # call interface
+        assert orion_db.write('experiments', {'$inc': {'pool_size': 3, 'counter': 1}},
+                              filt) is True
+        value = orion_db.read('experiments', filt)[0]
+        assert value['pool_size'] == exp_config[0][1]['pool_size'] + 3
+        assert value['counter'] == 1
+
+    def test_update_datetime(self, exp_config, orion_db):
+        """Datetimes should be saved and compared as such."""
+        filt = {'_id': exp_config[1][3]['_id']}
+        end_time = datetime(2018, 1, 1, 12, 30, 15, 1234)
+        assert orion_db.write('trials', {'end_time': end_time}, filt) is True
+        assert orion_db.read('trials', filt)[0]['end_time'] == end_time
+        assert orion_db.count('trials', {'end_time': {'$gt': datetime(2018, 1, 1)}}) == 1
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestReadAndWrite(object):
+    """Calls to :meth:`orion.core.io.database.sqlitedb.SQLiteDB.read_and_write`."""
+
+    def test_read_and_write_one(self, orion_db, exp_config):
+        """Should read and update a single entry in the collection."""
+        loaded_config = orion_db.read_and_write(
+            'experiments',
+            {'name': 'supernaedo2', 'metadata.user': 'dendi'},
+            {'pool_size': 'lalala'})
+        exp_config[0][3]['pool_size'] = 'lalala'
+        assert loaded_config == exp_config[0][3]
+        assert orion_db.read('experiments', {'_id': exp_config[0][3]['_id']}) == [loaded_config]
+
+    def test_read_and_write_many(self, orion_db, exp_config):
+        """Should update only one entry."""
+        loaded_config = orion_db.read_and_write(
+            'experiments',
+            {'name': 'supernaedo2'},
+            {'pool_size': 'lalala'})
+
+        exp_config[0][0]['pool_size'] = 'lalala'
+        assert loaded_config == exp_config[0][0]
+
+        documents = orion_db.read('experiments', {'name': 'supernaedo2'})
+        assert documents[0]['pool_size'] == 'lalala'
+        assert documents[1]['pool_size'] != 'lalala'
+
+    def test_read_and_write_sorted(self, orion_db, exp_config):
+        """Should update the first entry according to sort order."""
+        loaded_config = orion_db.read_and_write(
+            'trials',
+            {'experiment': 'supernaedo2', 'status': {'$in': ['new', 'suspended']}},
+            {'status': 'reserved'},
+            sort=[('submit_time', Database.DESCENDING)])
+
+        assert loaded_config['_id'] == exp_config[1][6]['_id']
+        assert loaded_config['status'] == 'reserved'
+
+    def test_read_and_write_no_match(self, orion_db):
+        """Should return None when there is no match."""
+        loaded_config = orion_db.read_and_write(
+            'experiments',
+            {'name': 'lalala'},
+            {'pool_size': 'lalala'})
+
+        assert loaded_config is None
+
+    def test_read_and_write_concurrent(self, orion_db, db_path, exp_config):
+        """Should never give the same entry to concurrent connections."""
+        reserved = []
+
+        def reserve():
+            other_db = SQLiteDB.__new__(SQLiteDB)
+            other_db.__init__(host=db_path)
+            while True:
+                trial = other_db.read_and_write(
+                    'trials', {'status': {'$in': ['new', 'suspended', 'interrupted']}},
+                    {'status': 'reserved'})
+                if trial is None:
+                    break
+                reserved.append(trial['_id'])
+            other_db.close_connection()
+
+        threads = [threading.Thread(target=reserve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(reserved) == sorted(trial['_id'] for trial in exp_config[1][3:7])
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestRemove(object):
+    """Calls to :meth:`orion.core.io.database.sqlitedb.SQLiteDB.remove`."""
+
+    def test_remove_many_default(self, exp_config, orion_db):
+        """Should match existing entries, and delete them all."""
+        filt = {'metadata.user': 'tsirif'}
+        # call interface
+        assert orion_db.remove('experiments', filt) is True
+        assert orion_db.read('experiments') == [exp_config[0][3]]
+
+    def test_remove_with_id(self, exp_config, orion_db):
+        """Query using ``_id`` key."""
+        filt = {'_id': exp_config[0][0]['_id']}
+        # call interface
+        assert orion_db.remove('experiments', filt) is True
+        assert orion_db.read('experiments') == exp_config[0][1:]
+
+
+@pytest.mark.usefixtures("clean_db")
+class TestCount(object):
+    """Calls :meth:`orion.core.io.database.sqlitedb.SQLiteDB.count`."""
+
+    def test_count_default(self, exp_config, orion_db):
+        """Call just with collection name."""
+        assert orion_db.count('trials') == len(exp_config[1])
+
+    def test_count_query(self, exp_config, orion_db):
+        """Call with a query."""
+        found = orion_db.count('trials', {'status': 'completed'})
+        assert found == len([x for x in exp_config[1] if x['status'] == 'completed'])
+
+    def test_count_in_sql(self, exp_config, orion_db, monkeypatch):
+        """Count without decoding documents when SQLite can evaluate the whole query."""
+        def fail(document):
+            raise AssertionError("Documents should not be decoded.")
+
+        monkeypatch.setattr(sqlitedb, '_decode', fail)
+        found = orion_db.count('trials', {'experiment': 'supernaedo2',
+                                          'end_time': {'$gte': datetime(2017, 11, 23)}})
+        assert found == 2
+
+    def test_count_nothing(self, orion_db):
+        """Call with argument that will not find anything."""
+        assert orion_db.count('experiments', {'name': 'lalalanotfound'}) == 0
+
+
+def test_aggregate_not_supported(orion_db):
+    """Aggregation pipelines are not supported, callers must fall back on `read`."""
+    with pytest.raises(NotImplementedError):
+        orion_db.aggregate('trials', [{'$match': {'status': 'completed'}}])
+
+
+def test_watch_not_supported(orion_db):
+    """Changes cannot be watched, callers must poll them with `read`."""
+    with pytest.raises(NotImplementedError):
+        orion_db.watch_token('trials')
+
+    with pytest.raises(NotImplementedError):
+        orion_db.watch('trials', {'status': 'new'}, timeout=0.1)
@@ -7,7 +7,7 @@ import copy
 import numpy
 import pytest
 
-from orion.algo.space import (Categorical, Dimension, Integer, Real, Space,)
+from orion.algo.space import (Categorical, Dimension, Integer, PointArray, Real, Space,)
 from orion.core.worker.transformer import (build_required_space,
                                            Compose, Enumerate, Identity,
                                            OneHotEncode, Quantize, Reverse,
@@ -39,6 +39,13 @@ class TestIdentity(object):
         t = Identity()
         assert t.reverse('yo') == 'yo'
 
+    def test_batch(self):
+        """Check if it transforms and reverses a batch as it is."""
+        t = Identity()
+        points = numpy.array([1, 2, 3])
+        assert t.transform_batch(points) is points
+        assert t.reverse_batch(points) is points
+
     def test_infer_target_shape(self):
         """Check if it infers the shape of a transformed `Dimension`."""
         t = Identity()
@@ -75,6 +82,14 @@ class TestReverse(object):
         assert t.reverse(5.3) == 5
         assert numpy.all(t.reverse([8.6, 5.3]) == numpy.array([8, 5], dtype=int))
 
+    def test_batch(self):
+        """Check if it swaps batch transformations of composed transformer."""
+        t = Reverse(Quantize())
+        transformed = t.transform_batch(numpy.array([[9, 5], [1, 2]]))
+        assert transformed.dtype == float
+        assert numpy.all(transformed == [[9., 5.], [1., 2.]])
+        assert numpy.all(t.reverse_batch(numpy.array([8.6, 5.3])) == [8, 5])
+
     def test_infer_target_shape(self):
         """Check if it infers the shape of a transformed `Dimension`."""
         t = Reverse(Quantize())
@@ -169,6 +184,21 @@ class TestCompose(object):
         assert numpy.all(t.reverse([[0.5, 0], [1.0, 55]]) == numpy.array([[2, 2], [2, 2]],
                                                                          dtype=numpy.object))
 
+    def test_batch(self):
+        """Check if it transforms and reverses a batch like point by point."""
+        t = Compose([Enumerate([2, 'asfa', 'ipsi']), OneHotEncode(3)], 'categorical')
+        points = numpy.array([['ipsi', 'asfa'], [2, 'ipsi'], [2, 2]], dtype=object)
+        transformed = t.transform_batch(points)
+        assert transformed.shape == (3, 2, 3)
+        for point, tpoint in zip(points, transformed):
+            assert numpy.all(t.transform(point) == tpoint)
+        assert numpy.all(t.reverse_batch(transformed) == points)
+
+        t = Compose([Enumerate([2, 'asfa']), OneHotEncode(2)], 'categorical')
+        points = numpy.array([2, 'asfa', 'asfa'], dtype=object)
+        assert numpy.all(t.transform_batch(points) == [0., 1., 1.])
+        assert numpy.all(t.reverse_batch(numpy.array([0.3, 0.6, 2.])) == points)
+
     def test_infer_target_shape(self):
         """Check if it infers the shape of a transformed `Dimension`."""
         t = Compose([Enumerate([2, 'asfa', 'ipsi']), OneHotEncode(3)], 'categorical')
@@ -211,6 +241,16 @@ class TestQuantize(object):
         assert t.reverse(5) == 5.
         assert numpy.all(t.reverse([9, 5]) == numpy.array([9., 5.], dtype=float))
 
+    def test_batch(self):
+        """Check if it transforms and reverses a batch at once."""
+        t = Quantize()
+        transformed = t.transform_batch(numpy.array([[8.6, 5.3], [-0.5, 2.]]))
+        assert transformed.dtype == int
+        assert numpy.all(transformed == [[8, 5], [-1, 2]])
+        reversed_ = t.reverse_batch(numpy.array([9, 5]))
+        assert reversed_.dtype == float
+        assert numpy.all(reversed_ == [9., 5.])
+
     def test_infer_target_shape(self):
         """Check if it infers the shape of a transformed `Dimension`."""
         t = Quantize()
@@ -269,6 +309,22 @@ class TestEnumerate(object):
         assert numpy.all(t.reverse([[0, 0], [0, 0]]) == numpy.array([[2, 2], [2, 2]],
                                                                     dtype=numpy.object))
 
+    def test_batch(self):
+        """Check if it looks up a batch of categories and positions at once."""
+        t = Enumerate([2, 'asfa', ('ipsi', 1)])
+        points = numpy.empty((3, 2), dtype=object)
+        points[:] = [[('ipsi', 1), 'asfa'], [2, ('ipsi', 1)], [2, 2]]
+        transformed = t.transform_batch(points)
+        assert numpy.all(transformed == [[2, 1], [0, 2], [0, 0]])
+        assert t.reverse_batch(transformed).tolist() == points.tolist()
+        with pytest.raises(KeyError):
+            t.transform_batch(numpy.array(['aafdasfa', 2], dtype=object))
+        with pytest.raises(IndexError):
+            t.reverse_batch(numpy.array([0, 3]))
+
+        t = Enumerate([1, 2, 3])
+        assert numpy.all(t.transform_batch(numpy.array([3, 1, 2])) == [2, 0, 1])
+
     def test_infer_target_shape(self):
         """Check if it infers the shape of a transformed `Dimension`."""
         t = Enumerate([2, 'asfa', 'ipsi'])
@@ -350,6 +406,22 @@ class TestOneHotEncode(object):
         assert numpy.all(t.reverse([[0.5, 0], [1.0, 55]]) == numpy.array([[0, 0], [0, 0]],
                                                                          dtype=int))
 
+    def test_batch(self):
+        """Check if it encodes and decodes a batch at once."""
+        t = OneHotEncode(3)
+        points = numpy.array([[2, 1], [0, 2], [1, 1]])
+        transformed = t.transform_batch(points)
+        assert transformed.shape == (3, 2, 3)
+        for point, tpoint in zip(points, transformed):
+            assert numpy.all(t.transform(point) == tpoint)
+        assert numpy.all(t.reverse_batch(transformed) == points)
+        with pytest.raises(AssertionError):
+            t.transform_batch(numpy.array([0, 3]))
+
+        t = OneHotEncode(2)
+        assert numpy.all(t.transform_batch(numpy.array([1, 0])) == [1., 0.])
+        assert numpy.all(t.reverse_batch(numpy.array([0.6, 0.3])) == [1, 0])
+
     def test_infer_target_shape(self):
         """Check if it infers the shape of a transformed `Dimension`."""
         t = OneHotEncode(3)
@@ -422,7 +494,7 @@ class TestTransformedDimension(object):
         Set of `Dimension`'s methods are subset of `TransformedDimension`.
         """
         assert ((set(TransformedDimension.__dict__.keys()) - set(Dimension.__dict__.keys())) ==
-                set(['transform', 'reverse']))
+                set(['transform', 'reverse', 'transform_batch', 'reverse_batch']))
 
     def test_sample(self, tdim, seed):
         """Check method `sample`."""
@@ -593,6 +665,35 @@ class TestTransformedSpace(object):
         yo = tspace.reverse(tyo)
         assert yo in space
 
+    def test_transform_point_array(self, space, tspace, seed):
+        """Transform and reverse all points of a `PointArray` at once."""
+        points = space.sample_array(5, seed=seed)
+        tpoints = tspace.transform(points)
+        assert isinstance(tpoints, PointArray)
+        assert tpoints in tspace
+        for point, tpoint in zip(points, tpoints):
+            assert all(numpy.all(a == b) for a, b in zip(tspace.transform(point), tpoint))
+
+        rpoints = tspace.reverse(tpoints)
+        assert isinstance(rpoints, PointArray)
+        assert rpoints in space
+        for tpoint, rpoint in zip(tpoints, rpoints):
+            assert all(numpy.all(a == b) for a, b in zip(tspace.reverse(tpoint), rpoint))
+
+    def test_batch(self, space, tspace, seed):
+        """Check methods `transform_batch` and `reverse_batch`."""
+        points = space.sample_array(5, seed=seed)
+        tpoints = tspace.transform_batch(points)
+        assert isinstance(tpoints, PointArray)
+        assert tpoints.columns[0].shape == (5, 3, 2)
+        assert tpoints.columns[1].shape == (5, 4)
+        assert tpoints in tspace
+
+        rpoints = tspace.reverse_batch(tpoints)
+        assert isinstance(rpoints, PointArray)
+        assert rpoints in space
+        assert numpy.all(rpoints.columns[1] == points.columns[1])
+
 
 @pytest.fixture(scope='module')
 def space_each_type(dim, dim2):
@@ -2,6 +2,10 @@
 # -*- coding: utf-8 -*-
 """Collection of tests for :mod:`orion.core.worker.trial`."""
 
+import copy
+import hashlib
+
+import numpy
 import pytest
 
 from orion.core.worker.trial import Trial
@@ -201,3 +205,138 @@ class TestTrial(object):
         with pytest.raises(ValueError) as exc:
             t.full_name
         assert 'params' in str(exc.value)
+
+    def test_from_document(self, exp_config):
+        """Build a trial from a database document without validating it again."""
+        for document in exp_config[1]:
+            t = Trial.from_document(document)
+            assert t.to_dict() == document
+            assert t.to_dict() == Trial(**document).to_dict()
+            assert t.params == Trial(**document).params
+            assert t.results == Trial(**document).results
+
+        t = Trial.from_document({'experiment': 'supernaedo2'})
+        assert t.status == 'new'
+        assert t.params == []
+        assert t.results == []
+
+    def test_from_partial_document(self, exp_config):
+        """Load the fields missing from a partial document only when accessed."""
+        document = exp_config[1][2]
+        loaded = []
+
+        def loader(trial_id):
+            loaded.append(trial_id)
+            return document
+
+        t = Trial.from_document({'_id': document['_id'], 'params': document['params']},
+                                loader=loader)
+        assert t.id == document['_id']
+        assert t.params == Trial(**document).params
+        assert loaded == []
+
+        assert t.results == Trial(**document).results
+        assert t.to_dict() == document
+        assert loaded == [document['_id']]
+
+        t = Trial.from_document({'_id': document['_id']})
+        assert t.params == []
+        assert t.end_time is None
+
+    def test_hash_name_cached(self, exp_config):
+        """Check `Trial.hash_name` is recomputed once `params` or `experiment` are set."""
+        t = Trial.from_document(exp_config[1][2])
+        hash_name = t.hash_name
+        assert t.hash_name == hash_name == "aff5de14d4540bb3ad4fe0526411ea0d"
+
+        t.params[0].value = 'lstm'
+        assert t.hash_name == hash_name
+        t.params = t.params
+        assert t.hash_name != hash_name
+        t.params[0].value = 'gru'
+        t.params = t.params
+        assert t.hash_name == hash_name
+
+        t.params = t.params + [Trial.Param(name='/lr', type='real', value=0.1)]
+        assert t.hash_name != hash_name
+        t.params = t.params[:-1]
+        assert t.hash_name == hash_name
+
+        t.params = t.params[:1]
+        assert t.hash_name != hash_name
+        t.params = Trial(**exp_config[1][2]).params
+        assert t.hash_name == hash_name
+
+        t.experiment = 'other'
+        assert t.hash_name != hash_name
+
+    def test_hash_type(self, exp_config):
+        """Check `Trial.hash_type` selects the function computing `Trial.hash_name`."""
+        t = Trial(**exp_config[1][2])
+        assert t.hash_type == 'md5'
+        assert t.hash_name == "aff5de14d4540bb3ad4fe0526411ea0d"
+
+        t.hash_type = 'blake2b'
+        assert t.hash_name != "aff5de14d4540bb3ad4fe0526411ea0d"
+        assert len(t.hash_name) == 32
+        assert Trial.from_document(exp_config[1][2], 'blake2b').hash_name == t.hash_name
+        assert Trial(hash_type='blake2b', **exp_config[1][2]).hash_name == t.hash_name
+
+        with pytest.raises(ValueError) as exc:
+            t.hash_type = 'sha0'
+        assert 'sha0' in str(exc.value)
+
+    def test_hash_type_not_available(self, monkeypatch):
+        """Check a hash type missing from `hashlib` is rejected with the available ones."""
+        monkeypatch.delattr(hashlib, 'blake2b', raising=False)
+        with pytest.raises(ValueError) as exc:
+            Trial(hash_type='blake2b')
+        assert 'not available' in str(exc.value)
+        assert "('md5',)" in str(exc.value)
+
+    def test_blake2b_type_stable(self):
+        """Check blake2b hashes do not depend on the types of the values but on their kind."""
+        def hash_name(value):
+            params = [dict(name='/x', type='real', value=value)]
+            return Trial(experiment='supernaedo2', params=params, hash_type='blake2b').hash_name
+
+        assert hash_name(0.1) == hash_name(numpy.float64(0.1))
+        assert hash_name(3) == hash_name(numpy.int64(3)) == hash_name(3.0)
+        assert hash_name([1, 2.5]) == hash_name(numpy.array([1, 2.5])) == hash_name((1, 2.5))
+        assert hash_name(3) != hash_name('3')
+        assert hash_name(3) != hash_name(3.5)
+        assert hash_name(True) != hash_name(1)
+        assert hash_name(None) != hash_name('None')
+
+    def test_hash_name_cached_copy(self, exp_config):
+        """Check `Trial.hash_name` is recomputed for a copy modified in place."""
+        t = Trial(**exp_config[1][2])
+        t.params[0].value = [1, 2]
+        hash_name = t.hash_name
+
+        t_copy = copy.deepcopy(t)
+        assert t_copy.hash_name == hash_name
+        t_copy = copy.deepcopy(t)
+        t_copy.params[0].value.append(3)
+        assert t_copy.hash_name != hash_name
+        assert t.hash_name == hash_name
+
+    def test_hash_name_cached_lazy_fields(self, exp_config):
+        """Check `Trial.hash_name` is recomputed once fields of a partial document are loaded."""
+        document = exp_config[1][2]
+        t = Trial.from_document({'_id': 'not_a_hash', 'experiment': document['experiment']},
+                                loader=lambda _id: document)
+        assert t.hash_name == 'not_a_hash'
+        assert t.params
+        assert t.hash_name == "aff5de14d4540bb3ad4fe0526411ea0d"
+
+    def test_hash_name_cached_per_trial(self, exp_config):
+        """Check modifying a trial does not recompute `Trial.hash_name` of the others."""
+        t1 = Trial.from_document(exp_config[1][2])
+        t2 = Trial.from_document(exp_config[1][3])
+        hash_name = t2.hash_name
+        t1.params[0].value = 'lstm'
+        t1.hash_name
+
+        t2._hash_type = None  # Cannot compute it again
+        assert t2.hash_name == hash_name
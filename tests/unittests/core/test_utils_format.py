@@ -2,9 +2,10 @@
 # -*- coding: utf-8 -*-
 """Example usage and tests for :mod:`orion.core.utils.format`."""
 
+import numpy
 import pytest
 
-from orion.core.utils.format_trials import (trial_to_tuple, tuple_to_trial)
+from orion.core.utils.format_trials import (trial_to_tuple, TrialBatch, tuple_to_trial)
 from orion.core.worker.trial import Trial
 
 
@@ -75,3 +76,17 @@ def test_tuple_to_trial_to_tuple(space, trial, fixed_suggestion):
     assert len(t.params) == len(trial.params)
     for i in range(len(t.params)):
         assert t.params[i].to_dict() == trial.params[i].to_dict()
+
+
+def test_trial_batch(space, trial, fixed_suggestion):
+    """Trials should be gathered column-wise along with their results."""
+    trial.results = [Trial.Result(name='loss', type='objective', value=2.5)]
+    other = tuple_to_trial(fixed_suggestion, space)
+    batch = TrialBatch.from_trials([trial, other], space)
+    assert len(batch) == 2
+    assert len(batch.points) == 2
+    assert all(tuple(point[0]) == fixed_suggestion[0] for point in batch.points)
+    assert all(point[1:] == fixed_suggestion[1:] for point in batch.points)
+    assert batch.results[0] == {'objective': 2.5, 'gradient': None, 'constraint': []}
+    assert batch.objectives[0] == 2.5
+    assert numpy.isnan(batch.objectives[1])